@@ -1,18 +1,23 @@
 """Master Agent - Orchestrates the entire loan processing workflow."""
-from typing import Dict, Any, List, TypedDict
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple, TypedDict
 from langgraph.graph import StateGraph, END
-from agents.perplexity_sales_agent import PerplexitySalesAgent
+from agents.perplexity_sales_agent import LLMTimeout, PerplexitySalesAgent, token_sink
 from agents.verification_agent import VerificationAgent
 from agents.underwriting_agent import UnderwritingAgent
 from agents.sanction_letter_generator import SanctionLetterGenerator
-import httpx
+from sessions.message_log import MessageLog
+from utils.rate_limit import RateLimitExceeded
+from utils.scheduler import SchedulerRejected
 from config import settings
+from clients import HttpPool, ServiceClient, ServiceError, SessionDataContext, create_service_client
+import asyncio
+import time
 
 
 # Define the state structure
 class AgentState(TypedDict):
     """State shared across all agents."""
-    messages: List[Dict[str, str]]
+    messages: MessageLog
     customer_id: str
     customer_data: Dict[str, Any]
     current_stage: str
@@ -29,17 +34,35 @@ class AgentState(TypedDict):
     error: str
     quick_replies: List[Dict[str, str]]
     awaiting_confirmation: bool
+    step_count: int
+    max_steps: int
+    session_version: int
+    data_fetched: Dict[str, Any]
+    llm_budget: Dict[str, Any]
 
 
 class MasterAgent:
     """Master Agent that orchestrates all worker agents."""
     
-    def __init__(self):
-        self.sales_agent = PerplexitySalesAgent()
-        self.verification_agent = VerificationAgent()
-        self.underwriting_agent = UnderwritingAgent()
+    def __init__(
+        self,
+        service_client: ServiceClient = None,
+        prefetch: bool = None,
+        llm_pool: HttpPool = None
+    ):
+        self.service_client = service_client or create_service_client()
+        self.prefetch = settings.prefetch_applicant_data if prefetch is None else prefetch
+        self.sales_agent = PerplexitySalesAgent(http_pool=llm_pool)
+        self.verification_agent = VerificationAgent(self.service_client)
+        self.underwriting_agent = UnderwritingAgent(self.service_client)
         self.sanction_generator = SanctionLetterGenerator()
-        self.base_url = f"http://localhost:{settings.api_port}"
+        
+        # Sales turns by how they were answered: fast_path (no LLM call),
+        # cache (a reused reply), llm or degraded (LLM too busy)
+        self.sales_paths = {
+            path: {"turns": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            for path in ("fast_path", "cache", "llm", "degraded")
+        }
         
         # Build the workflow graph
         self.workflow = self._build_workflow()
@@ -74,7 +97,7 @@ class MasterAgent:
                 state["awaiting_confirmation"] = False
                 state["quick_replies"] = []
                 msg = {"role": "assistant", "content": "No problem! What would you like to change? The loan amount or tenure?"}
-                state["messages"] = state["messages"] + [msg]
+                state["messages"].append(msg)
                 return state
         
         elif current_stage == "awaiting_underwriting_confirmation":
@@ -88,7 +111,7 @@ class MasterAgent:
                 state["awaiting_confirmation"] = False
                 state["quick_replies"] = []
                 msg = {"role": "assistant", "content": "Let me know what needs to be corrected."}
-                state["messages"] = state["messages"] + [msg]
+                state["messages"].append(msg)
                 return state
         
         elif current_stage == "awaiting_sanction_confirmation":
@@ -106,7 +129,7 @@ class MasterAgent:
                     "role": "assistant",
                     "content": f"📧 **Email Confirmation**\n\nPerfect! We'll send your sanction letter to **{state['customer_data'].get('email', 'your registered email')}** within 24 hours.\n\nYou'll also receive:\n✅ Loan agreement documents\n✅ Repayment schedule\n✅ Next steps for documentation\n\nThank you for choosing Tata Capital! 🎉"
                 }
-                state["messages"] = state["messages"] + [email_msg]
+                state["messages"].append(email_msg)
                 return state
         
         # Route to appropriate agent
@@ -122,29 +145,147 @@ class MasterAgent:
             # Default to sales
             return await self._sales_node(state)
     
+    @staticmethod
+    def _funnel_priority(state: AgentState) -> int:
+        """
+        LLM scheduler priority for a session: the further down the funnel, the
+        sooner its request is served (0 is highest).
+        
+        Sessions back in sales after verification or underwriting (e.g. to
+        change their details) come first, then those with both loan details,
+        then those with one, then new conversations.
+        """
+        if state.get("verification_complete") or state.get("underwriting_result"):
+            return 0
+        collected = bool(state.get("loan_amount")) + bool(state.get("tenure_months"))
+        return 3 - collected
+    
+    def _record_sales_path(self, path: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        counters = self.sales_paths[path]
+        counters["turns"] += 1
+        counters["total_seconds"] += elapsed
+        counters["max_seconds"] = max(counters["max_seconds"], elapsed)
+    
+    def sales_path_stats(self) -> Dict[str, Any]:
+        """How sales turns were answered, with their share and latency."""
+        total = sum(counters["turns"] for counters in self.sales_paths.values())
+        return {
+            path: {
+                "turns": counters["turns"],
+                "share": round(counters["turns"] / total, 3) if total else 0.0,
+                "mean_ms": round(counters["total_seconds"] / counters["turns"] * 1000, 2) if counters["turns"] else 0.0,
+                "max_ms": round(counters["max_seconds"] * 1000, 2)
+            }
+            for path, counters in self.sales_paths.items()
+        }
+    
+    def _fast_path_details(self, state: AgentState, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Loan details the customer fully specified in one message, if they
+        fall within their offers (amount up to the largest offer, tenure
+        one of the offered options); None if the LLM should handle the turn.
+        """
+        details = self.sales_agent.confident_loan_details(message)
+        if details is None:
+            return None
+        
+        offers = ((state.get("pre_approved_offers") or {}).get("data") or {}).get("offers") or []
+        if not offers:
+            return None
+        max_amount = max(offer.get("max_amount", 0) for offer in offers)
+        tenures = {t for offer in offers for t in offer.get("tenure_options", [])}
+        if details["loan_amount"] > max_amount or details["tenure_months"] not in tenures:
+            return None
+        return details
+    
+    def _confirm_loan_request(self, state: AgentState) -> None:
+        """Summarize the loan request and ask to proceed to verification."""
+        confirmation_msg = {
+            "role": "assistant",
+            "content": f"Perfect! Let me summarize your loan request:\n\n💰 **Loan Amount:** ₹{state['loan_amount']:,.0f}\n📅 **Tenure:** {state['tenure_months']} months\n\nShall I proceed with verifying your details and processing your application?"
+        }
+        state["messages"].append(confirmation_msg)
+        state["quick_replies"] = [
+            {"label": "✅ Yes, Proceed", "value": "proceed_verification"},
+            {"label": "✏️ Change Details", "value": "change_details"}
+        ]
+        state["current_stage"] = "awaiting_verification_confirmation"
+        state["awaiting_confirmation"] = True
+    
     async def _sales_node(self, state: AgentState) -> AgentState:
         """Sales agent node - handles customer engagement."""
+        started = time.perf_counter()
         latest_message = state["messages"][-1]["content"] if state["messages"] else ""
         
         # Get pre-approved offers if not already fetched
         if not state.get("pre_approved_offers") and state.get("customer_id"):
-            state["pre_approved_offers"] = await self._fetch_offers(state["customer_id"])
+            state["pre_approved_offers"] = await self._fetch_offers(state["customer_id"], state)
+        
+        # Fast path: amount and tenure already clear from the message, so
+        # confirm them straight away without an LLM round trip
+        if settings.sales_fast_path_enabled:
+            details = self._fast_path_details(state, latest_message)
+            if details is not None:
+                state["loan_amount"] = details["loan_amount"]
+                state["tenure_months"] = details["tenure_months"]
+                self._confirm_loan_request(state)
+                self._record_sales_path("fast_path", started)
+                return state
         
-        # Call sales agent
-        result = await self.sales_agent.engage(
+        # A cached reply to the same customer-neutral turn costs no LLM call,
+        # so it is served before the session's LLM budget is touched
+        path = "cache"
+        known = {"loan_amount": state.get("loan_amount"), "tenure_months": state.get("tenure_months")}
+        result = self.sales_agent.cached_reply(
             customer_data=state.get("customer_data", {}),
             conversation_history=state["messages"],
             user_message=latest_message,
-            pre_approved_offers=state.get("pre_approved_offers")
+            pre_approved_offers=state.get("pre_approved_offers"),
+            stage=state.get("current_stage"),
+            known=known
         )
         
+        # Otherwise call sales agent within this session's LLM budget
+        try:
+            if result is None:
+                path = "llm"
+                state["llm_budget"] = await self.sales_agent.reserve_call(state.get("llm_budget"))
+                result = await self.sales_agent.engage(
+                    customer_data=state.get("customer_data", {}),
+                    conversation_history=state["messages"],
+                    user_message=latest_message,
+                    pre_approved_offers=state.get("pre_approved_offers"),
+                    priority=self._funnel_priority(state),
+                    stage=state.get("current_stage"),
+                    known=known,
+                    lookup_cache=False
+                )
+        except (SchedulerRejected, LLMTimeout) as e:
+            # The LLM is too busy to answer in time: keep the conversation
+            # moving with a deterministic reply instead of an error
+            if not settings.llm_degrade_when_busy:
+                state["messages"].append({"role": "assistant", "content": str(e)})
+                state["quick_replies"] = []
+                return state
+            path = "degraded"
+            result = self.sales_agent.fallback_reply(
+                conversation_history=state["messages"],
+                user_message=latest_message,
+                known=known
+            )
+        except RateLimitExceeded as e:
+            state["messages"].append({"role": "assistant", "content": str(e)})
+            state["quick_replies"] = []
+            return state
+        
         # Update state - only add if not already added
         assistant_message = {
             "role": "assistant",
             "content": result["response"]
         }
         if not state["messages"] or state["messages"][-1] != assistant_message:
-            state["messages"] = state["messages"] + [assistant_message]
+            state["messages"].append(assistant_message)
         
         # Extract loan details if available
         if result.get("extracted_data", {}).get("loan_amount"):
@@ -156,22 +297,13 @@ class MasterAgent:
         # Only progress if we have both loan amount and tenure
         if result.get("collection_complete") and state.get("loan_amount") and state.get("tenure_months"):
             # Ask for confirmation before proceeding to verification
-            confirmation_msg = {
-                "role": "assistant",
-                "content": f"Perfect! Let me summarize your loan request:\n\n💰 **Loan Amount:** ₹{state['loan_amount']:,.0f}\n📅 **Tenure:** {state['tenure_months']} months\n\nShall I proceed with verifying your details and processing your application?"
-            }
-            state["messages"] = state["messages"] + [confirmation_msg]
-            state["quick_replies"] = [
-                {"label": "✅ Yes, Proceed", "value": "proceed_verification"},
-                {"label": "✏️ Change Details", "value": "change_details"}
-            ]
-            state["current_stage"] = "awaiting_verification_confirmation"
-            state["awaiting_confirmation"] = True
+            self._confirm_loan_request(state)
         else:
             # Stay in sales stage - wait for more user input
             state["current_stage"] = "sales"
             state["quick_replies"] = []
         
+        self._record_sales_path(path, started)
         return state
     
     async def _verification_node(self, state: AgentState) -> AgentState:
@@ -179,21 +311,24 @@ class MasterAgent:
         customer_id = state.get("customer_id")
         
         if not customer_id:
-            state["messages"] = state["messages"] + [{
+            state["messages"].append({
                 "role": "assistant",
                 "content": "I need your customer ID to proceed. Could you please provide it?"
-            }]
+            })
             state["current_stage"] = "sales"
             return state
         
         # Perform verification
-        result = await self.verification_agent.quick_verify(customer_id)
+        result = await self.verification_agent.quick_verify(
+            customer_id,
+            service_client=self._session_data(state)
+        )
         
         verification_message = {
             "role": "assistant",
             "content": result["message"]
         }
-        state["messages"] = state["messages"] + [verification_message]
+        state["messages"].append(verification_message)
         
         if result["verified"]:
             state["verification_complete"] = True
@@ -205,7 +340,7 @@ class MasterAgent:
                 "role": "assistant",
                 "content": f"Great! I've verified your details:\n\n👤 **Name:** {customer.get('name', 'N/A')}\n📧 **Email:** {customer.get('email', 'N/A')}\n📱 **Phone:** {customer.get('phone', 'N/A')}\n💳 **Credit Score:** {customer.get('credit_score', 'N/A')}\n\nAre these details correct? Shall I proceed with the loan assessment?"
             }
-            state["messages"] = state["messages"] + [confirmation_msg]
+            state["messages"].append(confirmation_msg)
             state["quick_replies"] = [
                 {"label": "✅ Yes, All Correct", "value": "proceed_underwriting"},
                 {"label": "❌ Update Details", "value": "update_details"}
@@ -227,7 +362,7 @@ class MasterAgent:
                 "role": "assistant",
                 "content": "⚠️ Missing loan details. Please tell me the loan amount and tenure you need."
             }
-            state["messages"] = state["messages"] + [error_msg]
+            state["messages"].append(error_msg)
             state["current_stage"] = "sales"
             return state
         
@@ -236,7 +371,7 @@ class MasterAgent:
                 "role": "assistant",
                 "content": "⚠️ Customer verification incomplete. Let me verify your details first."
             }
-            state["messages"] = state["messages"] + [error_msg]
+            state["messages"].append(error_msg)
             state["current_stage"] = "verification"
             return state
         
@@ -246,14 +381,15 @@ class MasterAgent:
             tenure_months=state["tenure_months"],
             customer_data=state["customer_data"],
             salary_slip_provided=state.get("salary_slip_provided", False),
-            stated_salary=state.get("stated_salary")
+            stated_salary=state.get("stated_salary"),
+            service_client=self._session_data(state)
         )
         
         underwriting_message = {
             "role": "assistant",
             "content": result["message"]
         }
-        state["messages"] = state["messages"] + [underwriting_message]
+        state["messages"].append(underwriting_message)
         
         state["underwriting_result"] = result
         state["quick_replies"] = []
@@ -264,7 +400,7 @@ class MasterAgent:
                 "role": "assistant",
                 "content": f"🎉 **Congratulations!** Your loan has been approved!\n\nWould you like me to generate your official sanction letter now?"
             }
-            state["messages"] = state["messages"] + [approval_msg]
+            state["messages"].append(approval_msg)
             state["quick_replies"] = [
                 {"label": "📄 Generate Sanction Letter", "value": "generate_sanction"},
                 {"label": "📧 Email Me Later", "value": "email_later"}
@@ -290,7 +426,7 @@ class MasterAgent:
             "role": "assistant",
             "content": result["message"]
         }
-        state["messages"] = state["messages"] + [sanction_message]
+        state["messages"].append(sanction_message)
         
         if result["success"]:
             state["sanction_letter_path"] = result.get("file_path", "")
@@ -300,16 +436,17 @@ class MasterAgent:
         
         return state
     
-    async def _fetch_offers(self, customer_id: str) -> Dict[str, Any]:
-        """Fetch pre-approved offers for customer."""
+    def _session_data(self, state: Dict[str, Any]) -> SessionDataContext:
+        """Downstream lookups memoized in this session's state."""
+        return SessionDataContext(self.service_client, state)
+    
+    async def _fetch_offers(self, customer_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch pre-approved offers for customer (once per session)."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/offers/preapproved/{customer_id}"
-                )
-                if response.status_code == 200:
-                    return response.json()
-        except:
+            offers = await self._session_data(state).get_offers(customer_id)
+            if offers:
+                return offers
+        except ServiceError:
             pass
         return {}
     
@@ -331,7 +468,7 @@ class MasterAgent:
         # Initialize state if new session
         if not session_state:
             session_state = {
-                "messages": [],
+                "messages": MessageLog(),
                 "customer_id": "",
                 "customer_data": {},
                 "current_stage": "sales",
@@ -353,19 +490,20 @@ class MasterAgent:
             }
         
         # Add user message
-        session_state["messages"] = session_state["messages"] + [{
+        session_state["messages"] = MessageLog.coerce(session_state.get("messages"))
+        session_state["messages"].append({
             "role": "user",
             "content": message
-        }]
+        })
         
         # Increment step counter and check limit
-        session_state["step_count"] = session_state.get("step_count", 0) + 1
-        if session_state["step_count"] > session_state.get("max_steps", 10):
+        session_state["step_count"] = (session_state.get("step_count") or 0) + 1
+        if session_state["step_count"] > (session_state.get("max_steps") or 10):
             session_state["error"] = "Maximum conversation steps reached. Please start a new conversation."
-            session_state["messages"] = session_state["messages"] + [{
+            session_state["messages"].append({
                 "role": "assistant",
                 "content": "I apologize, but we've reached the conversation limit. Please start a new session."
-            }]
+            })
             return session_state
         
         # Run workflow
@@ -374,28 +512,75 @@ class MasterAgent:
             return result
         except Exception as e:
             session_state["error"] = str(e)
-            session_state["messages"] = session_state["messages"] + [{
+            session_state["messages"].append({
                 "role": "assistant",
                 "content": f"I encountered an error: {str(e)}. Please try again."
-            }]
+            })
             return session_state
     
+    async def stream_message(
+        self,
+        message: str,
+        session_state: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Process a user message, yielding the sales agent's reply as it is generated.
+        
+        The turn runs exactly as in process_message (stage routing,
+        COLLECT_COMPLETE detection, loan detail extraction); only the LLM
+        reply is streamed. Turns handled without the LLM yield no tokens.
+        
+        Args:
+            message: User's message
+            session_state: Current session state
+            
+        Yields:
+            ("token", text) for each piece of the reply, then
+            ("state", updated_state) once the turn is complete
+        """
+        tokens: asyncio.Queue = asyncio.Queue()
+        # The task copies the current context, so the sales agent sees the sink
+        reset = token_sink.set(tokens.put_nowait)
+        try:
+            turn = asyncio.create_task(self.process_message(message, session_state))
+        finally:
+            token_sink.reset(reset)
+        turn.add_done_callback(lambda _: tokens.put_nowait(None))
+        
+        try:
+            while (token := await tokens.get()) is not None:
+                yield "token", token
+            yield "state", turn.result()
+        finally:
+            # The client went away mid-turn: stop generating for it
+            if not turn.done():
+                turn.cancel()
+    
     async def set_customer_id(self, customer_id: str, session_state: Dict[str, Any]) -> Dict[str, Any]:
         """Set customer ID and fetch initial data."""
+        data = self._session_data(session_state)
+        if session_state.get("customer_id") != customer_id:
+            data.invalidate()
         session_state["customer_id"] = customer_id
         
+        if self.prefetch:
+            # Fetch profile, credit score and offers at once so verification
+            # and underwriting work from session state
+            errors = await data.prefetch(customer_id)
+            session_state["pre_approved_offers"] = session_state.get("pre_approved_offers") or {}
+            if "customer" in errors:
+                session_state["error"] = f"Error fetching customer data: {errors['customer']}"
+            return session_state
+        
         # Fetch customer data
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/crm/customer/{customer_id}"
-                )
-                if response.status_code == 200:
-                    session_state["customer_data"] = response.json()["data"]
-                
-                # Fetch offers
-                session_state["pre_approved_offers"] = await self._fetch_offers(customer_id)
-        except Exception as e:
+            customer = await data.get_customer(customer_id)
+            if customer:
+                session_state["customer_data"] = customer["data"]
+            
+            # Fetch offers
+            session_state["pre_approved_offers"] = await self._fetch_offers(customer_id, session_state)
+        except ServiceError as e:
             session_state["error"] = f"Error fetching customer data: {str(e)}"
         
         return session_state
@@ -406,6 +591,7 @@ class MasterAgent:
         session_state: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Handle salary slip upload and rerun underwriting."""
+        session_state["messages"] = MessageLog.coerce(session_state.get("messages"))
         session_state["salary_slip_provided"] = True
         session_state["stated_salary"] = salary_amount
         session_state["requires_salary_slip"] = False
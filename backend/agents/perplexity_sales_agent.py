@@ -1,23 +1,139 @@
 """Sales Agent using Perplexity API - Handles customer engagement and loan negotiation."""
-from openai import OpenAI
-from typing import Dict, Any, List
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Any, List, Optional
 from config import settings
+from clients.http_pool import HttpPool
+from agents.response_cache import ResponseCache
+from sessions.message_log import last_by_role
+from utils.rate_limit import AsyncTokenBucket, RateLimitExceeded, SessionBudget
+from utils.scheduler import PriorityScheduler, SchedulerRejected
+import math
+import asyncio
+import re
+import contextvars
+import httpx
 import time
 
+# Marker the model appends once the loan requirements are collected
+COLLECT_COMPLETE = "COLLECT_COMPLETE"
+
+# Scheduler priority for callers that do not give one (lower is served first)
+DEFAULT_PRIORITY = 3
+
+# Word-bounded (pattern, multiplier) pairs for the LLM-free fast path: a unit
+# only counts when it stands on its own ("2 loans" is not 2 lakhs), and only
+# a number followed by a year unit is converted to months
+STRICT_AMOUNT_PATTERNS = [
+    (r'₹\s*(\d+(?:,\d+)+)\b', 1),
+    (r'\b(\d{5,})\b', 1),
+    (r'\b(\d+(?:\.\d+)?)\s*(?:l|lakh|lakhs|lac|lacs)\b', 100000),
+]
+STRICT_TENURE_PATTERNS = [
+    (r'\b(\d+)\s*(?:month|months|mnth|mnths)\b', 1),
+    (r'\b(\d+)\s*(?:yr|yrs|year|years)\b', 12),
+]
+
+class LLMTimeout(TimeoutError):
+    """Raised when the LLM does not answer in time; the message is shown to the customer."""
+
+
+# Set by streaming callers (MasterAgent.stream_message): receives each piece
+# of the reply as it is generated, with the marker removed
+token_sink: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "token_sink", default=None
+)
+
+
+class MarkerFilter:
+    """
+    Remove a marker from text that arrives in arbitrary pieces.
+
+    Text that could be the start of the marker is held back until the next
+    piece shows whether it is, so no part of the marker is ever released.
+    """
+
+    def __init__(self, marker: str):
+        self.marker = marker
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        """Add a piece of text; returns the part that is safe to release."""
+        text = (self._pending + text).replace(self.marker, "")
+        # Hold back the longest tail that is a prefix of the marker
+        for length in range(min(len(text), len(self.marker) - 1), 0, -1):
+            if self.marker.startswith(text[-length:]):
+                self._pending = text[-length:]
+                return text[:-length]
+        self._pending = ""
+        return text
+
+    def flush(self) -> str:
+        """Release what is held back once the text is complete."""
+        pending, self._pending = self._pending, ""
+        return pending
+
+
+def retry_after_seconds(response: httpx.Response, default: float) -> float:
+    """
+    Seconds a provider asked callers to back off for.
+    
+    Reads retry-after-ms, then Retry-After as either seconds or an HTTP date;
+    returns default when neither is present or readable.
+    """
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return default
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
 
 class PerplexitySalesAgent:
     """Sales Agent using Perplexity API for engaging customers and collecting loan requirements."""
     
-    def __init__(self):
-        self.client = OpenAI(
-            api_key=settings.perplexity_api_key,
-            base_url="https://api.perplexity.ai"
-        )
+    def __init__(self, http_pool: Optional[HttpPool] = None):
+        # One pooled async client shared by every session's LLM calls
+        self.http_pool = http_pool or HttpPool.for_llm()
+        self._client: Optional[AsyncOpenAI] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
         self.model = settings.perplexity_model
-        self.last_api_call = 0
-        self.min_call_interval = 1.0  # Minimum 1 second between API calls
-        self.api_call_count = 0
-        self.max_api_calls = 20  # Maximum 20 API calls per session
+        self.timeout = settings.llm_timeout_seconds
+        # Each session's call budget lives in its state (see reserve_call);
+        # the provider quota, when configured, is shared by all sessions
+        self.session_budget = SessionBudget(
+            rate=settings.llm_session_calls_per_minute / 60,
+            capacity=settings.llm_session_burst,
+            max_calls=settings.llm_session_max_calls
+        )
+        self.provider_quota: Optional[AsyncTokenBucket] = None
+        if settings.llm_provider_calls_per_minute > 0:
+            self.provider_quota = AsyncTokenBucket(
+                rate=settings.llm_provider_calls_per_minute / 60,
+                capacity=settings.llm_provider_burst
+            )
+        # Bounds in-flight requests across all sessions and owns retries, so
+        # a provider 429 pauses every caller rather than each retrying alone
+        self.scheduler = PriorityScheduler(
+            max_concurrency=settings.llm_max_concurrency,
+            max_queue_depth=settings.llm_max_queue_depth
+        )
+        # Replies to customer-neutral turns (greetings, "yes", ...) are reused
+        # across customers with the same offer tier
+        self.response_cache: Optional[ResponseCache] = None
+        if settings.llm_cache_enabled:
+            self.response_cache = ResponseCache(
+                max_entries=settings.llm_cache_max_entries,
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                turns=settings.llm_cache_turns
+            )
         
         self.system_prompt = """You are an expert personal loan sales representative for a leading NBFC. 
 Your goal is to engage customers in a warm, personalized, and persuasive conversation to help them 
@@ -48,13 +164,223 @@ Important: You are in the sales/engagement phase. Once you have collected:
 
 Indicate that you're ready to move forward by saying "COLLECT_COMPLETE" at the end of your response.
 """
+        
+        self.completed = 0
+        self.session_limited = 0
+        self.provider_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.retries = 0
+        self.provider_throttled = 0
+        self.shed = 0
+        self.total_latency = 0.0
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Rebuilt only when the pool has reopened its HTTP client
+        http_client = self.http_pool.client
+        if self._client is None or self._http_client is not http_client:
+            base_url = settings.llm_base_url
+            if settings.llm_backend == "mock":
+                base_url = settings.mock_llm_base_url or f"http://localhost:{settings.api_port}/api/mock-llm"
+            self._client = AsyncOpenAI(
+                api_key=settings.perplexity_api_key or "mock",
+                base_url=base_url,
+                http_client=http_client,
+                # Retries go back through the scheduler (see _complete)
+                max_retries=0
+            )
+            self._http_client = http_client
+        return self._client
+    
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        on_delta: Optional[Callable[[str], None]] = None,
+        priority: int = DEFAULT_PRIORITY
+    ) -> str:
+        """
+        Send one chat completion request and return the reply text.
+        
+        Each attempt waits for a scheduler slot and must start within
+        llm_queue_budget_seconds. Rate-limit (429), connection and server
+        errors are retried up to llm_max_retries times; a 429 first pauses
+        the scheduler for the provider's Retry-After. Timeouts are not
+        retried, as the customer has already waited llm_timeout_seconds.
+        
+        Args:
+            messages: Chat messages
+            on_delta: When given, the reply is streamed and each piece is
+                passed to it as it arrives (with COLLECT_COMPLETE removed)
+            priority: Scheduler priority (lower is served first)
+            
+        Raises:
+            SchedulerRejected: With a customer-facing message, if the request
+                could not start in time or the provider kept refusing it
+            LLMTimeout: With a customer-facing message, if the reply took
+                longer than llm_timeout_seconds
+        """
+        if self.provider_quota is not None:
+            try:
+                await self.provider_quota.acquire(settings.llm_provider_max_wait_seconds)
+            except RateLimitExceeded as e:
+                self.provider_limited += 1
+                raise RateLimitExceeded(
+                    "We're helping a lot of customers right now. "
+                    f"Please try again in {math.ceil(e.retry_after)} seconds.",
+                    retry_after=e.retry_after
+                )
+        
+        streamed = []
+        
+        def forward(text: str) -> None:
+            streamed.append(text)
+            on_delta(text)
+        
+        attempt = 0
+        while True:
+            try:
+                async with self.scheduler.slot(priority, time.monotonic() + settings.llm_queue_budget_seconds):
+                    return await self._attempt(messages, forward if on_delta else None)
+            except SchedulerRejected as e:
+                self.shed += 1
+                raise SchedulerRejected(
+                    "We're helping a lot of customers right now. "
+                    f"Please try again in {max(1, math.ceil(e.retry_after or 0))} seconds.",
+                    retry_after=e.retry_after
+                )
+            except RateLimitError as e:
+                self.provider_throttled += 1
+                pause = retry_after_seconds(e.response, settings.llm_default_retry_after_seconds)
+                self.scheduler.pause(pause)
+                if attempt >= settings.llm_max_retries or streamed:
+                    self.shed += 1
+                    raise SchedulerRejected(
+                        "We're helping a lot of customers right now. "
+                        f"Please try again in {max(1, math.ceil(pause))} seconds.",
+                        retry_after=pause
+                    )
+            except (APIConnectionError, InternalServerError):
+                # A reply already partly shown to the customer is not restarted
+                if attempt >= settings.llm_max_retries or streamed:
+                    raise
+            attempt += 1
+            self.retries += 1
+    
+    async def _attempt(
+        self,
+        messages: List[Dict[str, str]],
+        on_delta: Optional[Callable[[str], None]]
+    ) -> str:
+        """Make one request, bounded by llm_timeout_seconds."""
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._request(messages, on_delta), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise LLMTimeout(f"The assistant did not respond within {self.timeout:g} seconds. Please try again.") from None
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_latency += time.perf_counter() - started
+    
+    async def _request(
+        self,
+        messages: List[Dict[str, str]],
+        on_delta: Optional[Callable[[str], None]]
+    ) -> str:
+        if on_delta is None:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                timeout=self.timeout
+            )
+            return response.choices[0].message.content
+        
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            timeout=self.timeout,
+            stream=True
+        )
+        marker = MarkerFilter(COLLECT_COMPLETE)
+        parts = []
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                safe = marker.feed(delta)
+                if safe:
+                    on_delta(safe)
+        tail = marker.flush()
+        if tail:
+            on_delta(tail)
+        return "".join(parts)
+    
+    def stats(self) -> Dict[str, Any]:
+        """LLM call counts, concurrency, latency and rate limiting."""
+        return {
+            "calls": self.completed,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "retries": self.retries,
+            "provider_throttled": self.provider_throttled,
+            "shed": self.shed,
+            "mean_latency_seconds": round(self.total_latency / self.completed, 3) if self.completed else 0.0,
+            "session_limited": self.session_limited,
+            "provider_limited": self.provider_limited,
+            "provider_quota": self.provider_quota.stats() if self.provider_quota else None
+        }
+    
+    async def reserve_call(self, budget: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Take one LLM call from a session's budget, waiting briefly if needed.
+        
+        Args:
+            budget: The session's state["llm_budget"] (None for a new session)
+            
+        Returns:
+            The updated budget to store in the session state
+            
+        Raises:
+            RateLimitExceeded: With a customer-facing message, if the session
+                has used all its calls or is sending messages too quickly
+        """
+        try:
+            budget, wait = self.session_budget.take(budget, settings.llm_session_max_wait_seconds)
+        except RateLimitExceeded as e:
+            self.session_limited += 1
+            if e.retry_after is None:
+                raise RateLimitExceeded("API call limit reached. Please start a new conversation.")
+            raise RateLimitExceeded(
+                "You're sending messages a little too quickly. "
+                f"Please wait {math.ceil(e.retry_after)} seconds and try again.",
+                retry_after=e.retry_after
+            )
+        
+        if wait:
+            await asyncio.sleep(wait)
+        return budget
     
     async def engage(
         self, 
         customer_data: Dict[str, Any],
         conversation_history: List[Dict[str, str]],
         user_message: str,
-        pre_approved_offers: Dict[str, Any] = None
+        pre_approved_offers: Dict[str, Any] = None,
+        priority: int = DEFAULT_PRIORITY,
+        stage: Optional[str] = None,
+        known: Optional[Dict[str, Any]] = None,
+        lookup_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Engage with customer and collect loan requirements.
@@ -64,10 +390,21 @@ Indicate that you're ready to move forward by saying "COLLECT_COMPLETE" at the e
             conversation_history: Previous messages
             user_message: Latest message from user
             pre_approved_offers: Available offers for personalization
+            priority: Scheduler priority (lower is served first)
+            stage: Funnel stage of the session (part of the cache key)
+            known: Loan details already collected (which ones are part of the cache key)
+            lookup_cache: False if the caller already tried cached_reply();
+                the LLM's reply is still stored in the cache
             
         Returns:
             Agent response with collection status
         """
+        cache_key = self._cache_key(customer_data, conversation_history, user_message, pre_approved_offers, stage, known)
+        if lookup_cache:
+            cached = self._cached_result(cache_key, customer_data, conversation_history, user_message)
+            if cached is not None:
+                return cached
+        
         # Build context
         context = f"""
 Customer Information:
@@ -105,7 +442,7 @@ Customer Information:
                         first_user_message_added = True
                         
             elif msg['role'] == 'assistant':
-                content = msg['content'].replace('COLLECT_COMPLETE', '').strip()
+                content = msg['content'].replace(COLLECT_COMPLETE, '').strip()
                 # Only add if previous message was user (to maintain alternation)
                 if messages and messages[-1]['role'] == 'user':
                     messages.append({"role": "assistant", "content": content})
@@ -123,33 +460,90 @@ Customer Information:
             # Merge with previous user message to fix alternation
             messages[-1]['content'] += f"\n\n{user_message}"
         
-        # Rate limiting - prevent infinite loops
-        self.api_call_count += 1
-        if self.api_call_count > self.max_api_calls:
-            raise Exception("API call limit reached. Please start a new conversation.")
-        
-        # Enforce minimum interval between calls
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_api_call
-        if time_since_last_call < self.min_call_interval:
-            time.sleep(self.min_call_interval - time_since_last_call)
-        
-        # Get response from Perplexity
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages
-        )
-        self.last_api_call = time.time()
+        # Get response from Perplexity (streamed when a caller is listening)
+        agent_response = await self._complete(messages, token_sink.get(), priority)
+        # A completion reply moves the funnel on, so it is never replayed
+        if cache_key is not None and COLLECT_COMPLETE not in agent_response:
+            self.response_cache.put(cache_key, agent_response, customer_data)
+        return self._result(agent_response, conversation_history, user_message)
+    
+    def cached_reply(
+        self,
+        customer_data: Dict[str, Any],
+        conversation_history: List[Dict[str, str]],
+        user_message: str,
+        pre_approved_offers: Dict[str, Any] = None,
+        stage: Optional[str] = None,
+        known: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reply from the response cache, without the LLM or its budget.
         
-        # Extract response
-        agent_response = response.choices[0].message.content
-        collection_complete = 'COLLECT_COMPLETE' in agent_response
+        Args:
+            customer_data: Customer information from CRM
+            conversation_history: Previous messages
+            user_message: Latest message from user
+            pre_approved_offers: Available offers for personalization
+            stage: Funnel stage of the session
+            known: Loan details already collected
+            
+        Returns:
+            Agent response in the same shape as engage(), or None on a miss
+        """
+        cache_key = self._cache_key(customer_data, conversation_history, user_message, pre_approved_offers, stage, known)
+        return self._cached_result(cache_key, customer_data, conversation_history, user_message)
+    
+    def _cache_key(
+        self,
+        customer_data: Dict[str, Any],
+        conversation_history: List[Dict[str, str]],
+        user_message: str,
+        pre_approved_offers: Optional[Dict[str, Any]],
+        stage: Optional[str],
+        known: Optional[Dict[str, Any]]
+    ) -> Optional[tuple]:
+        """Response cache key for a turn, or None if it must not be cached."""
+        if self.response_cache is None:
+            return None
+        turns = list(conversation_history[-self.response_cache.turns:])
+        if not turns or turns[-1].get('role') != 'user' or turns[-1].get('content') != user_message:
+            turns.append({'role': 'user', 'content': user_message})
+        collected = tuple(bool((known or {}).get(field)) for field in ('loan_amount', 'tenure_months'))
+        return self.response_cache.key(stage, customer_data, pre_approved_offers, turns, collected)
+    
+    def _cached_result(
+        self,
+        cache_key: Optional[tuple],
+        customer_data: Dict[str, Any],
+        conversation_history: List[Dict[str, str]],
+        user_message: str
+    ) -> Optional[Dict[str, Any]]:
+        """Reuse a cached reply to the same customer-neutral turn if there is one."""
+        if cache_key is None:
+            return None
+        agent_response = self.response_cache.get(cache_key, customer_data)
+        if agent_response is None:
+            return None
+        sink = token_sink.get()
+        if sink is not None:
+            sink(agent_response.replace(COLLECT_COMPLETE, '').strip())
+        return self._result(agent_response, conversation_history, user_message)
+    
+    def _result(
+        self,
+        agent_response: str,
+        conversation_history: List[Dict[str, str]],
+        user_message: str
+    ) -> Dict[str, Any]:
+        """Shape a raw reply into the engage() result."""
+        collection_complete = COLLECT_COMPLETE in agent_response
         
         # Clean response
-        display_response = agent_response.replace('COLLECT_COMPLETE', '').strip()
+        display_response = agent_response.replace(COLLECT_COMPLETE, '').strip()
         
-        # Try to extract loan details from conversation
-        extracted_data = self._extract_loan_details(conversation_history + [
+        # Try to extract loan details from conversation (only the last few user
+        # turns are considered, so avoid copying the whole history)
+        extracted_data = self._extract_loan_details(last_by_role(conversation_history, 'user', 2) + [
             {'role': 'user', 'content': user_message},
             {'role': 'assistant', 'content': agent_response}
         ])
@@ -161,10 +555,86 @@ Customer Information:
             "next_agent": "verification" if collection_complete else None
         }
     
+    def fallback_reply(
+        self,
+        conversation_history: List[Dict[str, str]],
+        user_message: str,
+        known: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Answer without the LLM, e.g. when it is too busy to reply in time.
+        
+        Reads the loan details from the latest user messages and asks for
+        whichever is still missing; once both are known the result is
+        marked complete so the usual confirmation step follows.
+        
+        Args:
+            conversation_history: Previous messages
+            user_message: Latest message from user
+            known: Loan details already collected (loan_amount, tenure_months)
+            
+        Returns:
+            Agent response in the same shape as engage()
+        """
+        extracted_data = self._extract_loan_details(last_by_role(conversation_history, 'user', 2) + [
+            {'role': 'user', 'content': user_message}
+        ])
+        loan_amount = extracted_data["loan_amount"] or known.get("loan_amount")
+        tenure = extracted_data["tenure_months"] or known.get("tenure_months")
+        
+        if not loan_amount:
+            response = "Thanks for your patience! How much would you like to borrow?"
+        elif not tenure:
+            response = f"Got it, ₹{loan_amount:,.0f}. Over how many months would you like to repay it?"
+        else:
+            response = "Thank you, I have everything I need to continue."
+        
+        collection_complete = bool(loan_amount and tenure)
+        return {
+            "response": response,
+            "collection_complete": collection_complete,
+            "extracted_data": extracted_data,
+            "next_agent": "verification" if collection_complete else None
+        }
+    
+    def confident_loan_details(self, user_message: str) -> Optional[Dict[str, Any]]:
+        """
+        Loan amount and tenure, if one message states both unambiguously.
+        
+        The message must yield both fields on its own through the strict,
+        word-bounded patterns, contain exactly two numbers (so "3 or 4 lakhs
+        for 24 months" is left to the LLM) and not mention other figures
+        such as salary, EMI or interest rate.
+        
+        Args:
+            user_message: Latest message from user
+            
+        Returns:
+            {"loan_amount", "tenure_months"}, or None if not confident
+        """
+        if len(re.findall(r'\d[\d,]*(?:\.\d+)?', user_message)) != 2:
+            return None
+        if re.search(r'salary|income|earn|emi\b|interest|rate|%', user_message, re.IGNORECASE):
+            return None
+        loan_amount = self._match_strict(STRICT_AMOUNT_PATTERNS, user_message)
+        tenure = self._match_strict(STRICT_TENURE_PATTERNS, user_message)
+        if not loan_amount or not tenure:
+            return None
+        return {"loan_amount": loan_amount, "tenure_months": tenure}
+    
+    @staticmethod
+    def _match_strict(patterns: List[Any], text: str) -> Optional[int]:
+        """Value of the first pattern that matches exactly once, else None."""
+        for pattern, multiplier in patterns:
+            matches = re.findall(pattern, text, re.IGNORECASE)
+            if len(matches) > 1:
+                return None
+            if matches:
+                return int(float(matches[0].replace(',', '')) * multiplier)
+        return None
+    
     def _extract_loan_details(self, conversation_history: List[Dict[str, str]]) -> Dict[str, Any]:
         """Extract loan amount and tenure from conversation."""
-        import re
-        
         loan_amount = None
         tenure = None
         
@@ -0,0 +1,197 @@
+"""Response cache - reuse sales-agent replies to near-identical, customer-neutral turns."""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+import re
+import time
+
+# Placeholders stored in cached replies in place of the customer's details
+NAME_SLOT = "{{customer_name}}"
+CITY_SLOT = "{{customer_city}}"
+
+# Anything that could be an amount (or a score, limit, rate or tenure):
+# turns and replies containing one are never cached
+AMOUNT_PATTERN = re.compile(
+    r"\d|₹|\brs\b|\binr\b|\blakhs?\b|\blacs?\b|\bcrores?\b|\bthousand\b|\bmillion\b|\bhundred\b",
+    re.IGNORECASE
+)
+
+CacheKey = Tuple[Any, ...]
+
+
+def contains_amount(text: str) -> bool:
+    """Whether text mentions a number or an amount in words."""
+    return bool(AMOUNT_PATTERN.search(text))
+
+
+def _name_pattern(customer_data: Dict[str, Any]) -> Optional[re.Pattern]:
+    # Full name first, then each part (e.g. "Rajesh", "Mr. Kumar")
+    name = (customer_data.get("name") or "").strip()
+    if not name:
+        return None
+    variants = [name] + [part for part in name.split() if len(part) > 1]
+    return re.compile(r"\b(?:" + "|".join(re.escape(v) for v in variants) + r")\b", re.IGNORECASE)
+
+
+def _city_pattern(customer_data: Dict[str, Any]) -> Optional[re.Pattern]:
+    city = (customer_data.get("city") or "").strip()
+    return re.compile(r"\b" + re.escape(city) + r"\b", re.IGNORECASE) if city else None
+
+
+def offer_tier(customer_data: Dict[str, Any], pre_approved_offers: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """
+    Coarse offer shape of a customer: credit band, limit band, offer rate.
+
+    Customers in the same tier get the same context apart from their exact
+    figures, which cached replies never contain.
+    """
+    score = customer_data.get("credit_score") or 0
+    credit_band = "excellent" if score >= 750 else "good" if score >= 700 else "fair"
+    limit = customer_data.get("pre_approved_limit") or 0
+    limit_band = next((band for band, floor in (("high", 1000000), ("mid", 300000), ("low", 1)) if limit >= floor), "none")
+
+    offers = ((pre_approved_offers or {}).get("data") or {}).get("offers") or []
+    rate = offers[0].get("interest_rate") if offers else None
+    return credit_band, limit_band, rate
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of sales-agent replies keyed by a customer-neutral turn.
+
+    The key is the funnel stage, which loan details are already collected,
+    the customer's offer tier and the last few turns normalized (lower-cased, punctuation and spacing removed, the
+    customer's name and city replaced by placeholders). Replies are stored
+    with the same placeholders and re-personalized on every hit. A turn is
+    skipped entirely when the key turns or the reply mention an amount, so
+    no figure specific to one customer is ever served to another.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 600, turns: int = 2):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.turns = turns
+
+        # key -> (templated reply, stored_at), ordered least -> most recently used
+        self._entries: "OrderedDict[CacheKey, Tuple[str, float]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.uncacheable = {"turn_amount": 0, "reply_amount": 0}
+        self.evictions = {"lru": 0, "ttl": 0}
+
+    @staticmethod
+    def _template(text: str, customer_data: Dict[str, Any]) -> str:
+        name, city = _name_pattern(customer_data), _city_pattern(customer_data)
+        if name is not None:
+            text = name.sub(NAME_SLOT, text)
+        if city is not None:
+            text = city.sub(CITY_SLOT, text)
+        return text
+
+    @staticmethod
+    def _personalize(template: str, customer_data: Dict[str, Any]) -> str:
+        # Replies address the customer by first name
+        name = (customer_data.get("name") or "").split()
+        text = template.replace(NAME_SLOT, name[0] if name else "there")
+        return text.replace(CITY_SLOT, customer_data.get("city") or "your city")
+
+    def key(
+        self,
+        stage: Any,
+        customer_data: Dict[str, Any],
+        pre_approved_offers: Optional[Dict[str, Any]],
+        turns: List[Dict[str, str]],
+        collected: Tuple[bool, ...] = ()
+    ) -> Optional[CacheKey]:
+        """
+        Build the cache key for a turn.
+
+        Args:
+            stage: Funnel stage of the session
+            customer_data: Customer information (only its tier is keyed)
+            pre_approved_offers: Available offers (only their tier is keyed)
+            turns: Conversation ending with the latest user message
+            collected: Whether each loan detail is already collected
+
+        Returns:
+            The key, or None if the turn mentions an amount and must not be cached
+        """
+        recent = turns[-self.turns:] if self.turns > 0 else []
+        normalized = []
+        for turn in recent:
+            content = turn.get("content", "")
+            if contains_amount(content):
+                self.uncacheable["turn_amount"] += 1
+                return None
+            content = self._template(content, customer_data).lower()
+            content = re.sub(r"[^\w{}\s]", " ", content)
+            normalized.append((turn.get("role"), " ".join(content.split())))
+        return (stage, tuple(collected), offer_tier(customer_data, pre_approved_offers), tuple(normalized))
+
+    def get(self, key: CacheKey, customer_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Look up a reply, personalized for this customer.
+
+        Args:
+            key: Key from key()
+            customer_data: Customer the reply is for
+
+        Returns:
+            The reply, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if self.ttl_seconds > 0 and time.monotonic() - entry[1] > self.ttl_seconds:
+            del self._entries[key]
+            self.evictions["ttl"] += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._personalize(entry[0], customer_data)
+
+    def put(self, key: CacheKey, reply: str, customer_data: Dict[str, Any]) -> bool:
+        """
+        Store a reply under placeholders for the customer's details.
+
+        Args:
+            key: Key from key()
+            reply: Reply generated for this customer
+            customer_data: Customer the reply was generated for
+
+        Returns:
+            True if stored, False if the reply mentions an amount
+        """
+        if contains_amount(reply):
+            self.uncacheable["reply_amount"] += 1
+            return False
+
+        self._entries[key] = (self._template(reply, customer_data), time.monotonic())
+        self._entries.move_to_end(key)
+        self.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions["lru"] += 1
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "uncacheable": dict(self.uncacheable),
+            "evictions": dict(self.evictions)
+        }
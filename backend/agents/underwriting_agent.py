@@ -1,15 +1,15 @@
 """Underwriting Agent - Performs loan eligibility checks."""
 from typing import Dict, Any, Optional
-import httpx
 from config import settings
+from clients import ServiceClient, ServiceError, create_service_client
 from utils.helpers import calculate_emi
 
 
 class UnderwritingAgent:
     """Underwriting Agent for credit assessment and eligibility checks."""
     
-    def __init__(self):
-        self.base_url = f"http://localhost:{settings.api_port}"
+    def __init__(self, service_client: ServiceClient = None):
+        self.service_client = service_client or create_service_client()
         self.min_credit_score = settings.min_credit_score
         self.max_emi_ratio = settings.max_emi_to_salary_ratio
         self.conditional_multiplier = settings.conditional_approval_multiplier
@@ -21,7 +21,8 @@ class UnderwritingAgent:
         tenure_months: int,
         customer_data: Dict[str, Any],
         salary_slip_provided: bool = False,
-        stated_salary: Optional[float] = None
+        stated_salary: Optional[float] = None,
+        service_client: Optional[ServiceClient] = None
     ) -> Dict[str, Any]:
         """
         Assess loan eligibility based on credit score and financial rules.
@@ -39,10 +40,13 @@ class UnderwritingAgent:
             customer_data: Customer information
             salary_slip_provided: Whether salary slip was provided
             stated_salary: Salary amount if provided
+            service_client: Client to use instead of the agent's own
+                (e.g. the session's data context)
             
         Returns:
             Eligibility assessment result
         """
+        client = service_client or self.service_client
         try:
             # Validate customer_data has required fields
             if not customer_data:
@@ -71,7 +75,7 @@ class UnderwritingAgent:
                 }
             
             # Get credit score
-            credit_result = await self._get_credit_score(customer_id)
+            credit_result = await self._get_credit_score(customer_id, client)
             
             if not credit_result['success']:
                 return {
@@ -96,7 +100,7 @@ class UnderwritingAgent:
             customer_salary = stated_salary or customer_data.get('salary', 0)
             
             # Get offer details for interest rate
-            offer_result = await self._get_offers(customer_id)
+            offer_result = await self._get_offers(customer_id, client)
             interest_rate = 12.5  # Default
             
             if offer_result['success'] and offer_result['offers']:
@@ -292,39 +296,33 @@ Would you like to proceed with a lower amount?""",
                 "next_agent": None
             }
     
-    async def _get_credit_score(self, customer_id: str) -> Dict[str, Any]:
+    async def _get_credit_score(self, customer_id: str, client: ServiceClient) -> Dict[str, Any]:
         """Fetch credit score from credit bureau."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/credit-bureau/score/{customer_id}"
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()['data']
-                    return {
-                        "success": True,
-                        "credit_score": data['credit_score'],
-                        "rating": data['rating']
-                    }
-                return {"success": False}
-        except:
+            response = await client.get_credit_score(customer_id)
+            
+            if response is not None:
+                data = response['data']
+                return {
+                    "success": True,
+                    "credit_score": data['credit_score'],
+                    "rating": data['rating']
+                }
+            return {"success": False}
+        except ServiceError:
             return {"success": False}
     
-    async def _get_offers(self, customer_id: str) -> Dict[str, Any]:
+    async def _get_offers(self, customer_id: str, client: ServiceClient) -> Dict[str, Any]:
         """Fetch pre-approved offers."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/api/offers/preapproved/{customer_id}"
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()['data']
-                    return {
-                        "success": True,
-                        "offers": data.get('offers', [])
-                    }
-                return {"success": False, "offers": []}
-        except:
+            response = await client.get_offers(customer_id)
+            
+            if response is not None:
+                data = response['data']
+                return {
+                    "success": True,
+                    "offers": data.get('offers', [])
+                }
+            return {"success": False, "offers": []}
+        except ServiceError:
             return {"success": False, "offers": []}
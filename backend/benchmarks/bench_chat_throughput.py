@@ -0,0 +1,138 @@
+"""Throughput and tail latency of full sales conversations against the mock LLM."""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from agents.master_agent import MasterAgent
+from clients import InProcessServiceClient
+from clients.http_pool import HttpPool
+from config import settings
+from services.mock_llm import MockLLMConfig, mock_llm, router
+from sessions.message_log import MessageLog
+from utils.scheduler import PriorityScheduler
+
+# Each conversation asks for an amount, then a tenure; the mock completes
+# collection on the third turn and the master agent asks for confirmation
+SCRIPT = ["Hi, I'm interested in a personal loan", "I'd like 3 lakhs", "24 months please"]
+
+
+class MockLLMPool(HttpPool):
+    """HttpPool whose client calls the mock LLM in-process, without sockets."""
+
+    def __init__(self):
+        super().__init__()
+        app = FastAPI()
+        app.include_router(router)
+        self._mock = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._mock
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def conversation(agent: MasterAgent, customer_id: str, stream: bool, turns: list, first_tokens: list) -> bool:
+    state = await agent.set_customer_id(customer_id, {"messages": MessageLog(), "current_stage": "sales"})
+    for message in SCRIPT:
+        started = time.perf_counter()
+        if stream:
+            first = None
+            async for kind, payload in agent.stream_message(message, state):
+                if kind == "token" and first is None:
+                    first = time.perf_counter() - started
+                elif kind == "state":
+                    state = payload
+            if first is not None:
+                first_tokens.append(first)
+        else:
+            state = await agent.process_message(message, state)
+        turns.append(time.perf_counter() - started)
+    return state.get("current_stage") == "awaiting_verification_confirmation"
+
+
+async def load(args) -> dict:
+    settings.llm_backend = "mock"
+    mock_llm.reset()
+    mock_llm.configure(MockLLMConfig(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.distribution,
+        latency_spread=args.spread,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        max_concurrency=args.provider_capacity,
+        retry_after_seconds=0.2,
+        seed=args.seed
+    ))
+    agent = MasterAgent(service_client=InProcessServiceClient(), llm_pool=MockLLMPool())
+    # Every conversation sends the same scripted messages; measure the LLM
+    agent.sales_agent.response_cache = None
+    agent.sales_agent.scheduler = PriorityScheduler(args.max_concurrency, settings.llm_max_queue_depth)
+
+    turns, first_tokens = [], []
+    started = time.perf_counter()
+    completed = await asyncio.gather(*(
+        conversation(agent, f"CUST{i % 10 + 1:03d}", args.stream, turns, first_tokens)
+        for i in range(args.conversations)
+    ))
+    wall = time.perf_counter() - started
+    return {
+        "wall": wall,
+        "turns": turns,
+        "first_tokens": first_tokens,
+        "completed": sum(completed),
+        "mock": mock_llm.stats(),
+        "scheduler": agent.sales_agent.scheduler.stats(),
+        "paths": agent.sales_path_stats()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=50, help="Concurrent conversations")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median time to first token")
+    parser.add_argument("--distribution", default="lognormal", help="fixed, uniform, lognormal or exponential")
+    parser.add_argument("--spread", type=float, default=0.5, help="Latency spread (sigma for lognormal)")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 500")
+    parser.add_argument("--provider-capacity", type=int, default=0,
+                        help="Concurrent requests the mock serves before answering 429 (0 for no limit)")
+    parser.add_argument("--max-concurrency", type=int, default=settings.llm_max_concurrency,
+                        help="Scheduler bound on in-flight LLM requests")
+    parser.add_argument("--stream", action="store_true", help="Stream replies and report time to first token")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = asyncio.run(load(args))
+    turns = result["turns"]
+    print(f"{args.conversations} conversations x {len(SCRIPT)} turns, {args.distribution} latency "
+          f"(median {args.latency_ms:.0f} ms, spread {args.spread:g}), {args.tokens_per_second:g} tokens/s, "
+          f"{'streamed' if args.stream else 'non-streamed'}, seed {args.seed}")
+    print(f"throughput   {len(turns) / result['wall']:.1f} turns/s over {result['wall']:.2f} s")
+    print(f"turn latency p50 {percentile(turns, 0.5) * 1000:.0f} ms  p95 {percentile(turns, 0.95) * 1000:.0f} ms  "
+          f"p99 {percentile(turns, 0.99) * 1000:.0f} ms  max {max(turns) * 1000:.0f} ms")
+    if result["first_tokens"]:
+        print(f"first token  p50 {percentile(result['first_tokens'], 0.5) * 1000:.0f} ms  "
+              f"p95 {percentile(result['first_tokens'], 0.95) * 1000:.0f} ms")
+    mock = result["mock"]
+    print(f"mock LLM     {mock['requests']} requests, {mock['rate_limited']} x 429, {mock['errors']} x 500, "
+          f"peak {mock['peak_active']} active")
+    print(f"scheduler    peak queue {result['scheduler']['peak_queue_depth']}, "
+          f"p95 wait {result['scheduler']['wait_seconds']['p95']:.2f} s, "
+          f"degraded turns {result['paths']['degraded']['turns']}")
+    print(f"completed    {result['completed']}/{args.conversations} conversations reached confirmation")
+
+    if not (args.rate_limit_rate or args.error_rate or args.provider_capacity):
+        assert result["completed"] == args.conversations
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark customer listing: full list vs cursor pages vs NDJSON stream, per store backend."""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_customer_repository import synthesize
+from services import mock_crm
+from services.binary_customer_store import BinaryCustomerStore
+from services.customer_repository import CustomerRepository
+from services.sqlite_customer_store import SqliteCustomerStore
+
+PAGE_SIZE = 100
+
+
+async def full_list(store) -> int:
+    """The previous endpoint: every summary in one list, serialized as one body."""
+    summaries = [summary async for summary in store.iter_summaries(10_000)]
+    return len(json.dumps({"success": True, "count": len(summaries), "data": summaries}))
+
+
+async def stream(store) -> tuple:
+    """Consume the NDJSON stream; time to first chunk and bytes sent."""
+    mock_crm.get_customer_store = lambda: store
+    started = time.perf_counter()
+    first_chunk = None
+    sent = 0
+    async for chunk in mock_crm._ndjson_lines(500):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+        sent += len(chunk)
+    return first_chunk, sent
+
+
+async def measure(name: str, store, customers: int) -> None:
+    await store.list_page(None, 1)  # load / open outside the measurements
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    body_size = await full_list(store)
+    full_seconds = time.perf_counter() - started
+    full_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    await store.list_page(None, PAGE_SIZE)
+    first_page = time.perf_counter() - started
+    last_id = f"CUST{customers - PAGE_SIZE - 1:07d}"
+    started = time.perf_counter()
+    await store.list_page(last_id, PAGE_SIZE)
+    deep_page = time.perf_counter() - started
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_chunk, sent = await stream(store)
+    stream_seconds = time.perf_counter() - started
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert sent >= body_size * 0.8
+
+    print(f"{name}")
+    print(f"  full list:        {full_seconds:7.2f} s to first byte, {full_peak / 2**20:8.1f} MiB peak")
+    print(f"  first page:       {first_page * 1000:7.2f} ms   last page: {deep_page * 1000:7.2f} ms ({PAGE_SIZE} rows)")
+    print(f"  ndjson stream:    {first_chunk * 1000:7.2f} ms to first byte, {stream_peak / 2**20:8.1f} MiB peak, "
+          f"{stream_seconds:.2f} s total")
+
+
+async def run(customers: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "customers.json"
+        synthesize(path, customers)
+        print(f"customers: {customers:,}")
+
+        await measure("json (in memory)", CustomerRepository(path), customers)
+        sqlite = SqliteCustomerStore(Path(directory) / "customers.db", source_json=path)
+        await measure("sqlite", sqlite, customers)
+        sqlite.close()
+        snapshot = BinaryCustomerStore(Path(directory) / "customers.bin", source_json=path)
+        await measure("binary snapshot", snapshot, customers)
+        snapshot.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.customers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Benchmark customer lookups: indexed repository, mmap snapshot and the old reload-and-scan path."""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from services.binary_customer_store import BinaryCustomerStore, build_snapshot
+from services.customer_repository import CustomerRepository, normalize_phone
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "customers.json"
+
+
+def synthesize(path: Path, count: int) -> None:
+    """Write `count` customers in the customers.json shape, cycling the real records."""
+    with open(DATA_FILE, "r") as f:
+        templates = json.load(f)["customers"]
+
+    with open(path, "w") as f:
+        f.write('{"customers": [')
+        for i in range(count):
+            customer = dict(templates[i % len(templates)])
+            customer["customer_id"] = f"CUST{i:07d}"
+            customer["phone"] = f"+91-{7000000000 + i}"
+            f.write(("," if i else "") + json.dumps(customer))
+        f.write("]}")
+
+
+def scan_by_id(path: Path, customer_id: str):
+    """The previous per-request path: parse the file, scan the list."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    for customer in data["customers"]:
+        if customer["customer_id"] == customer_id:
+            return customer
+    return None
+
+
+def anonymous_rss_mib() -> float:
+    """Private (non file-backed) resident memory; Linux only, 0 elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def rate(fn, keys) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return len(keys) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--scan-lookups", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "customers.json"
+        synthesize(path, args.customers)
+        size = path.stat().st_size
+
+        rss_before = anonymous_rss_mib()
+        repository = CustomerRepository(path)
+        started = time.perf_counter()
+        count = len(repository)
+        load_seconds = time.perf_counter() - started
+        repository_rss = anonymous_rss_mib() - rss_before
+
+        ids = [f"CUST{rng.randrange(args.customers):07d}" for _ in range(args.lookups)]
+        phones = [f"+91 {7000000000 + rng.randrange(args.customers)}" for _ in range(args.lookups)]
+        misses = [f"MISSING{i}" for i in range(args.lookups)]
+
+        by_id = rate(repository.get, ids)
+        by_phone = rate(repository.get_by_phone, phones)
+        missing = rate(repository.get, misses)
+        assert repository.get_by_phone(phones[0])["phone"].replace("-", "") == normalize_phone(phones[0])
+
+        scan = rate(lambda key: scan_by_id(path, key), ids[:args.scan_lookups])
+        del repository
+
+        snapshot_path = Path(directory) / "customers.bin"
+        started = time.perf_counter()
+        build_snapshot(path, snapshot_path)
+        build_seconds = time.perf_counter() - started
+        snapshot_size = snapshot_path.stat().st_size
+
+        rss_before = anonymous_rss_mib()
+        snapshot = BinaryCustomerStore(snapshot_path)
+        started = time.perf_counter()
+        len(snapshot)
+        open_seconds = time.perf_counter() - started
+        snapshot_by_id = rate(snapshot.get, ids)
+        snapshot_by_phone = rate(snapshot.get_by_phone, phones)
+        snapshot_rss = anonymous_rss_mib() - rss_before
+        snapshot.close()
+
+    print(f"customers:          {count:,} ({size / 2**20:.0f} MiB JSON)")
+    print("in-memory repository")
+    print(f"  load + index:     {load_seconds:6.2f} s, {repository_rss:,.0f} MiB private memory per worker")
+    print(f"  get by id:        {by_id:>12,.0f} lookups/s")
+    print(f"  get by phone:     {by_phone:>12,.0f} lookups/s")
+    print(f"  get missing id:   {missing:>12,.0f} lookups/s")
+    print("mmap snapshot")
+    print(f"  build:            {build_seconds:6.2f} s ({snapshot_size / 2**20:.0f} MiB file, shared page cache)")
+    print(f"  open:             {open_seconds * 1000:6.2f} ms, {snapshot_rss:,.0f} MiB private memory per worker")
+    print(f"  get by id:        {snapshot_by_id:>12,.0f} lookups/s")
+    print(f"  get by phone:     {snapshot_by_phone:>12,.0f} lookups/s")
+    print(f"reload + scan:      {scan:>12,.2f} lookups/s (previous behaviour)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark session journal write throughput and warm-restart replay time."""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from sessions.journal import JournaledSessionStore
+from sessions.message_log import MessageLog
+from sessions.store import InMemorySessionStore
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "customers.json"
+
+TURNS = [
+    ("user", "yes, I want to explore offers"),
+    ("assistant", "Great! How much would you like to borrow, and over how many months?"),
+    ("user", "2 lakhs for 24 months"),
+    ("assistant", "Perfect! Let me summarize your loan request. Shall I proceed?"),
+]
+
+
+async def write_entries(directory: str, entries: int, sessions: int, customers: list,
+                        snapshot_every: int = 0) -> float:
+    """Journal `entries` puts spread over `sessions` conversations; return seconds taken."""
+    store = JournaledSessionStore(
+        InMemorySessionStore(max_sessions=sessions, ttl_seconds=0),
+        directory,
+        # By default measure replay of the raw journal
+        snapshot_every=snapshot_every or entries + 1
+    )
+    await store.start()
+
+    states = {}
+    started = time.perf_counter()
+    for i in range(entries):
+        session_id = f"session-{i % sessions:07d}"
+        state = states.get(session_id)
+        if state is None:
+            customer = customers[i % len(customers)]
+            state = states[session_id] = {
+                "messages": MessageLog(),
+                "customer_id": customer["customer_id"],
+                "customer_data": customer,
+                "current_stage": "sales"
+            }
+        role, content = TURNS[len(state["messages"]) % len(TURNS)]
+        state["messages"].append({"role": role, "content": content})
+        state["step_count"] = len(state["messages"])
+        await store.put(session_id, state)
+    elapsed = time.perf_counter() - started
+
+    await store.stop()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--snapshot-every", type=int, default=0,
+                        help="Snapshot cadence while writing (0 to replay the raw journal)")
+    args = parser.parse_args()
+
+    with open(DATA_FILE, "r") as f:
+        customers = json.load(f)["customers"]
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_seconds = asyncio.run(write_entries(
+            directory, args.entries, args.sessions, customers, args.snapshot_every
+        ))
+        size = sum(p.stat().st_size for p in Path(directory).iterdir())
+
+        restarted = JournaledSessionStore(
+            InMemorySessionStore(max_sessions=args.sessions, ttl_seconds=0),
+            directory
+        )
+        started = time.perf_counter()
+        restored = restarted.replay()
+        replay_seconds = time.perf_counter() - started
+        restarted.journal.close()
+
+    print(f"journal entries:   {args.entries:,} over {args.sessions:,} sessions ({size / 2**20:.1f} MiB)")
+    print(f"write:             {write_seconds:6.2f} s  ({args.entries / write_seconds:,.0f} entries/s)")
+    print(f"replay:            {replay_seconds:6.2f} s  ({args.entries / replay_seconds:,.0f} entries/s)")
+    print(f"sessions restored: {restored:,}")
+
+
+if __name__ == "__main__":
+    main()
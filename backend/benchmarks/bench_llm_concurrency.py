@@ -0,0 +1,140 @@
+"""Load test: concurrent sessions calling the sales agent, blocking vs async LLM client."""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from openai import OpenAI
+
+from agents.perplexity_sales_agent import PerplexitySalesAgent
+from clients.http_pool import HttpPool
+from utils.rate_limit import AsyncTokenBucket
+from utils.scheduler import PriorityScheduler
+
+CUSTOMER = {"name": "Rajesh Kumar", "city": "Mumbai", "credit_score": 780, "pre_approved_limit": 500000}
+
+
+def completion(content: str) -> dict:
+    return {
+        "id": "bench",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "sonar",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    }
+
+
+class FakeLLMPool(HttpPool):
+    """HttpPool whose client answers every request after a fixed latency."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(latency)
+            return httpx.Response(200, json=completion("How much would you like to borrow?"))
+
+        self._fake = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._fake
+
+
+class BlockingSalesAgent(PerplexitySalesAgent):
+    """The previous behaviour: a synchronous client called from the async handler."""
+
+    def __init__(self, latency: float, interval: float):
+        super().__init__(http_pool=FakeLLMPool(latency))
+        self.interval = interval
+        self.last_api_call = 0.0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            time.sleep(latency)
+            return httpx.Response(200, json=completion("How much would you like to borrow?"))
+
+        self.sync_client = OpenAI(
+            api_key="bench",
+            base_url="http://llm.invalid",
+            http_client=httpx.Client(transport=httpx.MockTransport(handler))
+        )
+
+    async def _complete(self, messages, on_delta=None, priority=None):
+        since_last = time.time() - self.last_api_call
+        if since_last < self.interval:
+            time.sleep(self.interval - since_last)
+        response = self.sync_client.chat.completions.create(model=self.model, messages=messages)
+        self.last_api_call = time.time()
+        return response.choices[0].message.content
+
+
+async def heartbeat(lags: list, stop: asyncio.Event, period: float = 0.01) -> None:
+    """Record how late a periodic timer fires; a blocked event loop shows as lag."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(period)
+        lags.append(time.perf_counter() - started - period)
+
+
+async def load(agent: PerplexitySalesAgent, sessions: int) -> dict:
+    lags = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    await asyncio.sleep(0)
+
+    # Response times are measured from when all sessions sent their message
+    started = time.perf_counter()
+
+    async def session(i: int) -> float:
+        await agent.engage(CUSTOMER, [], f"I need a loan of {i + 1} lakhs", None)
+        return time.perf_counter() - started
+
+    latencies = await asyncio.gather(*(session(i) for i in range(sessions)))
+    wall = time.perf_counter() - started
+    stop.set()
+    await beat
+    return {
+        "wall": wall,
+        "p50": statistics.median(latencies),
+        "max": max(latencies),
+        "max_lag": max(lags) if lags else wall
+    }
+
+
+def report(name: str, result: dict) -> None:
+    print(f"{name:<10}{result['wall']:>9.2f} s{result['p50']:>9.2f} s{result['max']:>9.2f} s"
+          f"{result['max_lag'] * 1000:>12.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent sessions")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Simulated LLM latency")
+    parser.add_argument("--interval-ms", type=float, default=0.0,
+                        help="Global spacing between calls in the blocking client (the previous throttle)")
+    parser.add_argument("--provider-rpm", type=float, default=0.0,
+                        help="Provider quota for the async client in calls per minute (0 for none)")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+    interval = args.interval_ms / 1000
+
+    blocking = asyncio.run(load(BlockingSalesAgent(latency, interval), args.sessions))
+
+    agent = PerplexitySalesAgent(http_pool=FakeLLMPool(latency))
+    agent.provider_quota = AsyncTokenBucket(args.provider_rpm / 60, 1) if args.provider_rpm else None
+    # Measure the client itself, not the scheduler's concurrency bound
+    agent.scheduler = PriorityScheduler(args.sessions)
+    concurrent = asyncio.run(load(agent, args.sessions))
+    assert agent.stats()["peak_in_flight"] > 1 or args.sessions == 1 or args.provider_rpm
+
+    print(f"{args.sessions} concurrent sessions, {args.latency_ms:.0f} ms LLM latency, "
+          f"blocking spacing {args.interval_ms:.0f} ms, async provider quota {args.provider_rpm:.0f}/min")
+    print(f"{'client':<10}{'wall':>11}{'p50':>11}{'max':>11}{'loop lag':>15}")
+    report("blocking", blocking)
+    report("async", concurrent)
+
+
+if __name__ == "__main__":
+    main()
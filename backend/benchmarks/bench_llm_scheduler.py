@@ -0,0 +1,103 @@
+"""Load test: LLM scheduler vs unbounded fan-out against a provider that returns 429s."""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from agents.perplexity_sales_agent import PerplexitySalesAgent
+from benchmarks.bench_llm_concurrency import CUSTOMER, FakeLLMPool, completion
+from utils.scheduler import PriorityScheduler, SchedulerRejected
+
+
+class ThrottlingLLMPool(FakeLLMPool):
+    """Provider that serves `capacity` requests at a time and answers 429 beyond that."""
+
+    def __init__(self, latency: float, capacity: int, retry_after: float):
+        super().__init__(latency)
+        self.active = 0
+        self.throttled = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if self.active >= capacity:
+                self.throttled += 1
+                return httpx.Response(
+                    429, headers={"retry-after": f"{retry_after:g}"},
+                    json={"error": {"message": "Too many requests"}}
+                )
+            self.active += 1
+            try:
+                await asyncio.sleep(latency)
+            finally:
+                self.active -= 1
+            return httpx.Response(200, json=completion("How much would you like to borrow?"))
+
+        self._fake = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def load(agent: PerplexitySalesAgent, sessions: int, priorities: int) -> dict:
+    started = time.perf_counter()
+    latencies = {priority: [] for priority in range(priorities)}
+    outcomes = {"answered": 0, "shed": 0, "failed": 0}
+
+    async def session(i: int) -> None:
+        priority = i % priorities
+        try:
+            await agent.engage(CUSTOMER, [], f"I need a loan of {i + 1} lakhs", None, priority=priority)
+            outcomes["answered"] += 1
+            latencies[priority].append(time.perf_counter() - started)
+        except SchedulerRejected:
+            outcomes["shed"] += 1
+        except Exception:
+            outcomes["failed"] += 1
+
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    outcomes["wall"] = time.perf_counter() - started
+    outcomes["p50_by_priority"] = {
+        priority: statistics.median(values) if values else None for priority, values in latencies.items()
+    }
+    return outcomes
+
+
+def run(name: str, concurrency: int, args) -> None:
+    pool = ThrottlingLLMPool(args.latency_ms / 1000, args.provider_capacity, args.retry_after)
+    agent = PerplexitySalesAgent(http_pool=pool)
+    agent.scheduler = PriorityScheduler(concurrency, max_queue_depth=args.sessions)
+    result = asyncio.run(load(agent, args.sessions, args.priorities))
+    stats = agent.scheduler.stats()
+
+    medians = "  ".join(
+        f"p{priority}={value:.2f}s" if value is not None else f"p{priority}=-"
+        for priority, value in result["p50_by_priority"].items()
+    )
+    print(f"{name:<11}{result['answered']:>9}{result['shed']:>6}{result['failed']:>8}{pool.throttled:>6}"
+          f"{stats['peak_queue_depth']:>7}{stats['wait_seconds']['p95']:>9.2f}s{result['wall']:>8.2f}s  {medians}")
+    return result, pool.throttled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=60, help="Sessions sending a message at once")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Simulated LLM latency")
+    parser.add_argument("--provider-capacity", type=int, default=8,
+                        help="Concurrent requests the provider serves before answering 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After on the provider's 429s")
+    parser.add_argument("--priorities", type=int, default=4, help="Funnel priorities spread across sessions")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {args.latency_ms:.0f} ms LLM latency, provider serves "
+          f"{args.provider_capacity} at once (429 Retry-After {args.retry_after:g}s)")
+    print(f"{'scheduler':<11}{'answered':>9}{'shed':>6}{'failed':>8}{'429s':>6}{'queue':>7}{'p95 wait':>10}"
+          f"{'wall':>9}  p50 response by priority")
+    unbounded, unbounded_429s = run("unbounded", args.sessions, args)
+    bounded, bounded_429s = run("bounded", args.provider_capacity, args)
+
+    assert bounded_429s < unbounded_429s or unbounded_429s == 0
+    assert bounded["answered"] >= unbounded["answered"]
+    first, last = bounded["p50_by_priority"][0], bounded["p50_by_priority"][args.priorities - 1]
+    assert first is None or last is None or first <= last
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark per-turn downstream latency with and without applicant data prefetch."""
+import argparse
+import asyncio
+import statistics
+import time
+
+from agents.master_agent import MasterAgent
+from clients import InProcessServiceClient
+from sessions.message_log import MessageLog
+
+CUSTOMER_ID = "CUST001"
+
+
+class SlowServiceClient(InProcessServiceClient):
+    """In-process services with a fixed network-like delay per call."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def _call(self, handler, *args, **kwargs):
+        await asyncio.sleep(self.delay)
+        return await super()._call(handler, *args, **kwargs)
+
+
+async def conversation(agent: MasterAgent) -> dict:
+    """Time session start, the verification turn and the underwriting turn."""
+    timings = {}
+    state = {"messages": MessageLog(), "current_stage": "sales"}
+
+    started = time.perf_counter()
+    state = await agent.set_customer_id(CUSTOMER_ID, state)
+    timings["session start"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    state = await agent._verification_node(state)
+    timings["verification turn"] = time.perf_counter() - started
+
+    state["loan_amount"] = 200000
+    state["tenure_months"] = 24
+    started = time.perf_counter()
+    state = await agent._underwriting_node(state)
+    timings["underwriting turn"] = time.perf_counter() - started
+    assert state["underwriting_result"]["approved"]
+    return timings
+
+
+async def measure(prefetch: bool, delay: float, conversations: int) -> dict:
+    agent = MasterAgent(service_client=SlowServiceClient(delay), prefetch=prefetch)
+    runs = [await conversation(agent) for _ in range(conversations)]
+    return {turn: statistics.mean(run[turn] for run in runs) * 1000 for turn in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay-ms", type=float, default=40.0, help="Simulated latency per downstream call")
+    parser.add_argument("--conversations", type=int, default=20)
+    args = parser.parse_args()
+
+    sequential = asyncio.run(measure(False, args.delay_ms / 1000, args.conversations))
+    prefetched = asyncio.run(measure(True, args.delay_ms / 1000, args.conversations))
+
+    print(f"{args.delay_ms:.0f} ms per downstream call, mean of {args.conversations} conversations")
+    print(f"{'':<20}{'sequential':>12}{'prefetch':>12}{'saved':>12}")
+    for turn in sequential:
+        saved = sequential[turn] - prefetched[turn]
+        print(f"{turn:<20}{sequential[turn]:>9.1f} ms{prefetched[turn]:>9.1f} ms{saved:>9.1f} ms")
+    total_sequential = sum(sequential.values())
+    total_prefetched = sum(prefetched.values())
+    print(f"{'total':<20}{total_sequential:>9.1f} ms{total_prefetched:>9.1f} ms"
+          f"{total_sequential - total_prefetched:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Load test: LLM calls and response time for sales openers with and without the response cache."""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from agents.perplexity_sales_agent import PerplexitySalesAgent
+from agents.response_cache import ResponseCache
+from benchmarks.bench_llm_concurrency import FakeLLMPool
+from utils.scheduler import PriorityScheduler
+
+OPENERS = ["hi", "Hi!", "hello", "yes", "Yes please", "I want to explore offers", "i want to explore offers.",
+           "What offers do I have?", "tell me more"]
+WITH_AMOUNTS = ["I need 3 lakhs", "Can I get 250000?", "around 5 lakh for 24 months"]
+
+CUSTOMERS = [
+    {"name": name, "city": city, "credit_score": score, "pre_approved_limit": limit}
+    for name, city, score, limit in [
+        ("Rajesh Kumar", "Mumbai", 780, 500000), ("Priya Sharma", "Pune", 790, 450000),
+        ("Amit Shah", "Delhi", 720, 350000), ("Sneha Iyer", "Chennai", 705, 400000),
+        ("Vikram Rao", "Bengaluru", 680, 200000), ("Neha Gupta", "Jaipur", 660, 150000)
+    ]
+]
+OFFERS = {"data": {"offers": [{"max_amount": 500000, "interest_rate": 10.5}]}}
+
+
+async def load(agent: PerplexitySalesAgent, turns: list) -> dict:
+    latencies = []
+    for customer, message in turns:
+        started = time.perf_counter()
+        await agent.engage(customer, [{"role": "user", "content": message}], message, OFFERS)
+        latencies.append(time.perf_counter() - started)
+    return {"calls": agent.stats()["calls"], "mean": statistics.mean(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=300, help="Opening turns across all customers")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Simulated LLM latency")
+    parser.add_argument("--amount-share", type=float, default=0.3, help="Share of turns that mention an amount")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    turns = [
+        (rng.choice(CUSTOMERS), rng.choice(WITH_AMOUNTS if rng.random() < args.amount_share else OPENERS))
+        for _ in range(args.turns)
+    ]
+
+    results = {}
+    for name, cache in (("no cache", None), ("cache", ResponseCache())):
+        agent = PerplexitySalesAgent(http_pool=FakeLLMPool(args.latency_ms / 1000))
+        agent.scheduler = PriorityScheduler(1)
+        agent.response_cache = cache
+        results[name] = asyncio.run(load(agent, turns))
+        results[name]["cache"] = cache.stats() if cache else None
+
+    print(f"{args.turns} opening turns over {len(CUSTOMERS)} customers, {args.amount_share:.0%} with amounts, "
+          f"{args.latency_ms:.0f} ms LLM latency")
+    print(f"{'':<10}{'LLM calls':>10}{'mean turn':>12}{'hit rate':>10}{'uncacheable':>13}")
+    for name, result in results.items():
+        cache = result["cache"]
+        print(f"{name:<10}{result['calls']:>10}{result['mean'] * 1000:>10.1f}ms"
+              f"{(cache['hit_rate'] if cache else 0):>10.0%}"
+              f"{(sum(cache['uncacheable'].values()) if cache else 0):>13}")
+
+    assert results["cache"]["calls"] < results["no cache"]["calls"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark sales-turn latency with and without the deterministic fast path."""
+import argparse
+import asyncio
+
+from agents.master_agent import MasterAgent
+from benchmarks.bench_llm_concurrency import FakeLLMPool
+from clients import InProcessServiceClient
+from config import settings
+from sessions.message_log import MessageLog
+
+CUSTOMER_ID = "CUST001"
+
+# Fully specified requests the fast path can confirm, and turns it must leave to the LLM
+SPECIFIED = ["3 lakhs for 24 months", "₹2,00,000 for 36 months", "I need 1.5 lakh over 2 years"]
+OPEN = ["hi", "what offers do I have?", "3 or 4 lakhs for 24 months", "my salary is 50000, 2 years"]
+
+
+async def measure(fast_path: bool, latency: float, turns: int) -> dict:
+    settings.sales_fast_path_enabled = fast_path
+    agent = MasterAgent(service_client=InProcessServiceClient(), llm_pool=FakeLLMPool(latency))
+    agent.sales_agent.response_cache = None
+
+    messages = SPECIFIED + OPEN
+    for i in range(turns):
+        state = await agent.set_customer_id(CUSTOMER_ID, {"messages": MessageLog(), "current_stage": "sales"})
+        state["messages"].append({"role": "user", "content": messages[i % len(messages)]})
+        await agent._sales_node(state)
+    return {"paths": agent.sales_path_stats(), "llm_calls": agent.sales_agent.stats()["calls"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Simulated LLM latency")
+    parser.add_argument("--turns", type=int, default=70)
+    args = parser.parse_args()
+
+    print(f"{args.turns} sales turns ({len(SPECIFIED)} of every {len(SPECIFIED) + len(OPEN)} fully specified), "
+          f"{args.latency_ms:.0f} ms LLM latency")
+    print(f"{'fast path':<11}{'LLM calls':>10}{'path':>11}{'turns':>7}{'mean':>11}")
+    results = {}
+    for enabled in (False, True):
+        results[enabled] = asyncio.run(measure(enabled, args.latency_ms / 1000, args.turns))
+        for path, stats in results[enabled]["paths"].items():
+            if stats["turns"]:
+                print(f"{'on' if enabled else 'off':<11}{results[enabled]['llm_calls']:>10}{path:>11}"
+                      f"{stats['turns']:>7}{stats['mean_ms']:>9.1f}ms")
+
+    assert results[True]["paths"]["fast_path"]["turns"] > 0
+    assert results[True]["llm_calls"] < results[False]["llm_calls"]
+
+
+if __name__ == "__main__":
+    main()
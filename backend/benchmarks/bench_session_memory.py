@@ -0,0 +1,149 @@
+"""Benchmark per-session memory: AgentState dicts vs compact SessionState."""
+import argparse
+import gc
+import json
+import tracemalloc
+from pathlib import Path
+
+from sessions.message_log import MessageLog
+from sessions.state import SessionState
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "customers.json"
+
+OFFERS_TEMPLATE = {
+    "success": True,
+    "data": {
+        "offers": [
+            {
+                "tier": "Instant Approval",
+                "max_amount": 300000,
+                "interest_rate": 11.25,
+                "tenure_options": [12, 24, 36, 48, 60],
+                "processing_fee": 0,
+                "features": [
+                    "Instant approval - No documentation required",
+                    "Disbursal within 24 hours",
+                    "Special rate of 11.25% p.a."
+                ]
+            },
+            {
+                "tier": "Enhanced Offer",
+                "max_amount": 600000,
+                "interest_rate": 11.0,
+                "tenure_options": [12, 24, 36, 48, 60],
+                "processing_fee": 6000.0,
+                "features": [
+                    "Salary slip verification required",
+                    "Up to ₹600,000 available",
+                    "Competitive rate of 11.0% p.a.",
+                    "Quick approval subject to income verification"
+                ]
+            }
+        ],
+        "valid_until": "2026-11-16",
+        "special_message": "Congratulations! You have exclusive pre-approved offers available."
+    }
+}
+
+
+def make_log(index: int, customer: dict) -> MessageLog:
+    """Conversation log of a session that has reached sanction confirmation."""
+    return MessageLog([
+        {"role": "assistant", "content": f"Hello {customer['name'].split()[0]}! 👋"},
+        {"role": "user", "content": "yes"},
+        {"role": "assistant", "content": "How much would you like to borrow?"},
+        {"role": "user", "content": "2 lakhs for 24 months"},
+        {"role": "assistant", "content": f"🎉 **Congratulations! Your Loan is APPROVED!** (session {index})"},
+    ])
+
+
+def make_state(customer: dict, messages: MessageLog) -> dict:
+    """Build a post-underwriting session as the Master Agent leaves it."""
+    # Fresh dicts per session, as they arrive from separate HTTP responses
+    customer_data = json.loads(json.dumps(customer))
+    offers = json.loads(json.dumps(OFFERS_TEMPLATE))
+    offers["data"]["customer_id"] = customer["customer_id"]
+
+    return {
+        "messages": messages,
+        "customer_id": customer["customer_id"],
+        "customer_data": customer_data,
+        "current_stage": "awaiting_sanction_confirmation",
+        "loan_amount": 200000,
+        "tenure_months": 24,
+        "pre_approved_offers": offers,
+        "verification_complete": True,
+        "underwriting_result": {
+            "success": True,
+            "approved": True,
+            "decision": "INSTANT_APPROVAL",
+            "message": messages[-1]["content"],
+            "loan_details": {
+                "loan_amount": 200000,
+                "tenure_months": 24,
+                "interest_rate": 11.25,
+                "monthly_emi": 9345.12,
+                "total_payment": 224282.88,
+                "credit_score": customer["credit_score"]
+            },
+            "next_agent": "sanction_letter"
+        },
+        "requires_salary_slip": False,
+        "salary_slip_provided": False,
+        "stated_salary": 0,
+        "sanction_letter_path": "",
+        "conversation_complete": False,
+        "error": "",
+        "step_count": 3,
+        "max_steps": 10,
+        "quick_replies": [
+            {"label": "📄 Generate Sanction Letter", "value": "generate_sanction"},
+            {"label": "📧 Email Me Later", "value": "email_later"}
+        ],
+        "awaiting_confirmation": True
+    }
+
+
+def retained_bytes(count: int, customers: list, compact: bool) -> int:
+    """
+    Bytes retained by `count` stored sessions.
+
+    Message logs are built before tracing starts: both representations
+    reference the same MessageLog, so only the rest of the state is compared.
+    """
+    logs = [make_log(i, customers[i % len(customers)]) for i in range(count)]
+
+    gc.collect()
+    tracemalloc.start()
+    held = []
+    for i in range(count):
+        state = make_state(customers[i % len(customers)], logs[i])
+        held.append(SessionState.from_dict(state) if compact else state)
+    state = None
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(held) == count
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with open(DATA_FILE, "r") as f:
+        customers = json.load(f)["customers"]
+
+    dict_bytes = retained_bytes(args.sessions, customers, compact=False)
+    compact_bytes = retained_bytes(args.sessions, customers, compact=True)
+
+    print(f"sessions:          {args.sessions:,} (message logs excluded)")
+    print(f"AgentState dicts:  {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / args.sessions:,.0f} B/session)")
+    print(f"SessionState:      {compact_bytes / 2**20:8.1f} MiB  ({compact_bytes / args.sessions:,.0f} B/session)")
+    print(f"reduction:         {100 * (1 - compact_bytes / dict_bytes):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
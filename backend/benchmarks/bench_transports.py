@@ -0,0 +1,87 @@
+"""Benchmark the downstream lookups of one conversation per service transport."""
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from clients import HttpPool, InProcessServiceClient, HttpServiceClient, ServiceClient
+from services import mock_crm, mock_credit_bureau, mock_offer_mart
+
+CUSTOMER_ID = "CUST001"
+
+
+def start_services() -> str:
+    """Serve the mock services on a free local port; return the base URL."""
+    app = FastAPI()
+    app.include_router(mock_crm.router)
+    app.include_router(mock_credit_bureau.router)
+    app.include_router(mock_offer_mart.router)
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def conversation(client: ServiceClient) -> None:
+    """The lookups a conversation makes: customer + offers, KYC, credit score + offers."""
+    customer = await client.get_customer(CUSTOMER_ID)
+    await client.get_offers(CUSTOMER_ID)
+    await client.verify_kyc(CUSTOMER_ID, phone=customer["data"]["phone"])
+    await client.get_credit_score(CUSTOMER_ID)
+    await client.get_offers(CUSTOMER_ID)
+
+
+class UnpooledHttpServiceClient(HttpServiceClient):
+    """HTTP transport with a fresh client (and connection) per call, for comparison."""
+
+    async def _request(self, method: str, path: str, **kwargs):
+        async with httpx.AsyncClient() as client:
+            response = await client.request(method, f"{self.base_url}{path}", **kwargs)
+        return response.json() if response.status_code == 200 else None
+
+
+async def measure(client: ServiceClient, conversations: int) -> list:
+    await conversation(client)  # warm up
+    timings = []
+    for _ in range(conversations):
+        started = time.perf_counter()
+        await conversation(client)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=500)
+    args = parser.parse_args()
+
+    base_url = start_services()
+    for name, client in (
+        ("inprocess", InProcessServiceClient()),
+        ("http", UnpooledHttpServiceClient(base_url)),
+        ("http pool", HttpServiceClient(base_url, HttpPool()))
+    ):
+        timings = asyncio.run(measure(client, args.conversations))
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{name:<10} mean {statistics.mean(timings):7.3f} ms  "
+            f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms  "
+            f"per conversation (5 lookups)"
+        )
+
+
+if __name__ == "__main__":
+    main()
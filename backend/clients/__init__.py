@@ -0,0 +1,75 @@
+"""Initialize clients package."""
+from typing import Optional
+from clients.http_pool import HttpPool
+from clients.service_client import (
+    ServiceClient,
+    ServiceError,
+    InProcessServiceClient,
+    HttpServiceClient
+)
+from clients.single_flight_client import SingleFlightServiceClient
+from clients.resilient_client import ResilientServiceClient, CircuitOpenError
+from clients.session_data import SessionDataContext
+from clients.batch import fetch_in_batches
+from config import settings
+
+
+def create_service_client(http_pool: Optional[HttpPool] = None) -> ServiceClient:
+    """
+    Create the downstream service client for the configured transport.
+
+    Args:
+        http_pool: Shared connection pool for the HTTP transport (a private
+            pool is created when omitted)
+    """
+    if settings.service_transport == "inprocess":
+        client = InProcessServiceClient()
+    elif settings.service_transport == "http":
+        client = HttpServiceClient(
+            settings.service_base_url or f"http://localhost:{settings.api_port}",
+            pool=http_pool
+        )
+    else:
+        raise ValueError(f"Unknown service transport: {settings.service_transport}")
+
+    if settings.service_resilience_enabled:
+        client = ResilientServiceClient.from_settings(client)
+    if settings.service_single_flight:
+        # Outside the resilience layer, so collapsed callers share one
+        # retried call instead of each retrying
+        client = SingleFlightServiceClient(client)
+    return client
+
+
+def find_client_layer(client: ServiceClient, layer: type) -> Optional[ServiceClient]:
+    """
+    Find a wrapper of the given type in a chain of wrapped service clients.
+
+    Args:
+        client: Outermost client
+        layer: Client class to look for
+
+    Returns:
+        The first client of that type, or None if it is not in the chain
+    """
+    while client is not None:
+        if isinstance(client, layer):
+            return client
+        client = getattr(client, "inner", None)
+    return None
+
+
+__all__ = [
+    "HttpPool",
+    "ServiceClient",
+    "ServiceError",
+    "InProcessServiceClient",
+    "HttpServiceClient",
+    "SingleFlightServiceClient",
+    "ResilientServiceClient",
+    "CircuitOpenError",
+    "SessionDataContext",
+    "create_service_client",
+    "find_client_layer",
+    "fetch_in_batches"
+]
@@ -0,0 +1,45 @@
+"""Batch helper - look up any number of customers through the batch endpoints."""
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+import asyncio
+
+BatchFetch = Callable[[List[str]], Awaitable[Dict[str, Optional[Dict[str, Any]]]]]
+
+
+async def fetch_in_batches(
+    fetch: BatchFetch,
+    customer_ids: Iterable[str],
+    batch_size: int = 500,
+    concurrency: int = 4
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Look up many customers with a ServiceClient batch method.
+
+    IDs are de-duplicated and split into batches no larger than the
+    services accept, and up to `concurrency` batches are in flight at once.
+
+    Example:
+        scores = await fetch_in_batches(client.get_credit_scores_batch, ids)
+
+    Args:
+        fetch: ServiceClient batch method (e.g. get_offers_batch)
+        customer_ids: IDs to look up
+        batch_size: IDs per request (the services accept up to 1000)
+        concurrency: Batches requested concurrently
+
+    Returns:
+        Response body per ID, or None for IDs that were not found
+        (raises ServiceError if any batch request fails)
+    """
+    unique = list(dict.fromkeys(customer_ids))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(batch: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        async with semaphore:
+            return await fetch(batch)
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for batch_result in await asyncio.gather(*(
+        run(unique[i:i + batch_size]) for i in range(0, len(unique), batch_size)
+    )):
+        results.update(batch_result)
+    return results
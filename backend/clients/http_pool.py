@@ -0,0 +1,178 @@
+"""Shared HTTP connection pool for downstream service calls."""
+from typing import Dict, Any, Optional
+import logging
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpPool:
+    """
+    One application-scoped httpx.AsyncClient with bounded connections.
+
+    The client is opened in the FastAPI lifespan (start()) and closed on
+    shutdown (stop()); callers that run outside the app (scripts,
+    benchmarks) get it created on first use. Connections are kept alive
+    and reused across requests, every call is bounded by the configured
+    timeouts, and HTTP/2 is negotiated with TLS services when the `h2`
+    package is installed (plain http:// services stay on HTTP/1.1).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 5.0,
+        write_timeout: float = 5.0,
+        pool_timeout: float = 1.0,
+        http2: bool = True
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout
+        )
+        self.http2 = http2 and self._http2_available()
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.pool_timeouts = 0
+        self.request_timeouts = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls) -> "HttpPool":
+        """Build a pool from the application settings."""
+        return cls(
+            max_connections=settings.http_pool_max_connections,
+            max_keepalive_connections=settings.http_pool_max_keepalive_connections,
+            keepalive_expiry=settings.http_pool_keepalive_expiry,
+            connect_timeout=settings.http_connect_timeout,
+            read_timeout=settings.http_read_timeout,
+            write_timeout=settings.http_write_timeout,
+            pool_timeout=settings.http_pool_timeout,
+            http2=settings.http2_enabled
+        )
+
+    @classmethod
+    def for_llm(cls) -> "HttpPool":
+        """Build the LLM API connection pool from the application settings."""
+        return cls(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.http_pool_keepalive_expiry,
+            connect_timeout=settings.llm_connect_timeout_seconds,
+            read_timeout=settings.llm_timeout_seconds,
+            write_timeout=settings.http_write_timeout,
+            pool_timeout=settings.llm_timeout_seconds,
+            http2=settings.http2_enabled
+        )
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            return False
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Open the shared client."""
+        self.client  # created on access
+
+    async def stop(self) -> None:
+        """Close the shared client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the shared client.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            **kwargs: Passed through to httpx.AsyncClient.request
+
+        Returns:
+            The response (raises httpx.HTTPError subclasses on failure)
+        """
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await self.client.request(method, url, **kwargs)
+        except httpx.PoolTimeout:
+            self.pool_timeouts += 1
+            raise
+        except httpx.TimeoutException:
+            self.request_timeouts += 1
+            raise
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def _connections(self) -> list:
+        # httpcore's pool is not public API; degrade to no connection counts
+        transport = getattr(self._client, "_transport", None)
+        pool = getattr(transport, "_pool", None)
+        return list(getattr(pool, "connections", []))
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool limits, usage and saturation counters."""
+        connections = self._connections()
+        idle = sum(1 for connection in connections if connection.is_idle())
+        max_connections = self.limits.max_connections
+
+        return {
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "limits": {
+                "max_connections": max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry
+            },
+            "timeouts": {
+                "connect": self.timeout.connect,
+                "read": self.timeout.read,
+                "write": self.timeout.write,
+                "pool": self.timeout.pool
+            },
+            "connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "utilization": round((len(connections) - idle) / max_connections, 3) if max_connections else 0,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "pool_timeouts": self.pool_timeouts,
+            "request_timeouts": self.request_timeouts,
+            "errors": self.errors
+        }
@@ -0,0 +1,202 @@
+"""Resilient service client - timeouts, bounded retries and circuit breakers per dependency."""
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+from dataclasses import dataclass
+import asyncio
+import logging
+import random
+
+from clients.service_client import ServiceClient, ServiceError
+from config import settings
+from utils.circuit_breaker import CircuitBreaker, RetryBudget
+
+logger = logging.getLogger(__name__)
+
+# Downstream dependencies, each with its own timeout, retry budget and breaker
+DEPENDENCIES = ("crm", "credit_bureau", "offer_mart")
+
+
+class CircuitOpenError(ServiceError):
+    """Raised without calling the dependency while its circuit is open."""
+
+
+@dataclass
+class DependencyPolicy:
+    """How calls to one dependency are bounded and retried."""
+    timeout: float = 2.0
+    batch_timeout: float = 10.0
+    max_retries: int = 2
+    backoff_base: float = 0.05
+    backoff_max: float = 1.0
+    retry_budget_ratio: float = 0.2
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+
+class _Dependency:
+    """Runtime resilience state of one dependency."""
+
+    def __init__(self, name: str, policy: DependencyPolicy):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self.budget = RetryBudget(policy.retry_budget_ratio)
+
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries from many sessions over the window
+        # instead of having them arrive together
+        return random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * (2 ** attempt)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "timeout": self.policy.timeout,
+            "max_retries": self.policy.max_retries,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "retry_budget": self.budget.stats(),
+            "circuit": self.breaker.stats()
+        }
+
+
+class ResilientServiceClient(ServiceClient):
+    """
+    Wraps another ServiceClient so a slow or dead dependency cannot stall chats.
+
+    Every lookup is bounded by its dependency's timeout. Failures (errors
+    and timeouts; "not found" is an answer, not a failure) are retried
+    with jittered exponential backoff, up to max_retries and only while
+    the dependency's retry budget allows. A circuit breaker per dependency
+    opens after consecutive failures, and lookups then fail fast with
+    CircuitOpenError until a probe call succeeds.
+    """
+
+    def __init__(self, inner: ServiceClient, policies: Optional[Dict[str, DependencyPolicy]] = None):
+        self.inner = inner
+        policies = policies or {}
+        self.dependencies = {
+            name: _Dependency(name, policies.get(name) or DependencyPolicy())
+            for name in DEPENDENCIES
+        }
+
+    @classmethod
+    def from_settings(cls, inner: ServiceClient) -> "ResilientServiceClient":
+        """Wrap a client with the policies from the application settings."""
+        timeouts = {
+            "crm": settings.crm_timeout_seconds,
+            "credit_bureau": settings.credit_bureau_timeout_seconds,
+            "offer_mart": settings.offer_mart_timeout_seconds
+        }
+        return cls(inner, {
+            name: DependencyPolicy(
+                timeout=timeout,
+                batch_timeout=settings.service_batch_timeout_seconds,
+                max_retries=settings.service_max_retries,
+                backoff_base=settings.service_retry_backoff_seconds,
+                backoff_max=settings.service_retry_backoff_max_seconds,
+                retry_budget_ratio=settings.service_retry_budget_ratio,
+                failure_threshold=settings.circuit_failure_threshold,
+                reset_timeout=settings.circuit_reset_timeout_seconds
+            )
+            for name, timeout in timeouts.items()
+        })
+
+    async def _call(self, name: str, fn: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        dependency = self.dependencies[name]
+        dependency.calls += 1
+        dependency.budget.deposit()
+
+        attempt = 0
+        while True:
+            permit = dependency.breaker.allow()
+            if permit is None:
+                raise CircuitOpenError(f"{name} is unavailable (circuit open)")
+
+            try:
+                result = await asyncio.wait_for(fn(), timeout)
+            except asyncio.TimeoutError:
+                dependency.timeouts += 1
+                error = ServiceError(f"{name} did not respond within {timeout:g}s")
+            except ServiceError as e:
+                dependency.errors += 1
+                error = e
+            except asyncio.CancelledError:
+                # The caller went away; that says nothing about the dependency
+                dependency.breaker.abandon(permit)
+                raise
+            except BaseException:
+                # Unexpected errors still count against the dependency, and
+                # must release a half-open probe or the circuit never closes
+                dependency.errors += 1
+                dependency.breaker.record_failure()
+                raise
+            else:
+                dependency.breaker.record_success()
+                return result
+
+            dependency.breaker.record_failure()
+            if attempt >= dependency.policy.max_retries or not dependency.budget.withdraw():
+                raise error
+
+            delay = dependency.backoff(attempt)
+            logger.info("Retrying %s in %.3fs after: %s", name, delay, error)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _timeout(self, name: str) -> float:
+        return self.dependencies[name].policy.timeout
+
+    def _batch_timeout(self, name: str) -> float:
+        return self.dependencies[name].policy.batch_timeout
+
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call(
+            "crm", lambda: self.inner.get_customer(customer_id), self._timeout("crm")
+        )
+
+    async def verify_kyc(
+        self,
+        customer_id: str,
+        phone: Optional[str] = None,
+        address: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        # A read-only check, so safe to retry
+        return await self._call(
+            "crm",
+            lambda: self.inner.verify_kyc(customer_id, phone=phone, address=address),
+            self._timeout("crm")
+        )
+
+    async def get_credit_score(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call(
+            "credit_bureau", lambda: self.inner.get_credit_score(customer_id), self._timeout("credit_bureau")
+        )
+
+    async def get_offers(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call(
+            "offer_mart", lambda: self.inner.get_offers(customer_id), self._timeout("offer_mart")
+        )
+
+    async def get_customers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._call(
+            "crm", lambda: self.inner.get_customers_batch(customer_ids), self._batch_timeout("crm")
+        )
+
+    async def get_credit_scores_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._call(
+            "credit_bureau",
+            lambda: self.inner.get_credit_scores_batch(customer_ids),
+            self._batch_timeout("credit_bureau")
+        )
+
+    async def get_offers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._call(
+            "offer_mart", lambda: self.inner.get_offers_batch(customer_ids), self._batch_timeout("offer_mart")
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Timeouts, retries and circuit state per dependency."""
+        return {name: dependency.stats() for name, dependency in self.dependencies.items()}
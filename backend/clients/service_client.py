@@ -0,0 +1,177 @@
+"""Service clients - how agents reach the CRM, credit bureau and offer mart."""
+from typing import Dict, Any, List, Optional
+from fastapi import HTTPException
+import httpx
+
+from clients.http_pool import HttpPool
+
+
+class ServiceError(Exception):
+    """Raised when a downstream service cannot be reached or fails."""
+
+
+class ServiceClient:
+    """
+    Downstream lookups used by the agents.
+
+    Every method returns the service's JSON response body ({"success": ...,
+    "data": ...}), None when the service answers "not found", and raises
+    ServiceError for any other failure.
+    """
+
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a customer profile from the CRM."""
+        raise NotImplementedError
+
+    async def verify_kyc(
+        self,
+        customer_id: str,
+        phone: Optional[str] = None,
+        address: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Verify KYC details against the CRM."""
+        raise NotImplementedError
+
+    async def get_credit_score(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch a credit score from the credit bureau."""
+        raise NotImplementedError
+
+    async def get_offers(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch pre-approved offers from the offer mart."""
+        raise NotImplementedError
+
+    # Batch lookups map each requested ID to the response body its single
+    # lookup would return, or None when it was not found
+
+    async def get_customers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch many customer profiles from the CRM in one call."""
+        raise NotImplementedError
+
+    async def get_credit_scores_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch many credit scores from the credit bureau in one call."""
+        raise NotImplementedError
+
+    async def get_offers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch many customers' pre-approved offers from the offer mart in one call."""
+        raise NotImplementedError
+
+
+def _batch_results(body: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Split a batch endpoint response into per-ID single-lookup bodies."""
+    return {
+        result["customer_id"]: {"success": True, "data": result["data"]} if result["success"] else None
+        for result in body["data"]
+    }
+
+
+class InProcessServiceClient(ServiceClient):
+    """
+    Calls the mock service route handlers directly.
+
+    Used when the mock services are mounted in this same process: no socket,
+    HTTP parsing or JSON round trip, and no server worker slot is consumed.
+    """
+
+    async def _call(self, handler, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        try:
+            return await handler(*args, **kwargs)
+        except HTTPException as e:
+            if e.status_code == 404:
+                return None
+            raise ServiceError(f"{handler.__name__} failed with status {e.status_code}: {e.detail}")
+        except Exception as e:
+            raise ServiceError(f"{handler.__name__} failed: {e}") from e
+
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        from services import mock_crm
+        return await self._call(mock_crm.get_customer, customer_id)
+
+    async def verify_kyc(
+        self,
+        customer_id: str,
+        phone: Optional[str] = None,
+        address: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        from services import mock_crm
+        return await self._call(mock_crm.verify_kyc, customer_id, phone=phone, address=address)
+
+    async def get_credit_score(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        from services import mock_credit_bureau
+        return await self._call(mock_credit_bureau.get_credit_score, customer_id)
+
+    async def get_offers(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        from services import mock_offer_mart
+        return await self._call(mock_offer_mart.get_preapproved_offers, customer_id)
+
+    async def _call_batch(self, handler, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        from services.batch import BatchLookupRequest
+        return _batch_results(await self._call(handler, BatchLookupRequest(customer_ids=customer_ids)))
+
+    async def get_customers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        from services import mock_crm
+        return await self._call_batch(mock_crm.get_customers_batch, customer_ids)
+
+    async def get_credit_scores_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        from services import mock_credit_bureau
+        return await self._call_batch(mock_credit_bureau.get_credit_scores_batch, customer_ids)
+
+    async def get_offers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        from services import mock_offer_mart
+        return await self._call_batch(mock_offer_mart.get_preapproved_offers_batch, customer_ids)
+
+
+class HttpServiceClient(ServiceClient):
+    """Calls the services over HTTP (for services running elsewhere)."""
+
+    def __init__(self, base_url: str, pool: Optional[HttpPool] = None):
+        self.base_url = base_url.rstrip("/")
+        self.pool = pool or HttpPool.from_settings()
+
+    async def _request(self, method: str, path: str, **kwargs) -> Optional[Dict[str, Any]]:
+        try:
+            response = await self.pool.request(method, f"{self.base_url}{path}", **kwargs)
+        except httpx.HTTPError as e:
+            raise ServiceError(f"{method} {path} failed: {e}") from e
+
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise ServiceError(f"{method} {path} failed with status {response.status_code}")
+        return response.json()
+
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self._request("GET", f"/api/crm/customer/{customer_id}")
+
+    async def verify_kyc(
+        self,
+        customer_id: str,
+        phone: Optional[str] = None,
+        address: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        params = {"customer_id": customer_id}
+        if phone:
+            params["phone"] = phone
+        if address:
+            params["address"] = address
+        return await self._request("POST", "/api/crm/verify-kyc", params=params)
+
+    async def get_credit_score(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self._request("GET", f"/api/credit-bureau/score/{customer_id}")
+
+    async def get_offers(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self._request("GET", f"/api/offers/preapproved/{customer_id}")
+
+    async def _request_batch(self, path: str, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        body = await self._request("POST", path, json={"customer_ids": customer_ids})
+        if body is None:
+            raise ServiceError(f"POST {path} is not available")
+        return _batch_results(body)
+
+    async def get_customers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._request_batch("/api/crm/customers/batch", customer_ids)
+
+    async def get_credit_scores_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._request_batch("/api/credit-bureau/scores/batch", customer_ids)
+
+    async def get_offers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self._request_batch("/api/offers/preapproved/batch", customer_ids)
@@ -0,0 +1,155 @@
+"""Session data context - per-session memoization of downstream lookups."""
+from typing import Dict, Any, List, Optional
+import asyncio
+import time
+
+from clients.service_client import ServiceClient, ServiceError
+
+# Sources memoized per session; KYC checks depend on their arguments and
+# are always passed through
+SOURCES = ("customer", "credit_score", "offers")
+
+# The credit report fields underwriting reads; only these are kept in the
+# session (the full bureau report never reaches the session store)
+CREDIT_FIELDS = ("credit_score", "rating")
+
+
+class SessionDataContext(ServiceClient):
+    """
+    ServiceClient view over one session that fetches each source at most once.
+
+    What has been fetched is recorded in state["data_fetched"] as
+    {source: {"customer_id", "version", "fetched_at", "found", "hits"}}, so
+    it survives between requests with the rest of the session. Payloads
+    live where the agents already keep them (customer_data and
+    pre_approved_offers); of the credit report only CREDIT_FIELDS are kept,
+    in its entry.
+    "Not found" answers are memoized too; failures are recorded (with an
+    "error" field) but retried on the next lookup. invalidate() makes the
+    next lookup of a source go downstream again.
+    """
+
+    def __init__(self, inner: ServiceClient, state: Dict[str, Any]):
+        self.inner = inner
+        self.state = state
+        # Copied so stores that diff the previous state see the changes
+        self.entries: Dict[str, Dict[str, Any]] = {
+            source: dict(entry) for source, entry in (state.get("data_fetched") or {}).items()
+        }
+        state["data_fetched"] = self.entries
+
+    def _fresh(self, source: str, customer_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(source)
+        if entry is None or entry["customer_id"] != customer_id or "error" in entry:
+            return None
+        return entry
+
+    def _record(self, source: str, customer_id: str, found: bool) -> Dict[str, Any]:
+        previous = self.entries.get(source)
+        entry = {
+            "customer_id": customer_id,
+            "version": (previous["version"] + 1) if previous else 1,
+            "fetched_at": time.time(),
+            "found": found,
+            "hits": 0
+        }
+        self.entries[source] = entry
+        return entry
+
+    def invalidate(self, source: Optional[str] = None) -> None:
+        """
+        Forget fetched data so it is looked up again.
+
+        Args:
+            source: One of SOURCES, or None for all of them
+        """
+        for name in ([source] if source else SOURCES):
+            entry = self.entries.get(name)
+            if entry is not None:
+                # Keep the version so a refetch is numbered after it
+                entry["customer_id"] = None
+
+    async def prefetch(self, customer_id: str) -> Dict[str, str]:
+        """
+        Fetch the customer profile, credit score and offers concurrently.
+
+        Sources already fetched for this customer are not looked up again.
+
+        Args:
+            customer_id: Customer ID
+
+        Returns:
+            Error message per source that failed (empty if all succeeded)
+        """
+        results = await asyncio.gather(
+            self.get_customer(customer_id),
+            self.get_credit_score(customer_id),
+            self.get_offers(customer_id),
+            return_exceptions=True
+        )
+
+        errors = {}
+        for source, result in zip(SOURCES, results):
+            if isinstance(result, ServiceError):
+                self._record(source, customer_id, False)["error"] = str(result)
+                errors[source] = str(result)
+            elif isinstance(result, BaseException):
+                raise result
+        return errors
+
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._fresh("customer", customer_id)
+        if entry is not None and (self.state.get("customer_data") or not entry["found"]):
+            entry["hits"] += 1
+            return {"success": True, "data": self.state["customer_data"]} if entry["found"] else None
+
+        response = await self.inner.get_customer(customer_id)
+        self._record("customer", customer_id, response is not None)
+        if response is not None:
+            self.state["customer_data"] = response["data"]
+        return response
+
+    async def verify_kyc(
+        self,
+        customer_id: str,
+        phone: Optional[str] = None,
+        address: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return await self.inner.verify_kyc(customer_id, phone=phone, address=address)
+
+    async def get_credit_score(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._fresh("credit_score", customer_id)
+        # Entries stored before reports were trimmed have no "report"; refetch those
+        if entry is not None and ("report" in entry or not entry["found"]):
+            entry["hits"] += 1
+            if not entry["found"]:
+                return None
+            return {"success": True, "data": dict(entry["report"], customer_id=customer_id)}
+
+        response = await self.inner.get_credit_score(customer_id)
+        entry = self._record("credit_score", customer_id, response is not None)
+        if response is not None:
+            data = response["data"]
+            entry["report"] = {field: data[field] for field in CREDIT_FIELDS if field in data}
+        return response
+
+    async def get_offers(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._fresh("offers", customer_id)
+        if entry is not None and (self.state.get("pre_approved_offers") or not entry["found"]):
+            entry["hits"] += 1
+            return self.state["pre_approved_offers"] if entry["found"] else None
+
+        response = await self.inner.get_offers(customer_id)
+        self._record("offers", customer_id, response is not None)
+        if response is not None:
+            self.state["pre_approved_offers"] = response
+        return response
+
+    async def get_customers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self.inner.get_customers_batch(customer_ids)
+
+    async def get_credit_scores_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self.inner.get_credit_scores_batch(customer_ids)
+
+    async def get_offers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self.inner.get_offers_batch(customer_ids)
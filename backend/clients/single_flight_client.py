@@ -0,0 +1,70 @@
+"""Single-flight service client - concurrent identical lookups share one call."""
+from typing import Dict, Any, List, Optional
+
+from clients.service_client import ServiceClient
+from utils.single_flight import SingleFlight
+
+
+class SingleFlightServiceClient(ServiceClient):
+    """
+    Wraps another ServiceClient so identical concurrent lookups share one call.
+
+    When many sessions ask for the same customer at the same moment (e.g. a
+    campaign launch), the first lookup goes downstream and the rest await
+    its result. Results are not kept after the call completes, so a cache
+    can be layered on either side of this client.
+    """
+
+    def __init__(self, inner: ServiceClient):
+        self.inner = inner
+        self.flights = {
+            "customer": SingleFlight(),
+            "kyc": SingleFlight(),
+            "credit_score": SingleFlight(),
+            "offers": SingleFlight()
+        }
+
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self.flights["customer"].do(
+            customer_id, lambda: self.inner.get_customer(customer_id)
+        )
+
+    async def verify_kyc(
+        self,
+        customer_id: str,
+        phone: Optional[str] = None,
+        address: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return await self.flights["kyc"].do(
+            (customer_id, phone, address),
+            lambda: self.inner.verify_kyc(customer_id, phone=phone, address=address)
+        )
+
+    async def get_credit_score(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self.flights["credit_score"].do(
+            customer_id, lambda: self.inner.get_credit_score(customer_id)
+        )
+
+    async def get_offers(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        return await self.flights["offers"].do(
+            customer_id, lambda: self.inner.get_offers(customer_id)
+        )
+
+    # Batches are passed through; they are rarely identical
+    async def get_customers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self.inner.get_customers_batch(customer_ids)
+
+    async def get_credit_scores_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self.inner.get_credit_scores_batch(customer_ids)
+
+    async def get_offers_batch(self, customer_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return await self.inner.get_offers_batch(customer_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-lookup calls made downstream and calls collapsed into them."""
+        stats = {name: flight.stats() for name, flight in self.flights.items()}
+        stats["total"] = {
+            "calls": sum(s["calls"] for s in stats.values()),
+            "collapsed": sum(s["collapsed"] for s in stats.values())
+        }
+        return stats
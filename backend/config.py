@@ -1,4 +1,5 @@
 """Configuration management for the application."""
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 
@@ -6,9 +7,51 @@ from typing import Optional
 class Settings(BaseSettings):
     """Application settings."""
     
-    # Perplexity AI Configuration
-    perplexity_api_key: str
+    # Perplexity AI Configuration (the key is only required for the
+    # "perplexity" backend; "mock" uses the offline stub in services/mock_llm.py,
+    # served by this API unless mock_llm_base_url points at a standalone one)
+    perplexity_api_key: Optional[str] = None
     perplexity_model: str = "sonar"
+    llm_backend: str = "perplexity"
+    llm_base_url: str = "https://api.perplexity.ai"
+    mock_llm_base_url: Optional[str] = None
+    # Per-session LLM call budget (token bucket kept in session state): a
+    # burst of llm_session_burst calls, refilled at llm_session_calls_per_minute,
+    # at most llm_session_max_calls per session
+    llm_session_calls_per_minute: float = 12.0
+    llm_session_burst: int = 5
+    llm_session_max_calls: int = 20
+    llm_session_max_wait_seconds: float = 2.0
+    # Provider-wide quota shared by all sessions, sized to the API plan (0 disables)
+    llm_provider_calls_per_minute: float = 0.0
+    llm_provider_burst: int = 10
+    llm_provider_max_wait_seconds: float = 10.0
+    # Per-call deadline and retries, and the shared LLM connection pool
+    llm_timeout_seconds: float = 30.0
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_retries: int = 2
+    llm_max_connections: int = 50
+    llm_max_keepalive_connections: int = 20
+    # LLM scheduler: at most llm_max_concurrency requests in flight, the rest
+    # queued by funnel stage; a request that cannot start within
+    # llm_queue_budget_seconds, or does not finish within llm_timeout_seconds,
+    # is answered with a deterministic fallback reply (or a busy message when
+    # llm_degrade_when_busy is off)
+    llm_max_concurrency: int = 8
+    llm_max_queue_depth: int = 200
+    llm_queue_budget_seconds: float = 5.0
+    llm_degrade_when_busy: bool = True
+    # Pause used when the provider answers 429 without a Retry-After header
+    llm_default_retry_after_seconds: float = 1.0
+    # Cache of sales replies to customer-neutral turns, keyed by the last
+    # llm_cache_turns messages; turns mentioning amounts are never cached
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1000
+    llm_cache_ttl_seconds: float = 600
+    llm_cache_turns: int = 2
+    # Confirm a loan request stated in full in one message ("3 lakhs for 24
+    # months") without an LLM call, when it is within the customer's offers
+    sales_fast_path_enabled: bool = True
     
     # FastAPI Configuration
     api_host: str = "0.0.0.0"
@@ -23,11 +66,97 @@ class Settings(BaseSettings):
     mock_credit_bureau_enabled: bool = True
     mock_offer_mart_enabled: bool = True
     
+    # Downstream Service Transport ("inprocess" calls the mock routers directly,
+    # "http" calls service_base_url, defaulting to this API's own port)
+    service_transport: str = "inprocess"
+    service_base_url: Optional[str] = None
+    # Concurrent identical lookups share one downstream call
+    service_single_flight: bool = True
+    # Fetch profile, credit score and offers concurrently once the customer is known
+    prefetch_applicant_data: bool = True
+    
+    # Downstream Resilience (per-dependency timeouts, jittered retries
+    # bounded by a retry budget, and circuit breakers)
+    service_resilience_enabled: bool = True
+    crm_timeout_seconds: float = 2.0
+    credit_bureau_timeout_seconds: float = 3.0
+    offer_mart_timeout_seconds: float = 2.0
+    service_batch_timeout_seconds: float = 10.0
+    service_max_retries: int = 2
+    service_retry_backoff_seconds: float = 0.05
+    service_retry_backoff_max_seconds: float = 1.0
+    service_retry_budget_ratio: float = 0.2
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout_seconds: float = 30.0
+    
+    # Mock LLM behaviour: time to first token drawn from
+    # mock_llm_latency_distribution ("fixed", "uniform", "lognormal" or
+    # "exponential") around mock_llm_latency_ms, replies at
+    # mock_llm_tokens_per_second (0 for instant), injected 429s and 500s,
+    # 429s beyond mock_llm_max_concurrency requests (0 for no limit), and
+    # optional scripted replies (JSON list of {"match": regex, "reply": text})
+    mock_llm_latency_ms: float = 300.0
+    mock_llm_latency_distribution: str = "lognormal"
+    mock_llm_latency_spread: float = 0.3
+    mock_llm_tokens_per_second: float = 50.0
+    mock_llm_error_rate: float = 0.0
+    mock_llm_rate_limit_rate: float = 0.0
+    mock_llm_retry_after_seconds: float = 1.0
+    mock_llm_max_concurrency: int = 0
+    mock_llm_seed: Optional[int] = None
+    mock_llm_script_path: Optional[str] = None
+    
+    # Mock service fault injection (latency and 503 rate per lookup;
+    # mock_fault_services is a comma-separated subset of crm,
+    # credit_bureau, offer_mart - empty means all)
+    mock_fault_latency_ms: float = 0.0
+    mock_fault_error_rate: float = 0.0
+    mock_fault_services: str = ""
+    
+    # Shared HTTP client pool (used by the "http" transport)
+    http_pool_max_connections: int = 100
+    http_pool_max_keepalive_connections: int = 20
+    http_pool_keepalive_expiry: float = 30.0
+    http_connect_timeout: float = 2.0
+    http_read_timeout: float = 5.0
+    http_write_timeout: float = 5.0
+    http_pool_timeout: float = 1.0
+    http2_enabled: bool = True
+    
+    # Customer Data Store ("json" loads data/customers.json into memory,
+    # "sqlite" queries customer_db_path, "binary" memory-maps
+    # customer_snapshot_path; both are built from the JSON if missing)
+    customer_store_backend: str = "json"
+    customer_db_path: Optional[str] = None
+    customer_snapshot_path: Optional[str] = None
+    customer_db_pool_size: int = 4
+    
+    # Session Storage
+    session_backend: str = "memory"
+    session_max_count: int = 10000
+    session_ttl_seconds: float = 1800
+    session_sweep_interval_seconds: float = 60
+    redis_url: str = "redis://localhost:6379/0"
+    session_journal_enabled: bool = False
+    session_journal_dir: str = "session_journal"
+    session_journal_snapshot_every: int = 50000
+    session_journal_fsync: bool = False
+    session_lock_max_keys: int = 10000
+    chat_coalesce_duplicates: bool = True
+
     # Business Rules
     min_credit_score: int = 700
     max_emi_to_salary_ratio: float = 0.5
     conditional_approval_multiplier: int = 2
     
+    @model_validator(mode="after")
+    def _require_llm_key(self) -> "Settings":
+        if self.llm_backend not in ("perplexity", "mock"):
+            raise ValueError(f"Unknown LLM_BACKEND: {self.llm_backend}")
+        if self.llm_backend == "perplexity" and not self.perplexity_api_key:
+            raise ValueError("PERPLEXITY_API_KEY is required unless LLM_BACKEND=mock")
+        return self
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
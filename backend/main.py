@@ -1,21 +1,77 @@
 """FastAPI main application."""
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
+from contextlib import asynccontextmanager
+import json
 import uuid
 from pathlib import Path
 
 from config import settings
-from services import mock_crm, mock_credit_bureau, mock_offer_mart
+from services import mock_crm, mock_credit_bureau, mock_offer_mart, mock_llm
+from services.customer_repository import close_customer_store, get_customer_store
+from services.fault_injection import faults
 from agents.master_agent import MasterAgent
+from clients import (
+    HttpPool,
+    ResilientServiceClient,
+    SingleFlightServiceClient,
+    create_service_client,
+    find_client_layer
+)
+from sessions import create_session_store, SessionConflictError
+from sessions.locks import KeyedLock, LockTableFullError
+from sessions.message_log import MessageLog
+from utils.single_flight import SingleFlight
+
+# Session storage (bounded in-memory store by default)
+session_store = create_session_store()
+
+# One pooled HTTP client shared by every agent's downstream calls
+http_pool = HttpPool.from_settings()
+
+# A separate pool for the LLM API, so slow completions cannot starve service lookups
+llm_pool = HttpPool.for_llm()
+
+# Requests on one session run one at a time; different sessions run in parallel
+session_locks = KeyedLock(max_keys=settings.session_lock_max_keys)
+
+# Duplicate chat messages in flight for the same session share one response
+chat_coalescer = SingleFlight()
+
+
+@asynccontextmanager
+async def locked_session(session_id: str):
+    """Hold a session's lock, rejecting the request if too many sessions are busy."""
+    try:
+        async with session_locks.lock(session_id):
+            yield
+    except LockTableFullError:
+        raise HTTPException(status_code=503, detail="Server is busy. Please retry shortly.")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop application-scoped resources."""
+    await session_store.start()
+    await get_customer_store().start()
+    await http_pool.start()
+    await llm_pool.start()
+    yield
+    await llm_pool.stop()
+    await http_pool.stop()
+    await session_store.stop()
+    close_customer_store()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="NBFC Loan Sales Chatbot API",
     description="Agentic AI system for personal loan sales",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -31,12 +87,11 @@ app.add_middleware(
 app.include_router(mock_crm.router)
 app.include_router(mock_credit_bureau.router)
 app.include_router(mock_offer_mart.router)
+if settings.llm_backend == "mock":
+    app.include_router(mock_llm.router)
 
 # Initialize Master Agent
-master_agent = MasterAgent()
-
-# In-memory session storage (in production, use Redis or database)
-sessions: Dict[str, Dict[str, Any]] = {}
+master_agent = MasterAgent(service_client=create_service_client(http_pool), llm_pool=llm_pool)
 
 
 # Request/Response Models
@@ -45,6 +100,8 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = None
     customer_id: Optional[str] = None
     message: str
+    # Return only messages from this index on (None = full history)
+    since_index: Optional[int] = None
 
 
 class ChatResponse(BaseModel):
@@ -56,12 +113,40 @@ class ChatResponse(BaseModel):
     conversation_complete: bool = False
     sanction_letter_available: bool = False
     quick_replies: list = []
+    # Index of the first message in `messages` and of the next message to request
+    since_index: int = 0
+    next_index: int = 0
 
 
 class SalarySlipUpload(BaseModel):
     """Salary slip upload request."""
     session_id: str
     salary_amount: float
+    since_index: Optional[int] = None
+
+
+def message_window(messages: list, since_index: Optional[int]) -> Dict[str, Any]:
+    """
+    Slice the conversation for a (possibly incremental) response.
+    
+    Args:
+        messages: Full conversation history
+        since_index: First message index the client is missing, or None for full history
+        
+    Returns:
+        Response fields: messages, since_index and next_index
+    """
+    total = len(messages)
+    
+    # Unknown cursor (e.g. session was reset) - fall back to the full history
+    if since_index is None or since_index < 0 or since_index > total:
+        since_index = 0
+    
+    return {
+        "messages": messages[since_index:],
+        "since_index": since_index,
+        "next_index": total
+    }
 
 
 # API Endpoints
@@ -95,37 +180,119 @@ async def chat(request: ChatRequest):
     # Get or create session
     session_id = request.session_id or str(uuid.uuid4())
     
-    if session_id not in sessions:
-        sessions[session_id] = {}
+    # A double tap sends the same message twice; answer both from one agent run
+    if settings.chat_coalesce_duplicates and request.session_id:
+        key = (session_id, request.message, request.since_index)
+        return await chat_coalescer.do(key, lambda: _process_chat(session_id, request))
+    
+    return await _process_chat(session_id, request)
+
+
+async def _load_chat_state(session_id: str, request: ChatRequest) -> Dict[str, Any]:
+    """Get the session's state, initializing it for a new session."""
+    state = await session_store.get(session_id)
+    
+    if state is None:
+        state = {}
         
         # If customer ID provided, initialize with customer data
         if request.customer_id:
-            sessions[session_id] = await master_agent.set_customer_id(
+            state = await master_agent.set_customer_id(
                 request.customer_id,
-                sessions[session_id]
+                state
             )
     
-    # Process message
-    try:
-        updated_state = await master_agent.process_message(
-            request.message,
-            sessions[session_id]
-        )
+    return state
+
+
+def _chat_response(session_id: str, state: Dict[str, Any], since_index: Optional[int]) -> ChatResponse:
+    """Build the chat response for a session's state after a turn."""
+    return ChatResponse(
+        session_id=session_id,
+        **message_window(state.get("messages", []), since_index),
+        current_stage=state.get("current_stage", "sales"),
+        requires_salary_slip=state.get("requires_salary_slip", False),
+        conversation_complete=state.get("conversation_complete", False),
+        sanction_letter_available=bool(state.get("sanction_letter_path")),
+        quick_replies=state.get("quick_replies", [])
+    )
+
+
+async def _process_chat(session_id: str, request: ChatRequest) -> ChatResponse:
+    """Run one chat turn while holding the session's lock."""
+    async with locked_session(session_id):
+        state = await _load_chat_state(session_id, request)
         
-        sessions[session_id] = updated_state
+        # Process message
+        try:
+            updated_state = await master_agent.process_message(
+                request.message,
+                state
+            )
+            
+            await session_store.put(session_id, updated_state)
+            
+            return _chat_response(session_id, updated_state, request.since_index)
         
-        return ChatResponse(
-            session_id=session_id,
-            messages=updated_state.get("messages", []),
-            current_stage=updated_state.get("current_stage", "sales"),
-            requires_salary_slip=updated_state.get("requires_salary_slip", False),
-            conversation_complete=updated_state.get("conversation_complete", False),
-            sanction_letter_available=bool(updated_state.get("sanction_letter_path")),
-            quick_replies=updated_state.get("quick_replies", [])
-        )
+        except SessionConflictError:
+            raise HTTPException(status_code=409, detail="Session was updated by another request. Please retry.")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Chat endpoint that streams the assistant's reply as Server-Sent Events.
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+    Events:
+        token: {"delta": text} for each piece of the sales agent's reply,
+            never including the COLLECT_COMPLETE marker
+        state: the same body /api/chat returns, sent once the turn is
+            complete and saved; its messages are authoritative
+        error: {"status": code, "detail": message} if the turn failed
+    
+    Args:
+        request: Chat request with message and optional session/customer ID
+        
+    Returns:
+        text/event-stream response
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    
+    async def events():
+        try:
+            async with locked_session(session_id):
+                state = await _load_chat_state(session_id, request)
+                
+                updated_state = state
+                async for kind, value in master_agent.stream_message(request.message, state):
+                    if kind == "token":
+                        yield _sse("token", {"delta": value})
+                    else:
+                        updated_state = value
+                
+                await session_store.put(session_id, updated_state)
+                yield _sse("state", _chat_response(session_id, updated_state, request.since_index).model_dump())
+        
+        except SessionConflictError:
+            yield _sse("error", {"status": 409, "detail": "Session was updated by another request. Please retry."})
+        except HTTPException as e:
+            yield _sse("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            yield _sse("error", {"status": 500, "detail": f"Error processing message: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.post("/api/upload-salary-slip")
@@ -135,34 +302,39 @@ async def upload_salary_slip(request: SalarySlipUpload):
     
     Args:
         request: Salary slip upload with session ID and salary amount
-        
+    
     Returns:
         Updated chat state after reprocessing underwriting
     """
     session_id = request.session_id
     
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    try:
-        updated_state = await master_agent.upload_salary_slip(
-            request.salary_amount,
-            sessions[session_id]
-        )
+    async with locked_session(session_id):
+        state = await session_store.get(session_id)
         
-        sessions[session_id] = updated_state
+        if state is None:
+            raise HTTPException(status_code=404, detail="Session not found")
         
-        return ChatResponse(
-            session_id=session_id,
-            messages=updated_state.get("messages", []),
-            current_stage=updated_state.get("current_stage", "underwriting"),
-            requires_salary_slip=updated_state.get("requires_salary_slip", False),
-            conversation_complete=updated_state.get("conversation_complete", False),
-            sanction_letter_available=bool(updated_state.get("sanction_letter_path"))
-        )
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing salary slip: {str(e)}")
+        try:
+            updated_state = await master_agent.upload_salary_slip(
+                request.salary_amount,
+                state
+            )
+            
+            await session_store.put(session_id, updated_state)
+            
+            return ChatResponse(
+                session_id=session_id,
+                **message_window(updated_state.get("messages", []), request.since_index),
+                current_stage=updated_state.get("current_stage", "underwriting"),
+                requires_salary_slip=updated_state.get("requires_salary_slip", False),
+                conversation_complete=updated_state.get("conversation_complete", False),
+                sanction_letter_available=bool(updated_state.get("sanction_letter_path"))
+            )
+        
+        except SessionConflictError:
+            raise HTTPException(status_code=409, detail="Session was updated by another request. Please retry.")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing salary slip: {str(e)}")
 
 
 @app.get("/api/download-sanction-letter/{session_id}")
@@ -176,10 +348,12 @@ async def download_sanction_letter(session_id: str):
     Returns:
         PDF file
     """
-    if session_id not in sessions:
+    state = await session_store.get(session_id)
+    
+    if state is None:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    sanction_letter_path = sessions[session_id].get("sanction_letter_path")
+    sanction_letter_path = state.get("sanction_letter_path")
     
     if not sanction_letter_path or not Path(sanction_letter_path).exists():
         raise HTTPException(status_code=404, detail="Sanction letter not found")
@@ -202,10 +376,10 @@ async def get_session(session_id: str):
     Returns:
         Session state
     """
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
+    state = await session_store.get(session_id)
     
-    state = sessions[session_id]
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
     
     return {
         "session_id": session_id,
@@ -230,13 +404,116 @@ async def delete_session(session_id: str):
     Returns:
         Success message
     """
-    if session_id in sessions:
-        del sessions[session_id]
+    if await session_store.delete(session_id):
         return {"message": "Session deleted successfully"}
     
     raise HTTPException(status_code=404, detail="Session not found")
 
 
+@app.get("/api/sessions/stats")
+async def session_stats():
+    """
+    Get session store statistics (active sessions, evictions).
+    
+    Returns:
+        Session store counters
+    """
+    stats = session_store.stats()
+    stats["locks"] = session_locks.stats()
+    stats["chat_coalescing"] = chat_coalescer.stats()
+    return stats
+
+
+@app.get("/api/diagnostics/http-pool")
+async def http_pool_stats():
+    """
+    Get shared HTTP client pool statistics (limits, connections, saturation).
+    
+    Returns:
+        Pool statistics
+    """
+    return http_pool.stats()
+
+
+@app.get("/api/diagnostics/llm")
+async def llm_stats():
+    """
+    Get LLM client statistics (calls, concurrency, latency, rate limiting,
+    scheduler queue depth and wait times, response cache hit rate) and how
+    sales turns were answered (fast path, LLM or degraded) with latency.
+    
+    Returns:
+        Sales agent call statistics, its scheduler, response cache and
+        connection pool usage, and sales turns by path
+    """
+    sales_agent = master_agent.sales_agent
+    return {
+        "calls": sales_agent.stats(),
+        "scheduler": sales_agent.scheduler.stats(),
+        "cache": sales_agent.response_cache.stats() if sales_agent.response_cache else None,
+        "sales_paths": master_agent.sales_path_stats(),
+        "pool": llm_pool.stats()
+    }
+
+
+@app.get("/api/diagnostics/single-flight")
+async def single_flight_stats():
+    """
+    Get downstream lookup coalescing statistics.
+    
+    Returns:
+        Calls made and calls collapsed per lookup type
+    """
+    client = find_client_layer(master_agent.service_client, SingleFlightServiceClient)
+    return client.stats() if client else {"enabled": False}
+
+
+@app.get("/api/diagnostics/resilience")
+async def resilience_stats():
+    """
+    Get downstream timeout, retry and circuit breaker state per dependency.
+    
+    Returns:
+        Per-dependency counters, retry budget and circuit state, plus the
+        faults currently injected into the mock services
+    """
+    client = find_client_layer(master_agent.service_client, ResilientServiceClient)
+    return {
+        "enabled": client is not None,
+        "dependencies": client.stats() if client else {},
+        "injected_faults": faults.stats()
+    }
+
+
+@app.post("/api/diagnostics/faults/{service}")
+async def inject_faults(
+    service: str,
+    latency_ms: Optional[float] = None,
+    error_rate: Optional[float] = None
+):
+    """
+    Inject latency and errors into a mock service (debug mode only).
+    
+    Args:
+        service: crm, credit_bureau or offer_mart
+        latency_ms: Delay added to every lookup
+        error_rate: Fraction of lookups failed with a 503 (0 to 1)
+        
+    Returns:
+        The service's fault configuration
+    """
+    if not settings.debug:
+        raise HTTPException(status_code=403, detail="Fault injection is only available in debug mode")
+    try:
+        return faults.configure(
+            service,
+            latency_seconds=latency_ms / 1000 if latency_ms is not None else None,
+            error_rate=error_rate
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @app.post("/api/start-conversation")
 async def start_conversation(customer_id: str):
     """
@@ -249,29 +526,26 @@ async def start_conversation(customer_id: str):
         New session with greeting
     """
     session_id = str(uuid.uuid4())
-    sessions[session_id] = {}
     
     # Initialize with customer data
-    sessions[session_id] = await master_agent.set_customer_id(
-        customer_id,
-        sessions[session_id]
-    )
+    state = await master_agent.set_customer_id(customer_id, {})
     
     # Generate greeting
-    customer_name = sessions[session_id].get("customer_data", {}).get("name", "Valued Customer")
+    customer_name = state.get("customer_data", {}).get("name", "Valued Customer")
     greeting = f"""Hello {customer_name.split()[0]}! 👋
 
 Welcome to Tata Capital Personal Loans. I'm here to help you get a personal loan quickly and easily.
 
 I can see you have some exclusive pre-approved offers! Would you like to explore them?"""
     
-    sessions[session_id]["messages"] = [
+    state["messages"] = MessageLog([
         {"role": "assistant", "content": greeting}
-    ]
+    ])
+    await session_store.put(session_id, state)
     
     return ChatResponse(
         session_id=session_id,
-        messages=sessions[session_id]["messages"],
+        **message_window(state["messages"], None),
         current_stage="sales",
         requires_salary_slip=False,
         conversation_complete=False,
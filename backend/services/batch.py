@@ -0,0 +1,56 @@
+"""Batch lookups shared by the mock CRM, credit bureau and offer mart."""
+from typing import Dict, Any, Callable, List
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from services.customer_repository import get_customer_store
+
+# Largest number of customer IDs accepted in one batch request
+MAX_BATCH_SIZE = 1000
+
+
+class BatchLookupRequest(BaseModel):
+    """Batch lookup request."""
+    customer_ids: List[str]
+
+
+async def batch_lookup(
+    request: BatchLookupRequest,
+    build: Callable[[Dict[str, Any]], Dict[str, Any]],
+    not_found: str
+) -> Dict[str, Any]:
+    """
+    Resolve a batch of customer IDs with a single store lookup.
+
+    Args:
+        request: IDs to look up (duplicates are answered once each)
+        build: Builds one customer's response data from its record
+        not_found: Error message for IDs that are not found
+
+    Returns:
+        One result per requested ID, in request order, each either
+        {"customer_id", "success": True, "data"} or
+        {"customer_id", "success": False, "error"}
+    """
+    if len(request.customer_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BATCH_SIZE} customer IDs per batch"
+        )
+
+    customers = await get_customer_store().find_many(request.customer_ids)
+
+    results = []
+    for customer_id in request.customer_ids:
+        customer = customers.get(customer_id)
+        if customer is None:
+            results.append({"customer_id": customer_id, "success": False, "error": not_found})
+        else:
+            results.append({"customer_id": customer_id, "success": True, "data": build(customer)})
+
+    return {
+        "success": True,
+        "found": len(customers),
+        "missing": sum(1 for result in results if not result["success"]),
+        "data": results
+    }
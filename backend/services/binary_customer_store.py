@@ -0,0 +1,385 @@
+"""Memory-mapped binary customer snapshot - one shared copy for all worker processes."""
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from array import array
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from services.customer_repository import (
+    CustomerStore,
+    FrozenDict,
+    DATA_FILE,
+    freeze,
+    normalize_phone,
+    summarize
+)
+from services.sqlite_customer_store import iter_customers_json
+
+MAGIC = b"CUSTSNP2"
+
+# magic, record count, hash table slots, then section offsets:
+# strings, records, customer_id index, phone index, customer_id order
+_HEADER = struct.Struct("<8sIIQQQQQ")
+
+# Per customer: strings offset, strings length, length of the JSON tail,
+# age, credit_score, pre_approved_limit, salary
+_RECORD = struct.Struct("<QIIiidd")
+
+_SLOT = struct.Struct("<I")
+
+# String fields, in the order they are joined (NUL-separated) in the strings section
+_STRING_FIELDS = (
+    "customer_id", "name", "city", "phone", "email", "address", "employment_type", "company"
+)
+_PACKED_FIELDS = frozenset(_STRING_FIELDS) | {"age", "credit_score", "pre_approved_limit", "salary"}
+
+# Key order of records in customers.json, reproduced on read
+_FIELD_ORDER = (
+    "customer_id", "name", "age", "city", "phone", "email", "address", "credit_score",
+    "existing_loans", "pre_approved_limit", "salary", "employment_type", "company"
+)
+
+
+def _key_hash(key: str) -> int:
+    # Stable across processes (unlike hash()), so every worker reads the same table
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def _number(value: float):
+    return int(value) if value.is_integer() else value
+
+
+def _build_table(hashes: array, slots: int) -> bytes:
+    """Linear-probing table of record_number + 1 (0 marks an empty slot)."""
+    table = array("I", bytes(4 * slots))
+    mask = slots - 1
+    for record_number, key_hash in enumerate(hashes):
+        slot = key_hash & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = record_number + 1
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table.tobytes()
+
+
+def _build_order(customer_ids: List[str]) -> bytes:
+    """Record numbers sorted by customer_id, for paging in ID order."""
+    order = array("I", sorted(range(len(customer_ids)), key=customer_ids.__getitem__))
+    if sys.byteorder != "little":
+        order.byteswap()
+    return order.tobytes()
+
+
+def build_snapshot(json_path: Path, snapshot_path: Path) -> int:
+    """
+    Convert a customers.json-shaped file into a binary snapshot.
+
+    Layout: a header, a strings section (each customer's string fields
+    joined by NUL, followed by a compact JSON tail with existing_loans and
+    any other fields), a table of fixed-size records pointing into it, and
+    two open-addressing hash tables mapping customer_id and normalized
+    phone to record numbers, and the record numbers in customer_id order
+    for paging. The file is written beside its final path and moved into
+    place, so workers mapping the old file keep a consistent view.
+
+    Args:
+        json_path: Source {"customers": [...]} file
+        snapshot_path: Snapshot to create or replace
+
+    Returns:
+        Number of customers written
+    """
+    snapshot_path = Path(snapshot_path)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+
+    records = bytearray()
+    id_hashes = array("I")
+    phone_hashes = array("I")
+    customer_ids = []
+
+    with open(tmp_path, "wb") as f:
+        f.write(bytes(_HEADER.size))
+        strings_offset = f.tell()
+        position = 0
+
+        for customer in iter_customers_json(json_path):
+            strings = "\0".join(str(customer.get(field, "")) for field in _STRING_FIELDS).encode("utf-8")
+            tail = {k: v for k, v in customer.items() if k not in _PACKED_FIELDS}
+            tail_bytes = json.dumps(tail, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+            f.write(strings)
+            f.write(tail_bytes)
+            records += _RECORD.pack(
+                position,
+                len(strings) + len(tail_bytes),
+                len(tail_bytes),
+                customer.get("age", 0),
+                customer.get("credit_score", 0),
+                float(customer.get("pre_approved_limit", 0)),
+                float(customer.get("salary", 0))
+            )
+            position += len(strings) + len(tail_bytes)
+            id_hashes.append(_key_hash(customer["customer_id"]))
+            customer_ids.append(customer["customer_id"])
+            phone_hashes.append(_key_hash(normalize_phone(customer.get("phone", ""))))
+
+        count = len(id_hashes)
+        slots = 1
+        while slots < count * 2:
+            slots <<= 1
+
+        records_offset = f.tell()
+        f.write(records)
+        id_index_offset = f.tell()
+        f.write(_build_table(id_hashes, slots))
+        phone_index_offset = f.tell()
+        f.write(_build_table(phone_hashes, slots))
+        order_offset = f.tell()
+        f.write(_build_order(customer_ids))
+
+        f.seek(0)
+        f.write(_HEADER.pack(
+            MAGIC, count, slots, strings_offset, records_offset,
+            id_index_offset, phone_index_offset, order_offset
+        ))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, snapshot_path)
+    return count
+
+
+class _Snapshot:
+    """One open, memory-mapped snapshot file."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, self.count, self.slots, self.strings_offset, self.records_offset,
+         self.id_index_offset, self.phone_index_offset, self.order_offset) = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.mm.close()
+            raise ValueError(
+                f"{path} is not a current customer snapshot; rebuild it with "
+                f"python -m services.binary_customer_store"
+            )
+
+    def fields(self, record_number: int) -> Tuple[List[str], bytes, tuple]:
+        offset, length, tail_length, *numbers = _RECORD.unpack_from(
+            self.mm, self.records_offset + record_number * _RECORD.size
+        )
+        start = self.strings_offset + offset
+        end = start + length
+        strings = self.mm[start:end - tail_length].decode("utf-8").split("\0")
+        return strings, self.mm[end - tail_length:end], numbers
+
+    def customer_id(self, record_number: int) -> str:
+        offset, length, tail_length = _RECORD.unpack_from(
+            self.mm, self.records_offset + record_number * _RECORD.size
+        )[:3]
+        start = self.strings_offset + offset
+        end = self.mm.find(b"\0", start, start + length)
+        return self.mm[start:end].decode("utf-8")
+
+    def record(self, record_number: int) -> FrozenDict:
+        strings, tail, (age, credit_score, pre_approved_limit, salary) = self.fields(record_number)
+        fields = dict(zip(_STRING_FIELDS, strings))
+        fields.update(
+            age=age,
+            credit_score=credit_score,
+            pre_approved_limit=_number(pre_approved_limit),
+            salary=_number(salary)
+        )
+        fields.update(json.loads(tail))
+
+        # Known fields in their customers.json order, anything else after
+        ordered = {key: fields[key] for key in _FIELD_ORDER if key in fields}
+        ordered.update(fields)
+        return freeze(ordered)
+
+    def lookup(self, index_offset: int, key: str, matches) -> Optional[int]:
+        mask = self.slots - 1
+        slot = _key_hash(key) & mask
+        while True:
+            (entry,) = _SLOT.unpack_from(self.mm, index_offset + slot * 4)
+            if entry == 0:
+                return None
+            if matches(entry - 1, key):
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def ordered(self, position: int) -> int:
+        """Record number of the customer at this position in customer_id order."""
+        return _SLOT.unpack_from(self.mm, self.order_offset + position * 4)[0]
+
+    def position_after(self, customer_id: str) -> int:
+        """First position in customer_id order whose ID sorts after customer_id."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.customer_id(self.ordered(middle)) <= customer_id:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def summary(self, record_number: int) -> Dict[str, Any]:
+        # Only the string fields are decoded; the JSON tail is left alone
+        strings = self.fields(record_number)[0]
+        return summarize(dict(zip(_STRING_FIELDS, strings)))
+
+    def phone_matches(self, record_number: int, phone: str) -> bool:
+        return normalize_phone(self.fields(record_number)[0][3]) == phone
+
+    def id_matches(self, record_number: int, customer_id: str) -> bool:
+        return self.customer_id(record_number) == customer_id
+
+
+class BinaryCustomerStore(CustomerStore):
+    """
+    Customers served from a read-only, memory-mapped binary snapshot.
+
+    Every worker process maps the same file, so the dataset exists once in
+    the page cache no matter how many workers run; a lookup probes the
+    hash index and decodes only the one record it returns. The file is
+    re-checked at most every reload_check_interval seconds and remapped
+    when a rebuilt snapshot replaces it. A missing snapshot is built from
+    data/customers.json by start(), or in a worker thread on first async
+    use, never on the event loop.
+
+    Mappings are never unmapped explicitly: a replaced or closed snapshot
+    is dropped and unmapped by the garbage collector once the last reader
+    still decoding a record from it lets go.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Path,
+        source_json: Path = DATA_FILE,
+        reload_check_interval: float = 1.0
+    ):
+        self.snapshot_path = Path(snapshot_path)
+        self.source_json = Path(source_json)
+        self.reload_check_interval = reload_check_interval
+
+        self._snapshot: Optional[_Snapshot] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def _current(self) -> _Snapshot:
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    self._refresh()
+                    self._next_check = now + self.reload_check_interval
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            if self._snapshot is not None:
+                return
+            self._build()
+            stat = os.stat(self.snapshot_path)
+
+        if self._snapshot is None or self._snapshot.identity != (stat.st_ino, stat.st_mtime_ns):
+            # The previous mapping is left for the garbage collector: a
+            # concurrent reader may still be decoding a record from it
+            self._snapshot = _Snapshot(self.snapshot_path)
+
+    def _build(self) -> None:
+        with self._build_lock:
+            # Another caller may have built it while this one waited
+            if not self.snapshot_path.exists():
+                build_snapshot(self.source_json, self.snapshot_path)
+
+    async def _current_async(self) -> _Snapshot:
+        if self._snapshot is None and not self.snapshot_path.exists():
+            await asyncio.to_thread(self._build)
+        return self._current()
+
+    async def start(self) -> None:
+        """Build the snapshot if it is missing and map it, off the event loop."""
+        await asyncio.to_thread(self._current)
+
+    def get(self, customer_id: str) -> Optional[FrozenDict]:
+        """Look up a customer by ID."""
+        snapshot = self._current()
+        record_number = snapshot.lookup(snapshot.id_index_offset, customer_id, snapshot.id_matches)
+        return None if record_number is None else snapshot.record(record_number)
+
+    def get_by_phone(self, phone: str) -> Optional[FrozenDict]:
+        """Look up a customer by phone number (any spacing/dash format)."""
+        snapshot = self._current()
+        record_number = snapshot.lookup(
+            snapshot.phone_index_offset, normalize_phone(phone), snapshot.phone_matches
+        )
+        return None if record_number is None else snapshot.record(record_number)
+
+    def __iter__(self) -> Iterator[FrozenDict]:
+        snapshot = self._current()
+        return (snapshot.record(i) for i in range(snapshot.count))
+
+    def __len__(self) -> int:
+        return self._current().count
+
+    async def find(self, customer_id: str) -> Optional[FrozenDict]:
+        await self._current_async()
+        return self.get(customer_id)
+
+    async def find_by_phone(self, phone: str) -> Optional[FrozenDict]:
+        await self._current_async()
+        return self.get_by_phone(phone)
+
+    async def find_many(self, customer_ids: List[str]) -> Dict[str, FrozenDict]:
+        await self._current_async()
+        found = {}
+        for customer_id in customer_ids:
+            customer = self.get(customer_id)
+            if customer is not None:
+                found[customer_id] = customer
+        return found
+
+    async def list_page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        snapshot = await self._current_async()
+        start = snapshot.position_after(after) if after is not None else 0
+        return [
+            snapshot.summary(snapshot.ordered(position))
+            for position in range(start, min(start + limit, snapshot.count))
+        ]
+
+    def close(self) -> None:
+        # Requests still in flight may hold the mapping; dropping the
+        # reference lets the garbage collector unmap it after them
+        with self._lock:
+            self._snapshot = None
+            self._next_check = 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mapped customer snapshot from customers.json.")
+    parser.add_argument("json_path", nargs="?", default=str(DATA_FILE))
+    parser.add_argument("snapshot_path", nargs="?", default=str(DATA_FILE.with_suffix(".bin")))
+    args = parser.parse_args()
+
+    count = build_snapshot(Path(args.json_path), Path(args.snapshot_path))
+    print(f"Wrote {count:,} customers to {args.snapshot_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Customer repository - the customer dataset shared by the mock services."""
+from typing import Dict, Any, AsyncIterator, Iterator, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import bisect
+import json
+import os
+import threading
+import time
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "customers.json"
+
+
+def normalize_phone(phone: str) -> str:
+    """Normalize a phone number for comparison (drop spaces and dashes)."""
+    return phone.replace(" ", "").replace("-", "")
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict.
+
+    Still a dict, so it serializes with json and FastAPI unchanged, but any
+    attempt to mutate it raises TypeError. Copies are the object itself.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("customer records are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts to FrozenDict and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def summarize(customer: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields listed for each customer: customer_id, name, city and phone."""
+    return {
+        "customer_id": customer["customer_id"],
+        "name": customer["name"],
+        "city": customer["city"],
+        "phone": customer["phone"]
+    }
+
+
+class CustomerStore:
+    """
+    Customer lookups used by the mock CRM, credit bureau and offer mart.
+
+    Methods are async so stores backed by blocking I/O can run off the
+    event loop; records come back as frozen, shared FrozenDicts.
+    """
+
+    async def find(self, customer_id: str) -> Optional[FrozenDict]:
+        """Look up a customer by ID."""
+        raise NotImplementedError
+
+    async def find_by_phone(self, phone: str) -> Optional[FrozenDict]:
+        """Look up a customer by phone number (any spacing/dash format)."""
+        raise NotImplementedError
+
+    async def find_many(self, customer_ids: List[str]) -> Dict[str, FrozenDict]:
+        """Look up several customers at once; IDs not found are left out."""
+        raise NotImplementedError
+
+    async def list_page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        One page of customer summaries, in customer_id order.
+
+        Args:
+            after: Return customers whose ID sorts after this one (None for the first page)
+            limit: Maximum number of summaries
+
+        Returns:
+            customer_id, name, city and phone of each customer on the page
+        """
+        raise NotImplementedError
+
+    async def iter_summaries(self, page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Every customer's summary in customer_id order, read one page at a time."""
+        after = None
+        while True:
+            page = await self.list_page(after, page_size)
+            for summary in page:
+                yield summary
+            if len(page) < page_size:
+                return
+            after = page[-1]["customer_id"]
+
+    async def start(self) -> None:
+        """Load or open the store before the first request (nothing by default)."""
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+
+class CustomerRepository(CustomerStore):
+    """
+    Customers loaded once from the JSON dataset and indexed for O(1) lookups.
+
+    Records are frozen and shared: every router and every session holding a
+    customer references the same object. The file's mtime is checked at
+    most every reload_check_interval seconds and the dataset is reloaded
+    when it changed. For the async methods the check, the JSON parse and
+    the index build run in a background thread while requests keep being
+    served from the previous index; the new one is published with a single
+    assignment, so readers never see a half-built index.
+    """
+
+    def __init__(self, data_file: Path = DATA_FILE, reload_check_interval: float = 1.0):
+        self.data_file = Path(data_file)
+        self.reload_check_interval = reload_check_interval
+
+        # (by customer_id, by normalized phone), replaced as a unit on reload
+        self._index: Tuple[Dict[str, FrozenDict], Dict[str, FrozenDict]] = ({}, {})
+        self._mtime_ns: Optional[int] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._reload: Optional[Future] = None
+        self.reloads = 0
+
+        # (by_id it was built from, its customer IDs sorted), built on first listing
+        self._sorted_ids: Tuple[Dict[str, FrozenDict], List[str]] = ({}, [])
+
+    def _load(self) -> None:
+        # Build the new indexes completely, then publish them in one step
+        mtime_ns = os.stat(self.data_file).st_mtime_ns
+        with open(self.data_file, "r") as f:
+            data = json.load(f)
+
+        by_id = {}
+        by_phone = {}
+        for customer in data["customers"]:
+            record = freeze(customer)
+            by_id[record["customer_id"]] = record
+            by_phone.setdefault(normalize_phone(record["phone"]), record)
+
+        self._index = (by_id, by_phone)
+        self._mtime_ns = mtime_ns
+        self.reloads += 1
+
+    def _check(self, now: float) -> None:
+        with self._reload_lock:
+            if now >= self._next_check:
+                try:
+                    if os.stat(self.data_file).st_mtime_ns != self._mtime_ns:
+                        self._load()
+                except (OSError, ValueError):
+                    # Missing or half-written file: keep serving the last good dataset
+                    if self._mtime_ns is None:
+                        raise
+                self._next_check = now + self.reload_check_interval
+
+    def _indexes(self) -> Tuple[Dict[str, FrozenDict], Dict[str, FrozenDict]]:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._check(now)
+        return self._index
+
+    async def _indexes_async(self) -> Tuple[Dict[str, FrozenDict], Dict[str, FrozenDict]]:
+        now = time.monotonic()
+        if now >= self._next_check:
+            # No await between the check and the submit, so each due check
+            # starts at most one reload; _reload_lock is held by the worker
+            # for the whole load and is never taken on the event loop
+            if self._reload is None or self._reload.done():
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="customer-reload")
+                self._reload = self._executor.submit(self._check, now)
+            if self._mtime_ns is None:
+                # Nothing to serve yet: wait for the first load
+                await asyncio.wrap_future(self._reload)
+        return self._index
+
+    async def start(self) -> None:
+        """Load the dataset before the first request, off the event loop."""
+        await self._indexes_async()
+
+    def get(self, customer_id: str) -> Optional[FrozenDict]:
+        """Look up a customer by ID."""
+        return self._indexes()[0].get(customer_id)
+
+    def get_by_phone(self, phone: str) -> Optional[FrozenDict]:
+        """Look up a customer by phone number (any spacing/dash format)."""
+        return self._indexes()[1].get(normalize_phone(phone))
+
+    def __iter__(self) -> Iterator[FrozenDict]:
+        # Indexes are never mutated once published, so no copy is needed
+        return iter(self._indexes()[0].values())
+
+    def __len__(self) -> int:
+        return len(self._indexes()[0])
+
+    async def find(self, customer_id: str) -> Optional[FrozenDict]:
+        return (await self._indexes_async())[0].get(customer_id)
+
+    async def find_by_phone(self, phone: str) -> Optional[FrozenDict]:
+        return (await self._indexes_async())[1].get(normalize_phone(phone))
+
+    async def find_many(self, customer_ids: List[str]) -> Dict[str, FrozenDict]:
+        by_id = (await self._indexes_async())[0]
+        return {customer_id: by_id[customer_id] for customer_id in customer_ids if customer_id in by_id}
+
+    async def list_page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        by_id = (await self._indexes_async())[0]
+        built_from, sorted_ids = self._sorted_ids
+        if built_from is not by_id:
+            sorted_ids = sorted(by_id)
+            self._sorted_ids = (by_id, sorted_ids)
+
+        start = bisect.bisect_right(sorted_ids, after) if after is not None else 0
+        return [summarize(by_id[customer_id]) for customer_id in sorted_ids[start:start + limit]]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_store: Optional[CustomerStore] = None
+
+
+def get_customer_store() -> CustomerStore:
+    """Get the process-wide customer store for the configured backend."""
+    global _store
+    if _store is None:
+        from config import settings
+
+        if settings.customer_store_backend == "json":
+            _store = CustomerRepository()
+        elif settings.customer_store_backend == "sqlite":
+            from services.sqlite_customer_store import SqliteCustomerStore
+            _store = SqliteCustomerStore(
+                settings.customer_db_path or DATA_FILE.with_suffix(".db"),
+                pool_size=settings.customer_db_pool_size
+            )
+        elif settings.customer_store_backend == "binary":
+            from services.binary_customer_store import BinaryCustomerStore
+            _store = BinaryCustomerStore(settings.customer_snapshot_path or DATA_FILE.with_suffix(".bin"))
+        else:
+            raise ValueError(f"Unknown customer store backend: {settings.customer_store_backend}")
+    return _store
+
+
+def close_customer_store() -> None:
+    """Close the process-wide customer store (it is reopened on next use)."""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
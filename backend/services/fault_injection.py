@@ -0,0 +1,79 @@
+"""Fault injection for the mock services - simulate slow or failing dependencies."""
+from typing import Dict, Any, Optional
+import asyncio
+import random
+
+from fastapi import HTTPException
+
+from config import settings
+
+SERVICES = ("crm", "credit_bureau", "offer_mart")
+
+
+class FaultInjector:
+    """
+    Per-service injected latency and error rate for the mock services.
+
+    Every mock lookup handler awaits inject() first: it sleeps for the
+    configured latency, then fails with a 503 at the configured rate.
+    Initial values come from the mock_fault_* settings; configure() and
+    reset() change them at runtime (from scripts or the diagnostics API).
+    """
+
+    def __init__(self):
+        self.faults: Dict[str, Dict[str, float]] = {}
+        self.injected_errors = {service: 0 for service in SERVICES}
+        self.reset()
+
+    def reset(self) -> None:
+        """Restore the faults configured in settings."""
+        targets = {s.strip() for s in settings.mock_fault_services.split(",") if s.strip()} or set(SERVICES)
+        for service in SERVICES:
+            enabled = service in targets
+            self.faults[service] = {
+                "latency_seconds": settings.mock_fault_latency_ms / 1000 if enabled else 0.0,
+                "error_rate": settings.mock_fault_error_rate if enabled else 0.0
+            }
+
+    def configure(
+        self,
+        service: str,
+        latency_seconds: Optional[float] = None,
+        error_rate: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Change one service's injected faults.
+
+        Args:
+            service: One of SERVICES
+            latency_seconds: Delay added to every call
+            error_rate: Fraction of calls failed with a 503 (0 to 1)
+
+        Returns:
+            The service's fault configuration
+        """
+        if service not in self.faults:
+            raise ValueError(f"Unknown service: {service}")
+        if latency_seconds is not None:
+            self.faults[service]["latency_seconds"] = max(0.0, latency_seconds)
+        if error_rate is not None:
+            self.faults[service]["error_rate"] = min(1.0, max(0.0, error_rate))
+        return self.faults[service]
+
+    async def inject(self, service: str) -> None:
+        fault = self.faults[service]
+        if fault["latency_seconds"]:
+            await asyncio.sleep(fault["latency_seconds"])
+        if fault["error_rate"] and random.random() < fault["error_rate"]:
+            self.injected_errors[service] += 1
+            raise HTTPException(status_code=503, detail=f"Injected {service} failure")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            service: {**fault, "injected_errors": self.injected_errors[service]}
+            for service, fault in self.faults.items()
+        }
+
+
+# Global fault injector shared by the mock services
+faults = FaultInjector()
@@ -1,18 +1,16 @@
 """Mock CRM service for customer verification."""
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncIterator, Optional
+import base64
+import binascii
 import json
-from pathlib import Path
 
-router = APIRouter(prefix="/api/crm", tags=["CRM"])
-
-# Load customer data
-DATA_FILE = Path(__file__).parent.parent / "data" / "customers.json"
+from services.customer_repository import get_customer_store, normalize_phone
+from services.batch import BatchLookupRequest, batch_lookup
+from services.fault_injection import faults
 
-def load_customers() -> Dict[str, Any]:
-    """Load customer data from JSON file."""
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
+router = APIRouter(prefix="/api/crm", tags=["CRM"])
 
 
 @router.get("/customer/{customer_id}")
@@ -26,18 +24,33 @@ async def get_customer(customer_id: str) -> Dict[str, Any]:
     Returns:
         Customer details including KYC information
     """
-    data = load_customers()
+    await faults.inject("crm")
+    customer = await get_customer_store().find(customer_id)
     
-    for customer in data["customers"]:
-        if customer["customer_id"] == customer_id:
-            return {
-                "success": True,
-                "data": customer
-            }
+    if customer is not None:
+        return {
+            "success": True,
+            "data": customer
+        }
     
     raise HTTPException(status_code=404, detail="Customer not found")
 
 
+@router.post("/customers/batch")
+async def get_customers_batch(request: BatchLookupRequest) -> Dict[str, Any]:
+    """
+    Retrieve details of many customers in one request.
+    
+    Args:
+        request: Customer IDs to look up
+        
+    Returns:
+        Per-customer results in request order (missing IDs marked as failed)
+    """
+    await faults.inject("crm")
+    return await batch_lookup(request, lambda customer: customer, "Customer not found")
+
+
 @router.get("/customer/phone/{phone}")
 async def get_customer_by_phone(phone: str) -> Dict[str, Any]:
     """
@@ -49,18 +62,13 @@ async def get_customer_by_phone(phone: str) -> Dict[str, Any]:
     Returns:
         Customer details
     """
-    data = load_customers()
-    
-    # Normalize phone format
-    normalized_phone = phone.replace(" ", "").replace("-", "")
+    customer = await get_customer_store().find_by_phone(phone)
     
-    for customer in data["customers"]:
-        customer_phone = customer["phone"].replace(" ", "").replace("-", "")
-        if customer_phone == normalized_phone:
-            return {
-                "success": True,
-                "data": customer
-            }
+    if customer is not None:
+        return {
+            "success": True,
+            "data": customer
+        }
     
     raise HTTPException(status_code=404, detail="Customer not found with this phone number")
 
@@ -78,66 +86,121 @@ async def verify_kyc(customer_id: str, phone: Optional[str] = None, address: Opt
     Returns:
         Verification status
     """
-    data = load_customers()
+    await faults.inject("crm")
+    customer = await get_customer_store().find(customer_id)
     
-    for customer in data["customers"]:
-        if customer["customer_id"] == customer_id:
-            verification_result = {
-                "customer_id": customer_id,
-                "verified": True,
-                "details": {}
+    if customer is not None:
+        verification_result = {
+            "customer_id": customer_id,
+            "verified": True,
+            "details": {}
+        }
+        
+        if phone:
+            phone_match = normalize_phone(phone) == normalize_phone(customer["phone"])
+            verification_result["details"]["phone"] = {
+                "verified": phone_match,
+                "stored_value": customer["phone"]
             }
-            
-            if phone:
-                normalized_input = phone.replace(" ", "").replace("-", "")
-                normalized_customer = customer["phone"].replace(" ", "").replace("-", "")
-                phone_match = normalized_input == normalized_customer
-                verification_result["details"]["phone"] = {
-                    "verified": phone_match,
-                    "stored_value": customer["phone"]
-                }
-                if not phone_match:
-                    verification_result["verified"] = False
-            
-            if address:
-                address_match = address.lower().strip() in customer["address"].lower()
-                verification_result["details"]["address"] = {
-                    "verified": address_match,
-                    "stored_value": customer["address"]
-                }
-                if not address_match:
-                    verification_result["verified"] = False
-            
-            return {
-                "success": True,
-                "data": verification_result
+            if not phone_match:
+                verification_result["verified"] = False
+        
+        if address:
+            address_match = address.lower().strip() in customer["address"].lower()
+            verification_result["details"]["address"] = {
+                "verified": address_match,
+                "stored_value": customer["address"]
             }
+            if not address_match:
+                verification_result["verified"] = False
+        
+        return {
+            "success": True,
+            "data": verification_result
+        }
     
     raise HTTPException(status_code=404, detail="Customer not found")
 
 
+# Largest page served by /customers/list
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(customer_id: str) -> str:
+    """Opaque cursor resuming a listing after this customer."""
+    return base64.urlsafe_b64encode(customer_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Customer ID a cursor resumes after (400 if the cursor is malformed)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/customers/list")
-async def list_customers() -> Dict[str, Any]:
+async def list_customers(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    List all customers (for testing purposes).
+    List customers one page at a time, in customer ID order.
+    
+    This endpoint used to return every customer in one response. It now
+    always returns a single page, also when no limit or cursor is sent, so
+    "count" is the size of this page, not the number of customers; follow
+    next_cursor while has_more is true (or use /customers/stream) to read
+    them all.
     
+    Args:
+        limit: Page size
+        cursor: next_cursor from the previous page (omit for the first page)
+        
     Returns:
-        List of all customers with basic info
+        One page of customers with basic info, whether more pages follow,
+        and the cursor of the next page (None on the last page)
     """
-    data = load_customers()
-    
-    customer_list = [
-        {
-            "customer_id": c["customer_id"],
-            "name": c["name"],
-            "city": c["city"],
-            "phone": c["phone"]
-        }
-        for c in data["customers"]
-    ]
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether another page follows
+    page = await get_customer_store().list_page(after, limit + 1)
+    has_more = len(page) > limit
+    page = page[:limit]
     
     return {
         "success": True,
-        "count": len(customer_list),
-        "data": customer_list
+        "count": len(page),
+        "data": page,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(page[-1]["customer_id"]) if has_more else None
     }
+
+
+async def _ndjson_lines(page_size: int) -> AsyncIterator[bytes]:
+    lines = []
+    async for summary in get_customer_store().iter_summaries(page_size):
+        lines.append(json.dumps(summary, ensure_ascii=False))
+        if len(lines) >= page_size:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@router.get("/customers/stream")
+async def stream_customers(page_size: int = Query(500, ge=1, le=MAX_PAGE_SIZE)) -> StreamingResponse:
+    """
+    Stream every customer as newline-delimited JSON, in customer ID order.
+    
+    Records are read from the store a page at a time and sent as they are
+    read, so memory use and time to first byte do not grow with the
+    dataset.
+    
+    Args:
+        page_size: Customers read from the store (and sent) per chunk
+        
+    Returns:
+        application/x-ndjson stream, one customer summary per line
+    """
+    return StreamingResponse(_ndjson_lines(page_size), media_type="application/x-ndjson")
@@ -0,0 +1,357 @@
+"""Mock LLM service - an offline OpenAI-compatible stand-in for the Perplexity API."""
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+from config import settings
+
+router = APIRouter(prefix="/api/mock-llm", tags=["Mock LLM"])
+
+COLLECT_COMPLETE = "COLLECT_COMPLETE"
+DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "exponential")
+
+# Amount and tenure as customers type them ("3 lakhs", "₹2,00,000", "24 months", "2 years")
+AMOUNT_PATTERNS = [
+    (r'₹\s*(\d+(?:,\d+)+)', 1),
+    (r'(\d{5,})', 1),
+    (r'(\d+(?:\.\d+)?)\s*(?:l|lakh|lakhs)\b', 100000),
+]
+TENURE_PATTERNS = [
+    (r'(\d+)\s*(?:month|months|mnth|mnths)\b', 1),
+    (r'(\d+)\s*(?:yr|yrs|year|years)\b', 12),
+]
+
+
+class ChatMessage(BaseModel):
+    """One message of a chat completion request."""
+    role: str
+    content: str = ""
+
+
+class ChatCompletionRequest(BaseModel):
+    """The subset of an OpenAI chat completion request the mock reads."""
+    model: str = "mock"
+    messages: List[ChatMessage]
+    stream: bool = False
+
+
+class MockLLMConfig(BaseModel):
+    """Runtime changes to the mock's behaviour; omitted fields are unchanged."""
+    latency_ms: Optional[float] = None
+    latency_distribution: Optional[str] = None
+    latency_spread: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    error_rate: Optional[float] = None
+    rate_limit_rate: Optional[float] = None
+    retry_after_seconds: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    seed: Optional[int] = None
+    script: Optional[List[Dict[str, str]]] = None
+
+
+def _user_text(message: ChatMessage) -> str:
+    # The sales agent prepends its system prompt and customer context to the
+    # first user message; only what follows "User:" was typed by the customer
+    content = message.content
+    return (content.rsplit("User:", 1)[-1] if "User:" in content else content).strip()
+
+
+def _find(patterns: list, text: str) -> Optional[int]:
+    for pattern, multiplier in patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches:
+            return int(float(matches[-1].replace(",", "")) * multiplier)
+    return None
+
+
+def sales_reply(messages: List[ChatMessage]) -> str:
+    """
+    Scripted sales-agent reply for a conversation.
+
+    Asks for the loan amount, then the tenure, and appends COLLECT_COMPLETE
+    once the customer's recent messages contain both - the point at which
+    the real model is prompted to emit it.
+    """
+    user_texts = [_user_text(m) for m in messages if m.role == "user"]
+    recent = " ".join(user_texts[-3:])
+    name_match = re.search(r"- Name: ([^\n]+)", messages[0].content) if messages else None
+    name = name_match.group(1).split()[0] if name_match else "there"
+
+    amount = _find(AMOUNT_PATTERNS, recent)
+    tenure = _find(TENURE_PATTERNS, recent)
+    if amount and tenure:
+        return (f"Excellent choice, {name}! A loan of ₹{amount:,} over {tenure} months fits well within "
+                f"your pre-approved offer. {COLLECT_COMPLETE}")
+    if amount:
+        return f"Great, ₹{amount:,} it is. Over how many months would you like to repay the loan?"
+    if len(user_texts) <= 1:
+        return (f"Hello {name}! Thanks for your interest in a personal loan. You have a pre-approved "
+                f"offer waiting for you. How much would you like to borrow?")
+    return "I'd be happy to help. Could you tell me the loan amount you have in mind?"
+
+
+class MockLLM:
+    """
+    Configurable behaviour of the mock chat completions endpoint.
+
+    Latency to the first token is drawn from a distribution around
+    latency_ms ("fixed", "uniform" within +/- spread, "lognormal" with
+    median latency_ms and sigma spread, or "exponential" with mean
+    latency_ms); the reply then arrives at tokens_per_second. Requests are
+    answered 429 (with Retry-After) at rate_limit_rate or beyond
+    max_concurrency, and 500 at error_rate. Replies come from the first
+    script rule whose "match" regex matches the latest user message, else
+    from sales_reply(). Initial values come from the mock_llm_* settings.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Restore the behaviour configured in settings and clear the counters."""
+        self.latency_ms = settings.mock_llm_latency_ms
+        self.latency_distribution = settings.mock_llm_latency_distribution
+        self.latency_spread = settings.mock_llm_latency_spread
+        self.tokens_per_second = settings.mock_llm_tokens_per_second
+        self.error_rate = settings.mock_llm_error_rate
+        self.rate_limit_rate = settings.mock_llm_rate_limit_rate
+        self.retry_after_seconds = settings.mock_llm_retry_after_seconds
+        self.max_concurrency = settings.mock_llm_max_concurrency
+        self.script: List[Dict[str, str]] = []
+        if settings.mock_llm_script_path:
+            with open(settings.mock_llm_script_path, encoding="utf-8") as f:
+                self.script = json.load(f)
+        self.random = random.Random(settings.mock_llm_seed)
+
+        self.active = 0
+        self.counts = {"requests": 0, "streamed": 0, "completed": 0, "rate_limited": 0, "errors": 0}
+        self.peak_active = 0
+        self.tokens_out = 0
+
+    def configure(self, config: MockLLMConfig) -> Dict[str, Any]:
+        """
+        Change the mock's behaviour at runtime.
+
+        Args:
+            config: Fields to change
+
+        Returns:
+            The resulting configuration
+        """
+        changes = config.model_dump(exclude_none=True)
+        distribution = changes.get("latency_distribution")
+        if distribution is not None and distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        if "seed" in changes:
+            self.random = random.Random(changes.pop("seed"))
+        for field in ("error_rate", "rate_limit_rate"):
+            if field in changes:
+                changes[field] = min(1.0, max(0.0, changes[field]))
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return self.config()
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": self.latency_ms,
+            "latency_distribution": self.latency_distribution,
+            "latency_spread": self.latency_spread,
+            "tokens_per_second": self.tokens_per_second,
+            "error_rate": self.error_rate,
+            "rate_limit_rate": self.rate_limit_rate,
+            "retry_after_seconds": self.retry_after_seconds,
+            "max_concurrency": self.max_concurrency,
+            "script_rules": len(self.script)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counts, "active": self.active, "peak_active": self.peak_active, "tokens_out": self.tokens_out}
+
+    def latency(self) -> float:
+        """Draw one time-to-first-token in seconds."""
+        base = self.latency_ms / 1000
+        if base <= 0:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return max(0.0, base * (1 + self.random.uniform(-self.latency_spread, self.latency_spread)))
+        if self.latency_distribution == "lognormal":
+            return base * math.exp(self.random.gauss(0, self.latency_spread))
+        if self.latency_distribution == "exponential":
+            return self.random.expovariate(1 / base)
+        return base
+
+    def reply(self, messages: List[ChatMessage]) -> str:
+        latest = next((_user_text(m) for m in reversed(messages) if m.role == "user"), "")
+        for rule in self.script:
+            if re.search(rule.get("match", ""), latest, re.IGNORECASE):
+                return rule.get("reply", "")
+        return sales_reply(messages)
+
+    def rejection(self) -> Optional[JSONResponse]:
+        """An injected 429 or 500 for this request, if any."""
+        over_capacity = self.max_concurrency and self.active >= self.max_concurrency
+        if over_capacity or (self.rate_limit_rate and self.random.random() < self.rate_limit_rate):
+            self.counts["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{self.retry_after_seconds:g}"},
+                content={"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}}
+            )
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.counts["errors"] += 1
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": "Injected server error", "type": "server_error"}}
+            )
+        return None
+
+    def acquire(self) -> None:
+        """Count a request as in progress until release()."""
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def release(self) -> None:
+        self.active -= 1
+
+    async def tokens(self, text: str) -> AsyncIterator[str]:
+        """Yield the reply a word at a time at tokens_per_second."""
+        for token in re.findall(r"\S+\s*", text):
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            self.tokens_out += 1
+            yield token
+
+
+mock_llm = MockLLM()
+
+
+def _chunk(completion_id: str, model: str, delta: Dict[str, str], finish_reason: Optional[str] = None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@router.post("/chat/completions")
+async def chat_completions(request: ChatCompletionRequest):
+    """
+    OpenAI-compatible chat completion, streamed as server-sent events when
+    request.stream is set.
+
+    Args:
+        request: Model, messages and stream flag
+
+    Returns:
+        A chat.completion object, a stream of chat.completion.chunk
+        events, or an injected 429/500 error
+    """
+    mock_llm.counts["requests"] += 1
+    rejection = mock_llm.rejection()
+    if rejection is not None:
+        return rejection
+
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    text = mock_llm.reply(request.messages)
+
+    if request.stream:
+        mock_llm.counts["streamed"] += 1
+
+        async def events() -> AsyncIterator[str]:
+            # Counted only once the body starts: a client that disconnects
+            # before then never runs this generator, so nothing is released
+            mock_llm.acquire()
+            try:
+                await asyncio.sleep(mock_llm.latency())
+                yield _chunk(completion_id, request.model, {"role": "assistant", "content": ""})
+                async for token in mock_llm.tokens(text):
+                    yield _chunk(completion_id, request.model, {"content": token})
+                yield _chunk(completion_id, request.model, {}, "stop")
+                yield "data: [DONE]\n\n"
+                mock_llm.counts["completed"] += 1
+            finally:
+                mock_llm.release()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    mock_llm.acquire()
+    try:
+        await asyncio.sleep(mock_llm.latency())
+        tokens = [token async for token in mock_llm.tokens(text)]
+    finally:
+        mock_llm.release()
+    mock_llm.counts["completed"] += 1
+    prompt_tokens = sum(len(m.content.split()) for m in request.messages)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens)
+        }
+    }
+
+
+@router.get("/stats")
+async def get_stats() -> Dict[str, Any]:
+    """Get the mock's configuration and request counts."""
+    return {"config": mock_llm.config(), "stats": mock_llm.stats()}
+
+
+@router.post("/config")
+async def configure(config: MockLLMConfig) -> Dict[str, Any]:
+    """
+    Change latency, token rate, error/429 injection or scripted replies.
+
+    Args:
+        config: Fields to change
+
+    Returns:
+        The resulting configuration
+    """
+    try:
+        return mock_llm.configure(config)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+
+
+@router.post("/reset")
+async def reset() -> Dict[str, Any]:
+    """Restore the configured behaviour and clear the counters."""
+    mock_llm.reset()
+    return mock_llm.config()
+
+
+def main():
+    """Run the mock LLM on its own, e.g. on another port for load tests."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    app = FastAPI(title="Mock LLM")
+    app.include_router(router)
+    print(f"Set LLM_BACKEND=mock and MOCK_LLM_BASE_URL=http://{args.host}:{args.port}{router.prefix}")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
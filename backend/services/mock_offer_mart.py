@@ -1,19 +1,13 @@
 """Mock Offer Mart service for pre-approved loan offers."""
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any, List
-import json
-from pathlib import Path
 from datetime import datetime, timedelta
 
-router = APIRouter(prefix="/api/offers", tags=["Offer Mart"])
-
-# Load customer data
-DATA_FILE = Path(__file__).parent.parent / "data" / "customers.json"
+from services.customer_repository import get_customer_store
+from services.batch import BatchLookupRequest, batch_lookup
+from services.fault_injection import faults
 
-def load_customers() -> Dict[str, Any]:
-    """Load customer data from JSON file."""
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
+router = APIRouter(prefix="/api/offers", tags=["Offer Mart"])
 
 
 def calculate_interest_rate(credit_score: int, loan_amount: int) -> float:
@@ -36,6 +30,58 @@ def calculate_interest_rate(credit_score: int, loan_amount: int) -> float:
     return round(base_rate, 2)
 
 
+def build_offers(customer: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the pre-approved offer tiers for a customer record."""
+    pre_approved_limit = customer["pre_approved_limit"]
+    credit_score = customer["credit_score"]
+    
+    # Generate offer tiers
+    offers = []
+    
+    # Tier 1: Instant approval amount
+    tier1_amount = pre_approved_limit
+    tier1_rate = calculate_interest_rate(credit_score, tier1_amount)
+    offers.append({
+        "tier": "Instant Approval",
+        "max_amount": tier1_amount,
+        "interest_rate": tier1_rate,
+        "tenure_options": [12, 24, 36, 48, 60],
+        "processing_fee": 0,
+        "features": [
+            "Instant approval - No documentation required",
+            "Disbursal within 24 hours",
+            f"Special rate of {tier1_rate}% p.a."
+        ]
+    })
+    
+    # Tier 2: Conditional approval (2x pre-approved)
+    if credit_score >= 700:
+        tier2_amount = pre_approved_limit * 2
+        tier2_rate = calculate_interest_rate(credit_score, tier2_amount)
+        offers.append({
+            "tier": "Enhanced Offer",
+            "max_amount": tier2_amount,
+            "interest_rate": tier2_rate,
+            "tenure_options": [12, 24, 36, 48, 60],
+            "processing_fee": tier2_amount * 0.01,  # 1% processing fee
+            "features": [
+                "Salary slip verification required",
+                f"Up to ₹{tier2_amount:,} available",
+                f"Competitive rate of {tier2_rate}% p.a.",
+                "Quick approval subject to income verification"
+            ]
+        })
+    
+    return {
+        "customer_id": customer["customer_id"],
+        "customer_name": customer["name"],
+        "credit_score": credit_score,
+        "offers": offers,
+        "valid_until": (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
+        "special_message": f"Congratulations {customer['name'].split()[0]}! You have exclusive pre-approved offers available."
+    }
+
+
 @router.get("/preapproved/{customer_id}")
 async def get_preapproved_offers(customer_id: str) -> Dict[str, Any]:
     """
@@ -47,65 +93,33 @@ async def get_preapproved_offers(customer_id: str) -> Dict[str, Any]:
     Returns:
         Pre-approved loan offer details
     """
-    data = load_customers()
+    await faults.inject("offer_mart")
+    customer = await get_customer_store().find(customer_id)
     
-    for customer in data["customers"]:
-        if customer["customer_id"] == customer_id:
-            pre_approved_limit = customer["pre_approved_limit"]
-            credit_score = customer["credit_score"]
-            
-            # Generate offer tiers
-            offers = []
-            
-            # Tier 1: Instant approval amount
-            tier1_amount = pre_approved_limit
-            tier1_rate = calculate_interest_rate(credit_score, tier1_amount)
-            offers.append({
-                "tier": "Instant Approval",
-                "max_amount": tier1_amount,
-                "interest_rate": tier1_rate,
-                "tenure_options": [12, 24, 36, 48, 60],
-                "processing_fee": 0,
-                "features": [
-                    "Instant approval - No documentation required",
-                    "Disbursal within 24 hours",
-                    f"Special rate of {tier1_rate}% p.a."
-                ]
-            })
-            
-            # Tier 2: Conditional approval (2x pre-approved)
-            if credit_score >= 700:
-                tier2_amount = pre_approved_limit * 2
-                tier2_rate = calculate_interest_rate(credit_score, tier2_amount)
-                offers.append({
-                    "tier": "Enhanced Offer",
-                    "max_amount": tier2_amount,
-                    "interest_rate": tier2_rate,
-                    "tenure_options": [12, 24, 36, 48, 60],
-                    "processing_fee": tier2_amount * 0.01,  # 1% processing fee
-                    "features": [
-                        "Salary slip verification required",
-                        f"Up to ₹{tier2_amount:,} available",
-                        f"Competitive rate of {tier2_rate}% p.a.",
-                        "Quick approval subject to income verification"
-                    ]
-                })
-            
-            return {
-                "success": True,
-                "data": {
-                    "customer_id": customer_id,
-                    "customer_name": customer["name"],
-                    "credit_score": credit_score,
-                    "offers": offers,
-                    "valid_until": (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
-                    "special_message": f"Congratulations {customer['name'].split()[0]}! You have exclusive pre-approved offers available."
-                }
-            }
+    if customer is not None:
+        return {
+            "success": True,
+            "data": build_offers(customer)
+        }
     
     raise HTTPException(status_code=404, detail="No offers found for this customer")
 
 
+@router.post("/preapproved/batch")
+async def get_preapproved_offers_batch(request: BatchLookupRequest) -> Dict[str, Any]:
+    """
+    Retrieve pre-approved offers for many customers in one request.
+    
+    Args:
+        request: Customer IDs to look up
+        
+    Returns:
+        Per-customer results in request order (missing IDs marked as failed)
+    """
+    await faults.inject("offer_mart")
+    return await batch_lookup(request, build_offers, "No offers found for this customer")
+
+
 @router.post("/calculate-emi")
 async def calculate_emi(
     principal: float,
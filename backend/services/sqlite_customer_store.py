@@ -0,0 +1,242 @@
+"""SQLite customer store - for customer datasets too large for customers.json."""
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+
+from services.customer_repository import (
+    CustomerStore,
+    FrozenDict,
+    DATA_FILE,
+    freeze,
+    normalize_phone
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    phone_normalized TEXT NOT NULL,
+    name TEXT NOT NULL,
+    city TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    record TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS customers_phone ON customers (phone_normalized);
+"""
+
+
+def iter_customers_json(path: Path, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """
+    Stream customer objects out of a {"customers": [...]} file.
+
+    Only one chunk plus the customer being decoded is held in memory, so
+    files far larger than RAM can be imported.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        # Skip to the opening bracket of the customers array
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"{path}: no customers array found")
+            buffer += chunk
+            key = buffer.find('"customers"')
+            start = buffer.find("[", key) if key >= 0 else -1
+            if start >= 0:
+                buffer = buffer[start + 1:]
+                break
+
+        position = 0
+        while True:
+            # Skip separators between elements
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+
+            try:
+                customer, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise ValueError(f"{path}: truncated customers array")
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield customer
+            position = end
+
+
+def import_customers(
+    json_path: Path,
+    db_path: Path,
+    batch_size: int = 10000
+) -> int:
+    """
+    Build a SQLite customer database from a customers.json-shaped file.
+
+    The database is written next to its final path and moved into place
+    once complete, so readers never see a partial import.
+
+    Args:
+        json_path: Source {"customers": [...]} file
+        db_path: Database to create or replace
+        batch_size: Rows inserted per executemany call
+
+    Returns:
+        Number of customers imported
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;")
+        connection.executescript(SCHEMA)
+
+        count = 0
+        batch = []
+        for customer in iter_customers_json(json_path):
+            batch.append((
+                customer["customer_id"],
+                normalize_phone(customer["phone"]),
+                customer["name"],
+                customer["city"],
+                customer["phone"],
+                json.dumps(customer, separators=(",", ":"), ensure_ascii=False)
+            ))
+            if len(batch) >= batch_size:
+                connection.executemany("INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?, ?, ?)", batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            connection.executemany("INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?, ?, ?)", batch)
+            count += len(batch)
+
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, db_path)
+    return count
+
+
+class SqliteCustomerStore(CustomerStore):
+    """
+    Customers in a SQLite database indexed by customer_id and normalized phone.
+
+    Queries run on a dedicated thread pool, one read-only connection per
+    thread, so async handlers never block the event loop and the pool size
+    bounds concurrent database work. When the database does not exist yet
+    it is imported from data/customers.json on first use.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool_size: int = 4,
+        source_json: Path = DATA_FILE
+    ):
+        self.db_path = Path(db_path)
+        self.source_json = Path(source_json)
+        self.pool_size = pool_size
+
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="customer-db")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if not self._ready:
+                with self._init_lock:
+                    if not self.db_path.exists():
+                        import_customers(self.source_json, self.db_path)
+                    self._ready = True
+            connection = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def _fetch_one(self, sql: str, params: Tuple[Any, ...]) -> Optional[FrozenDict]:
+        row = self._connection().execute(sql, params).fetchone()
+        return freeze(json.loads(row[0])) if row else None
+
+    def _fetch_many(self, customer_ids: List[str], chunk_size: int = 500) -> Dict[str, FrozenDict]:
+        connection = self._connection()
+        found = {}
+        for i in range(0, len(customer_ids), chunk_size):
+            chunk = customer_ids[i:i + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            rows = connection.execute(
+                f"SELECT customer_id, record FROM customers WHERE customer_id IN ({placeholders})", chunk
+            )
+            for customer_id, record in rows:
+                found[customer_id] = freeze(json.loads(record))
+        return found
+
+    def _fetch_page(self, after: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        # Range scan of the primary key: the same cost for every page
+        rows = self._connection().execute(
+            "SELECT customer_id, name, city, phone FROM customers"
+            " WHERE customer_id > ? ORDER BY customer_id LIMIT ?",
+            (after if after is not None else "", limit)
+        )
+        return [
+            {"customer_id": customer_id, "name": name, "city": city, "phone": phone}
+            for customer_id, name, city, phone in rows
+        ]
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def find(self, customer_id: str) -> Optional[FrozenDict]:
+        return await self._run(
+            self._fetch_one, "SELECT record FROM customers WHERE customer_id = ?", (customer_id,)
+        )
+
+    async def find_by_phone(self, phone: str) -> Optional[FrozenDict]:
+        return await self._run(
+            self._fetch_one,
+            "SELECT record FROM customers WHERE phone_normalized = ? ORDER BY customer_id LIMIT 1",
+            (normalize_phone(phone),)
+        )
+
+    async def find_many(self, customer_ids: List[str]) -> Dict[str, FrozenDict]:
+        return await self._run(self._fetch_many, list(dict.fromkeys(customer_ids)))
+
+    async def list_page(self, after: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self._run(self._fetch_page, after, limit)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import customers.json into a SQLite customer store.")
+    parser.add_argument("json_path", nargs="?", default=str(DATA_FILE))
+    parser.add_argument("db_path", nargs="?", default=str(DATA_FILE.with_suffix(".db")))
+    args = parser.parse_args()
+
+    count = import_customers(Path(args.json_path), Path(args.db_path))
+    print(f"Imported {count:,} customers into {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Initialize sessions package."""
+from sessions.store import SessionStore, InMemorySessionStore, SessionConflictError
+from config import settings
+
+
+def create_session_store() -> SessionStore:
+    """Create the session store configured in settings."""
+    if settings.session_backend == "memory":
+        store = InMemorySessionStore(
+            max_sessions=settings.session_max_count,
+            ttl_seconds=settings.session_ttl_seconds,
+            sweep_interval_seconds=settings.session_sweep_interval_seconds
+        )
+        if settings.session_journal_enabled:
+            from sessions.journal import JournaledSessionStore
+            return JournaledSessionStore(
+                store,
+                directory=settings.session_journal_dir,
+                snapshot_every=settings.session_journal_snapshot_every,
+                fsync=settings.session_journal_fsync
+            )
+        return store
+
+    if settings.session_backend == "redis":
+        from sessions.redis_store import RedisSessionStore
+        return RedisSessionStore(
+            url=settings.redis_url,
+            ttl_seconds=settings.session_ttl_seconds
+        )
+
+    raise ValueError(f"Unknown session backend: {settings.session_backend}")
+
+
+__all__ = [
+    "SessionStore",
+    "InMemorySessionStore",
+    "SessionConflictError",
+    "create_session_store"
+]
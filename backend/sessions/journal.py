@@ -0,0 +1,472 @@
+"""Session journal - append-only on-disk log of session mutations for warm restarts."""
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future
+from pathlib import Path
+import asyncio
+import gc
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+
+from sessions.store import SessionStore, InMemorySessionStore
+from sessions.state import SessionState
+from sessions.message_log import MessageLog
+
+try:
+    # Optional: decodes journals noticeably faster (installed with langsmith)
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+_JOURNAL_PATTERN = re.compile(r"^journal-(\d+)\.jsonl$")
+
+# Record types; every line is a compact JSON array starting with one of these
+_PUT = "p"
+_UPDATE = "u"
+_DELETE = "d"
+_SNAPSHOT_HEADER = "s"
+
+logger = logging.getLogger(__name__)
+
+
+def _dumps(record: List[Any]) -> bytes:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+class SessionJournal:
+    """
+    Append-only journal files plus a periodic snapshot.
+
+    A put record holds the messages appended since the session was last
+    journaled (with the index they start at), the customer snapshot only
+    when it changed, and SessionState.to_record() for the remaining fields;
+    an update record carries only the (position, value) pairs of the fields
+    that changed since the previous write. Replaying records is idempotent,
+    so a crash at any point is recovered by loading the snapshot and
+    replaying newer journal files.
+
+    Journal files are numbered by generation. A snapshot written while
+    generation N+1 is open covers every generation up to N; its header
+    stores N+1 and older journal files are removed once it is in place.
+
+    Records are encoded by the caller and handed to a writer thread, which
+    writes everything queued so far with one write, flush and (optionally)
+    fsync, so the event loop never blocks on disk I/O. Switching to a new
+    generation goes through the same queue, keeping records in order.
+    """
+
+    def __init__(self, directory: str, fsync: bool = False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+
+        self.generation = 0
+        self.entries_since_snapshot = 0
+        self.entries_written = 0
+        self.batches_written = 0
+        self._file = None
+
+        # Encoded records, generation switches (int) and the stop marker
+        # (None), with the future resolved once the item is on disk
+        self._queue: "queue.SimpleQueue[Tuple[Any, Optional[Future]]]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
+        # session_id -> (messages journaled, customer snapshot journaled)
+        self._logged: Dict[str, Tuple[int, Optional[Dict[str, Any]]]] = {}
+
+    def _journal_path(self, generation: int) -> Path:
+        return self.directory / f"journal-{generation:08d}.jsonl"
+
+    def _journal_generations(self) -> List[int]:
+        generations = []
+        for path in self.directory.iterdir():
+            match = _JOURNAL_PATTERN.match(path.name)
+            if match:
+                generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def _open(self, generation: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._journal_path(generation), "ab")
+
+    def _start_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="session-journal", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pending: List[bytes] = []
+            waiters: List[Future] = []
+            stop = False
+            for item, waiter in items:
+                if isinstance(item, bytes):
+                    pending.append(item)
+                else:
+                    # A generation switch or the stop marker: flush what
+                    # belongs to the current file first
+                    self._flush(pending, waiters)
+                    pending = []
+                    if item is None:
+                        stop = True
+                    else:
+                        self._open(item)
+                if waiter is not None:
+                    waiters.append(waiter)
+            self._flush(pending, waiters)
+            if stop:
+                return
+
+    def _flush(self, pending: List[bytes], waiters: List[Future]) -> None:
+        error = None
+        try:
+            if pending:
+                self._file.write(b"".join(pending))
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                self.batches_written += 1
+        except OSError as e:
+            logger.error("Session journal write failed: %s", e)
+            error = e
+        for waiter in waiters:
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+        waiters.clear()
+
+    def _write(self, data: bytes) -> Optional[Future]:
+        # With fsync on, callers wait for the future to know the record is durable
+        waiter = Future() if self.fsync else None
+        self._queue.put((data, waiter))
+        self.entries_since_snapshot += 1
+        self.entries_written += 1
+        return waiter
+
+    def record_put(
+        self,
+        session_id: str,
+        state: SessionState,
+        previous: Optional[SessionState] = None
+    ) -> Optional[Future]:
+        """
+        Journal a session write.
+
+        Args:
+            session_id: Session ID
+            state: State being stored
+            previous: State this write replaces, if it was journaled
+
+        Returns:
+            With fsync enabled, a future resolved once the record is on disk
+        """
+        logged_count, logged_customer = self._logged.get(session_id, (0, None))
+        messages = state.messages
+        record = state.to_record()
+
+        # A shorter log means the session was replaced; rewrite it from the start
+        base = logged_count if logged_count <= len(messages) else 0
+        customer = state.customer if state.customer is not logged_customer else None
+
+        if previous is not None and session_id in self._logged:
+            changes = []
+            for position, (old, new) in enumerate(zip(previous.to_record(), record)):
+                if old != new:
+                    changes += (position, new)
+            entry = [_UPDATE, session_id, base, messages.since(base), customer, changes]
+        else:
+            entry = [_PUT, session_id, base, messages.since(base), customer, record]
+
+        self._logged[session_id] = (len(messages), state.customer)
+        return self._write(_dumps(entry))
+
+    def record_delete(self, session_id: str) -> None:
+        """Journal a session deletion or eviction."""
+        if self._logged.pop(session_id, None) is not None:
+            self._write(_dumps([_DELETE, session_id]))
+
+    def replay(self) -> Dict[str, SessionState]:
+        """
+        Rebuild session states from the snapshot and journal files.
+
+        Returns:
+            Session states keyed by session ID, least recently written first
+        """
+        # Replay builds millions of acyclic objects; cyclic garbage
+        # collection passes over them would take most of the time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._replay()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _replay(self) -> Dict[str, SessionState]:
+        sessions: Dict[str, list] = {}
+        first_generation = 0
+
+        snapshot = self.directory / SNAPSHOT_FILE
+        if snapshot.exists():
+            with open(snapshot, "rb") as f:
+                header = _loads(f.readline())
+                if header[0] == _SNAPSHOT_HEADER:
+                    first_generation = header[1]
+                self._apply(f, sessions)
+
+        generations = self._journal_generations()
+        for generation in generations:
+            path = self._journal_path(generation)
+            if generation < first_generation:
+                # Already folded into the snapshot
+                path.unlink()
+                continue
+            with open(path, "rb") as f:
+                self._apply(f, sessions)
+
+        states = {}
+        for session_id, (messages, customer, record, _) in sorted(sessions.items(), key=lambda item: item[1][3]):
+            states[session_id] = SessionState.from_record(MessageLog(messages), customer, record)
+            self._logged[session_id] = (len(messages), states[session_id].customer)
+
+        # Continue in a fresh generation so replayed files are never appended to
+        self.generation = max([first_generation] + [g + 1 for g in generations])
+        self._open(self.generation)
+        self._start_writer()
+        return states
+
+    @staticmethod
+    def _decode(lines) -> List[List[Any]]:
+        """Decode journal lines, batching them into one JSON document for speed."""
+        lines = [line for line in lines if line.strip()]
+        try:
+            return _loads(b"[" + b",".join(lines) + b"]")
+        except ValueError:
+            pass
+
+        # Torn write at the tail of a journal after a crash: keep what parses
+        records = []
+        for line in lines:
+            try:
+                records.append(_loads(line))
+            except ValueError:
+                break
+        return records
+
+    @classmethod
+    def _apply(cls, f, sessions: Dict[str, list], batch_size: int = 10000) -> None:
+        # Entries are [messages, customer, record, sequence of last write];
+        # ordering by sequence at the end is cheaper than moving each
+        # written session to the end of the dict
+        sequence = len(sessions) and max(entry[3] for entry in sessions.values())
+        get = sessions.get
+        while True:
+            lines = f.readlines(batch_size * 256)
+            if not lines:
+                return
+
+            for record in cls._decode(lines):
+                sequence += 1
+                kind = record[0]
+                if kind == _UPDATE:
+                    _, session_id, base, messages, customer, fields = record
+                    entry = get(session_id)
+                    if entry is None:
+                        # Base record was lost (e.g. torn write); skip the session
+                        continue
+                    log = entry[0]
+                    if len(log) != base:
+                        del log[base:]
+                    log += messages
+                    if customer is not None:
+                        entry[1] = customer
+                    values = entry[2]
+                    for i in range(0, len(fields), 2):
+                        values[fields[i]] = fields[i + 1]
+                    entry[3] = sequence
+                elif kind == _PUT:
+                    _, session_id, base, messages, customer, fields = record
+                    entry = get(session_id)
+                    if entry is None:
+                        sessions[session_id] = [messages, customer, fields, sequence]
+                        continue
+                    log = entry[0]
+                    if len(log) != base:
+                        del log[base:]
+                    log += messages
+                    if customer is not None:
+                        entry[1] = customer
+                    entry[2] = fields
+                    entry[3] = sequence
+                elif kind == _DELETE:
+                    sessions.pop(record[1], None)
+
+    def capture(self, sessions) -> List[List[Any]]:
+        """Copy (session_id, SessionState) pairs into snapshot records."""
+        records = []
+        for session_id, state in sessions:
+            records.append([
+                _PUT, session_id, 0, state.messages.to_list(), state.customer, state.to_record()
+            ])
+            self._logged[session_id] = (len(state.messages), state.customer)
+        return records
+
+    def rotate(self) -> int:
+        """
+        Start a new journal generation ahead of a snapshot.
+
+        Records queued before the switch still go to the previous file;
+        the snapshot covers them, as it captures the sessions afterwards.
+
+        Returns:
+            Generation the snapshot will cover up to (exclusive)
+        """
+        self.generation += 1
+        self._queue.put((self.generation, None))
+        self.entries_since_snapshot = 0
+        return self.generation
+
+    def write_snapshot(self, generation: int, records: List[List[Any]]) -> None:
+        """Atomically replace the snapshot, then drop the journals it covers."""
+        tmp = self.directory / (SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_dumps([_SNAPSHOT_HEADER, generation]))
+            f.writelines(_dumps(record) for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / SNAPSHOT_FILE)
+
+        for old in self._journal_generations():
+            if old < generation:
+                self._journal_path(old).unlink()
+
+    def close(self) -> None:
+        """Write everything queued, stop the writer thread and close the file."""
+        if self._writer is not None:
+            self._queue.put((None, None))
+            self._writer.join()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JournaledSessionStore(SessionStore):
+    """
+    In-memory session store whose mutations are journaled to disk.
+
+    On start() the journal is replayed into the in-memory store before the
+    application starts serving. Every snapshot_every journal entries the
+    live sessions are written to a new snapshot in a worker thread and the
+    covered journal files are removed.
+    """
+
+    def __init__(
+        self,
+        inner: InMemorySessionStore,
+        directory: str,
+        snapshot_every: int = 50000,
+        fsync: bool = False
+    ):
+        self.inner = inner
+        self.journal = SessionJournal(directory, fsync=fsync)
+        self.snapshot_every = snapshot_every
+
+        self.replayed_sessions = 0
+        self.replay_seconds = 0.0
+        self.snapshots_written = 0
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+        inner.on_evict = self.journal.record_delete
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self.inner.get(session_id)
+
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        compact = SessionState.from_dict(state)
+        previous = self.inner.peek(session_id)
+        self.inner.restore(session_id, compact)
+        written = self.journal.record_put(session_id, compact, previous)
+        self._maybe_snapshot()
+        if written is not None:
+            # fsync enabled: return once the write is durable
+            await asyncio.wrap_future(written)
+
+    async def delete(self, session_id: str) -> bool:
+        deleted = await self.inner.delete(session_id)
+        if deleted:
+            self.journal.record_delete(session_id)
+            self._maybe_snapshot()
+        return deleted
+
+    async def touch(self, session_id: str) -> bool:
+        return await self.inner.touch(session_id)
+
+    def replay(self) -> int:
+        """
+        Load journaled sessions into the in-memory store.
+
+        Returns:
+            Number of sessions restored
+        """
+        started = time.perf_counter()
+        states = self.journal.replay()
+        for session_id, state in states.items():
+            self.inner.restore(session_id, state)
+
+        self.replayed_sessions = len(states)
+        self.replay_seconds = time.perf_counter() - started
+        return self.replayed_sessions
+
+    def _maybe_snapshot(self) -> None:
+        if self.journal.entries_since_snapshot < self.snapshot_every:
+            return
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return
+        self._snapshot_task = asyncio.create_task(self.snapshot())
+
+    async def snapshot(self) -> None:
+        """Write a snapshot of all live sessions and compact the journal."""
+        generation = self.journal.rotate()
+        # Copy on the event loop so no request mutates a state mid-copy;
+        # encoding and writing happen in a worker thread
+        records = self.journal.capture(self.inner.items())
+        await asyncio.to_thread(self.journal.write_snapshot, generation, records)
+        self.snapshots_written += 1
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.replay)
+        await self.inner.start()
+
+    async def stop(self) -> None:
+        await self.inner.stop()
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        await asyncio.to_thread(self.journal.close)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.inner.stats()
+        stats["journal"] = {
+            "generation": self.journal.generation,
+            "entries_written": self.journal.entries_written,
+            "batches_written": self.journal.batches_written,
+            "entries_since_snapshot": self.journal.entries_since_snapshot,
+            "snapshots_written": self.snapshots_written,
+            "replayed_sessions": self.replayed_sessions,
+            "replay_seconds": round(self.replay_seconds, 3)
+        }
+        return stats
@@ -0,0 +1,72 @@
+"""Per-session locking - serializes requests on one session, not across sessions."""
+from typing import Dict, Any, List
+from contextlib import asynccontextmanager
+import asyncio
+
+
+class LockTableFullError(Exception):
+    """Raised when more distinct keys are locked than the table allows."""
+
+
+class KeyedLock:
+    """
+    One asyncio.Lock per key, created on demand and dropped when unused.
+
+    Entries are reference counted by holders and waiters, so the table only
+    ever holds keys with a request in progress; max_keys bounds it under
+    overload.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # key -> [lock, holders + waiters]
+        self._entries: Dict[str, List[Any]] = {}
+
+        self.acquisitions = 0
+        self.contended = 0
+        self.rejected = 0
+        self.peak_keys = 0
+
+    @asynccontextmanager
+    async def lock(self, key: str):
+        """Hold the lock for key for the duration of the block."""
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_keys:
+                self.rejected += 1
+                raise LockTableFullError(f"Lock table full ({self.max_keys} keys)")
+            entry = self._entries[key] = [asyncio.Lock(), 0]
+            self.peak_keys = max(self.peak_keys, len(self._entries))
+
+        lock = entry[0]
+        entry[1] += 1
+        if lock.locked():
+            self.contended += 1
+
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._release_ref(key, entry)
+            raise
+
+        self.acquisitions += 1
+        try:
+            yield
+        finally:
+            lock.release()
+            self._release_ref(key, entry)
+
+    def _release_ref(self, key: str, entry: List[Any]) -> None:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active_keys": len(self._entries),
+            "peak_keys": self.peak_keys,
+            "max_keys": self.max_keys,
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "rejected": self.rejected
+        }
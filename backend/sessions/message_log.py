@@ -0,0 +1,108 @@
+"""Append-only conversation log."""
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Sequence
+
+
+def last_by_role(messages: Sequence[Dict[str, str]], role: str, n: int) -> List[Dict[str, str]]:
+    """
+    Get the last n messages with the given role, oldest first.
+
+    Scans backwards, so the cost depends on how far back the matches are,
+    not on the length of the conversation.
+
+    Args:
+        messages: Conversation messages
+        role: Message role to select ("user" or "assistant")
+        n: Maximum number of messages to return
+
+    Returns:
+        Matching messages in chronological order
+    """
+    found = []
+    if n <= 0:
+        return found
+    for msg in reversed(messages):
+        if msg.get("role") == role:
+            found.append(msg)
+            if len(found) == n:
+                break
+    found.reverse()
+    return found
+
+
+class MessageLog:
+    """
+    Conversation messages with O(1) append and stable indexes.
+
+    Messages are never rewritten or removed, so an index handed to a client
+    (see ChatRequest.since_index) always refers to the same message. Reads
+    are windowed: tail() and since() copy only the requested range.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, messages: Optional[Iterable[Dict[str, str]]] = None):
+        self._items: List[Dict[str, str]] = list(messages) if messages else []
+
+    @classmethod
+    def coerce(cls, messages: Any) -> "MessageLog":
+        """Return messages as a MessageLog, wrapping plain lists (e.g. deserialized state)."""
+        if isinstance(messages, cls):
+            return messages
+        return cls(messages)
+
+    def append(self, message: Dict[str, str]) -> int:
+        """
+        Append a message.
+
+        Returns:
+            Index of the appended message
+        """
+        self._items.append(message)
+        return len(self._items) - 1
+
+    def tail(self, n: int) -> List[Dict[str, str]]:
+        """Get the last n messages."""
+        return self._items[-n:] if n > 0 else []
+
+    def since(self, index: int) -> List[Dict[str, str]]:
+        """Get all messages from index on."""
+        return self._items[index:]
+
+    def last_by_role(self, role: str, n: int) -> List[Dict[str, str]]:
+        """Get the last n messages with the given role, oldest first."""
+        return last_by_role(self._items, role, n)
+
+    def copy(self) -> "MessageLog":
+        """Copy the log; appends to the copy do not reach this log."""
+        return MessageLog(self._items)
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """Copy the log into a plain list (for serialization)."""
+        return list(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return iter(self._items)
+
+    def __reversed__(self) -> Iterator[Dict[str, str]]:
+        return reversed(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __add__(self, other: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+        # Legacy agents build "history + [turn]"; this copies, so prefer tail()
+        return self._items + list(other)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, MessageLog):
+            return self._items == other._items
+        return self._items == other
+
+    def __repr__(self) -> str:
+        return f"MessageLog({len(self._items)} messages)"
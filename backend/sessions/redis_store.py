@@ -0,0 +1,136 @@
+"""Redis session store - shares sessions across worker processes and replicas."""
+from typing import Dict, Any, Optional
+import json
+import zlib
+
+from sessions.store import SessionStore, SessionConflictError
+from sessions.message_log import MessageLog
+
+# Key in the session state that carries the version read from Redis
+VERSION_KEY = "session_version"
+
+# Serialized states larger than this are zlib-compressed
+COMPRESS_THRESHOLD = 1024
+
+_RAW = b"j"
+_COMPRESSED = b"z"
+
+
+def _encode_default(obj: Any) -> Any:
+    if isinstance(obj, MessageLog):
+        return obj.to_list()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def serialize_state(state: Dict[str, Any]) -> bytes:
+    """Encode a session state as compact JSON, compressing large payloads."""
+    payload = {k: v for k, v in state.items() if k != VERSION_KEY}
+    data = json.dumps(
+        payload, separators=(",", ":"), ensure_ascii=False, default=_encode_default
+    ).encode("utf-8")
+    if len(data) > COMPRESS_THRESHOLD:
+        return _COMPRESSED + zlib.compress(data, 6)
+    return _RAW + data
+
+
+def deserialize_state(blob: bytes) -> Dict[str, Any]:
+    """Decode a session state produced by serialize_state."""
+    marker, data = blob[:1], blob[1:]
+    if marker == _COMPRESSED:
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Session store backed by Redis (or any server speaking the Redis protocol).
+
+    Each session is a hash with a version counter and the serialized state.
+    Writes are compare-and-set on the version the caller read, so a stale
+    writer gets SessionConflictError instead of clobbering a newer state.
+    Expiry uses Redis TTLs; LRU eviction is left to the server's
+    maxmemory-policy.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        url: str = "redis://localhost:6379/0",
+        ttl_seconds: float = 1800,
+        key_prefix: str = "loanbot:session:"
+    ):
+        if redis_client is None:
+            import redis.asyncio as redis
+            redis_client = redis.from_url(url)
+
+        self._redis = redis_client
+        self.ttl_seconds = int(ttl_seconds)
+        self.key_prefix = key_prefix
+
+        self.conflicts = 0
+        self.bytes_written = 0
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}"
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        version, blob = await self._redis.hmget(self._key(session_id), "v", "s")
+        if blob is None:
+            return None
+
+        if self.ttl_seconds > 0:
+            await self._redis.expire(self._key(session_id), self.ttl_seconds)
+
+        state = deserialize_state(blob)
+        state[VERSION_KEY] = int(version or 0)
+        return state
+
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        from redis.exceptions import WatchError
+
+        key = self._key(session_id)
+        expected = int(state.get(VERSION_KEY, 0))
+        blob = serialize_state(state)
+
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                current = int(await pipe.hget(key, "v") or 0)
+                if current != expected:
+                    raise SessionConflictError(
+                        f"Session {session_id} is at version {current}, expected {expected}"
+                    )
+
+                pipe.multi()
+                pipe.hset(key, mapping={"v": expected + 1, "s": blob})
+                if self.ttl_seconds > 0:
+                    pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except WatchError:
+            self.conflicts += 1
+            raise SessionConflictError(f"Session {session_id} was modified concurrently")
+        except SessionConflictError:
+            self.conflicts += 1
+            raise
+
+        state[VERSION_KEY] = expected + 1
+        self.bytes_written += len(blob)
+
+    async def delete(self, session_id: str) -> bool:
+        return bool(await self._redis.delete(self._key(session_id)))
+
+    async def touch(self, session_id: str) -> bool:
+        if self.ttl_seconds > 0:
+            return bool(await self._redis.expire(self._key(session_id), self.ttl_seconds))
+        return bool(await self._redis.exists(self._key(session_id)))
+
+    async def stop(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "ttl_seconds": self.ttl_seconds,
+            "version_conflicts": self.conflicts,
+            "bytes_written": self.bytes_written
+        }
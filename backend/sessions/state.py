@@ -0,0 +1,337 @@
+"""Compact session state - what the store keeps between requests."""
+from typing import Dict, Any, List, Optional, Tuple, NamedTuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+
+from sessions.message_log import MessageLog
+
+
+class Stage(str, Enum):
+    """Conversation stages routed by the Master Agent."""
+    SALES = "sales"
+    AWAITING_VERIFICATION_CONFIRMATION = "awaiting_verification_confirmation"
+    VERIFICATION = "verification"
+    AWAITING_UNDERWRITING_CONFIRMATION = "awaiting_underwriting_confirmation"
+    UNDERWRITING = "underwriting"
+    AWAITING_SANCTION_CONFIRMATION = "awaiting_sanction_confirmation"
+    SANCTION_LETTER = "sanction_letter"
+    END = "end"
+
+
+class Decision(str, Enum):
+    """Underwriting decisions."""
+    INSTANT_APPROVAL = "INSTANT_APPROVAL"
+    CONDITIONAL_APPROVAL = "CONDITIONAL_APPROVAL"
+    CONDITIONAL_APPROVAL_PENDING = "CONDITIONAL_APPROVAL_PENDING"
+    REJECTED = "REJECTED"
+
+
+class OfferTier(NamedTuple):
+    """
+    A pre-approved offer tier: the fields used after it is fetched, then any
+    other keys of the offer (e.g. offer_id, features) verbatim. A modeled
+    field that is None was absent from the offer.
+    """
+    tier: Optional[str]
+    max_amount: Optional[float]
+    interest_rate: Optional[float]
+    tenure_options: Optional[Tuple[int, ...]]
+    processing_fee: Optional[float]
+    extras: Optional[Dict[str, Any]] = None
+
+
+_STAGES = {stage.value: stage for stage in Stage}
+_DECISIONS = {decision.value: decision for decision in Decision}
+
+# Keys of the API/AgentState dict that SessionState models explicitly
+_MODELED_KEYS = frozenset({
+    "messages", "customer_id", "customer_data", "current_stage", "loan_amount",
+    "tenure_months", "pre_approved_offers", "verification_complete",
+    "underwriting_result", "requires_salary_slip", "salary_slip_provided",
+    "stated_salary", "sanction_letter_path", "conversation_complete", "error",
+    "step_count", "quick_replies", "awaiting_confirmation"
+})
+
+_OFFER_KEYS = ("tier", "max_amount", "interest_rate", "tenure_options", "processing_fee")
+_UNDERWRITING_KEYS = frozenset({"approved", "decision", "loan_details"})
+
+# Shared, read-only snapshots so sessions of the same customer hold one copy;
+# least recently used customers are forgotten beyond the limit (their
+# sessions keep their copy, new sessions just start a new shared one)
+CUSTOMER_SNAPSHOT_LIMIT = 10000
+_customer_snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_tenure_options: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+_quick_reply_sets: Dict[Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str], ...]] = {}
+
+
+def share_customer_snapshot(customer_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Return the shared snapshot for a customer record.
+
+    Identical records for the same customer_id resolve to one object; a
+    changed record replaces the snapshot for subsequent sessions. Snapshots
+    must be treated as read-only.
+    """
+    if not customer_data:
+        return None
+
+    customer_id = customer_data.get("customer_id")
+    if not customer_id:
+        return customer_data
+
+    current = _customer_snapshots.get(customer_id)
+    if current is not None and (current is customer_data or current == customer_data):
+        _customer_snapshots.move_to_end(customer_id)
+        return current
+
+    _customer_snapshots[customer_id] = customer_data
+    _customer_snapshots.move_to_end(customer_id)
+    if len(_customer_snapshots) > CUSTOMER_SNAPSHOT_LIMIT:
+        _customer_snapshots.popitem(last=False)
+    return customer_data
+
+
+def _offer_tier(tier, max_amount, interest_rate, tenure_options, processing_fee, extras=None) -> OfferTier:
+    if tenure_options is not None:
+        options = tuple(tenure_options)
+        tenure_options = _tenure_options.setdefault(options, options)
+    return OfferTier(tier, max_amount, interest_rate, tenure_options, processing_fee, extras or None)
+
+
+def _compact_offers(pre_approved_offers: Optional[Dict[str, Any]]) -> Tuple[OfferTier, ...]:
+    offers = ((pre_approved_offers or {}).get("data") or {}).get("offers") or []
+    return tuple(
+        _offer_tier(
+            *(offer.get(key) for key in _OFFER_KEYS),
+            {k: v for k, v in offer.items() if k not in _OFFER_KEYS}
+        )
+        for offer in offers
+    )
+
+
+def _offers_envelope(pre_approved_offers: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # The offer-mart response around its offers list (success, customer_name,
+    # valid_until, special_message, ...)
+    if not pre_approved_offers:
+        return None
+    envelope = {k: v for k, v in pre_approved_offers.items() if k != "data"}
+    data = pre_approved_offers.get("data")
+    if isinstance(data, dict):
+        envelope["data"] = {k: v for k, v in data.items() if k != "offers"}
+    return envelope
+
+
+def _expand_offer(offer: OfferTier) -> Dict[str, Any]:
+    expanded = {}
+    for key, value in zip(_OFFER_KEYS, offer):
+        if value is not None:
+            expanded[key] = list(value) if key == "tenure_options" else value
+    if offer.extras:
+        expanded.update(offer.extras)
+    return expanded
+
+
+def _compact_quick_replies(quick_replies: Optional[List[Dict[str, str]]]) -> Tuple[Tuple[str, str], ...]:
+    if not quick_replies:
+        return ()
+    replies = tuple((reply["label"], reply["value"]) for reply in quick_replies)
+    return _quick_reply_sets.setdefault(replies, replies)
+
+
+@dataclass(slots=True)
+class SessionState:
+    """
+    Slotted per-session state holding only what later stages need.
+
+    The Master Agent works on the AgentState dict shape; stores convert with
+    from_dict() on write and to_dict() on read. Customer records are shared
+    snapshots, offers are tuples of the fields the agents read (other offer
+    and response keys are kept alongside), and the underwriting decision and
+    loan details are unpacked. to_dict(from_dict(state)) returns an equal
+    dict, apart from the defaults of missing AgentState keys.
+    """
+    messages: MessageLog
+    customer_id: str = ""
+    customer: Optional[Dict[str, Any]] = None
+    stage: Any = Stage.SALES
+    loan_amount: float = 0
+    tenure_months: int = 0
+    offers: Tuple[OfferTier, ...] = ()
+    verification_complete: bool = False
+    decision: Optional[Decision] = None
+    approved: Optional[bool] = None
+    loan_details: Optional[Dict[str, Any]] = None
+    requires_salary_slip: bool = False
+    salary_slip_provided: bool = False
+    stated_salary: float = 0
+    sanction_letter_path: str = ""
+    conversation_complete: bool = False
+    error: str = ""
+    step_count: int = 0
+    quick_replies: Tuple[Tuple[str, str], ...] = ()
+    awaiting_confirmation: bool = False
+    # Any other keys (e.g. session_version), kept verbatim
+    extras: Optional[Dict[str, Any]] = None
+    # The pre_approved_offers response without its offers list
+    offers_envelope: Optional[Dict[str, Any]] = None
+    # Underwriting result keys other than approved/decision/loan_details
+    # (e.g. success, message, next_agent)
+    underwriting_extras: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "SessionState":
+        """Build a compact state from the AgentState dict shape."""
+        underwriting = state.get("underwriting_result") or {}
+        decision = underwriting.get("decision")
+        stage = state.get("current_stage") or Stage.SALES
+        extras = {k: v for k, v in state.items() if k not in _MODELED_KEYS}
+
+        return cls(
+            messages=MessageLog.coerce(state.get("messages")),
+            customer_id=state.get("customer_id") or "",
+            customer=share_customer_snapshot(state.get("customer_data")),
+            stage=_STAGES.get(stage, stage),
+            loan_amount=state.get("loan_amount") or 0,
+            tenure_months=state.get("tenure_months") or 0,
+            offers=_compact_offers(state.get("pre_approved_offers")),
+            verification_complete=bool(state.get("verification_complete")),
+            decision=_DECISIONS.get(decision, decision),
+            approved=underwriting.get("approved"),
+            loan_details=underwriting.get("loan_details"),
+            requires_salary_slip=bool(state.get("requires_salary_slip")),
+            salary_slip_provided=bool(state.get("salary_slip_provided")),
+            stated_salary=state.get("stated_salary") or 0,
+            sanction_letter_path=state.get("sanction_letter_path") or "",
+            conversation_complete=bool(state.get("conversation_complete")),
+            error=state.get("error") or "",
+            step_count=state.get("step_count") or 0,
+            quick_replies=_compact_quick_replies(state.get("quick_replies")),
+            awaiting_confirmation=bool(state.get("awaiting_confirmation")),
+            extras=extras or None,
+            offers_envelope=_offers_envelope(state.get("pre_approved_offers")),
+            underwriting_extras={
+                k: v for k, v in underwriting.items() if k not in _UNDERWRITING_KEYS
+            } or None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Expand into the AgentState dict shape used by the agents and API."""
+        pre_approved_offers = {}
+        if self.offers_envelope is not None:
+            pre_approved_offers = dict(self.offers_envelope)
+            if "data" in pre_approved_offers:
+                pre_approved_offers["data"] = dict(pre_approved_offers["data"])
+        elif self.offers:
+            pre_approved_offers = {"success": True, "data": {"customer_id": self.customer_id}}
+        if self.offers:
+            pre_approved_offers["data"]["offers"] = [_expand_offer(offer) for offer in self.offers]
+
+        underwriting_result = dict(self.underwriting_extras or {})
+        if self.approved is not None:
+            underwriting_result["approved"] = self.approved
+        if self.decision is not None:
+            underwriting_result["decision"] = getattr(self.decision, "value", self.decision)
+        if self.loan_details is not None:
+            underwriting_result["loan_details"] = self.loan_details
+
+        state = {
+            # Agents append to the log in place; a copy keeps a turn that fails
+            # before put() out of the stored session
+            "messages": self.messages.copy(),
+            "customer_id": self.customer_id,
+            "customer_data": self.customer or {},
+            "current_stage": getattr(self.stage, "value", self.stage),
+            "loan_amount": self.loan_amount,
+            "tenure_months": self.tenure_months,
+            "pre_approved_offers": pre_approved_offers,
+            "verification_complete": self.verification_complete,
+            "underwriting_result": underwriting_result,
+            "requires_salary_slip": self.requires_salary_slip,
+            "salary_slip_provided": self.salary_slip_provided,
+            "stated_salary": self.stated_salary,
+            "sanction_letter_path": self.sanction_letter_path,
+            "conversation_complete": self.conversation_complete,
+            "error": self.error,
+            "step_count": self.step_count,
+            "quick_replies": [
+                {"label": label, "value": value} for label, value in self.quick_replies
+            ],
+            "awaiting_confirmation": self.awaiting_confirmation
+        }
+        if self.extras:
+            state.update(self.extras)
+        return state
+
+    def to_record(self) -> List[Any]:
+        """
+        Positional, JSON-serializable form of everything except messages and
+        the customer snapshot (used by the session journal).
+        """
+        return [
+            self.customer_id,
+            getattr(self.stage, "value", self.stage),
+            self.loan_amount,
+            self.tenure_months,
+            [list(offer) for offer in self.offers],
+            self.verification_complete,
+            getattr(self.decision, "value", self.decision),
+            self.approved,
+            self.loan_details,
+            self.requires_salary_slip,
+            self.salary_slip_provided,
+            self.stated_salary,
+            self.sanction_letter_path,
+            self.conversation_complete,
+            self.error,
+            self.step_count,
+            [list(reply) for reply in self.quick_replies],
+            self.awaiting_confirmation,
+            self.extras,
+            self.offers_envelope,
+            self.underwriting_extras
+        ]
+
+    @classmethod
+    def from_record(
+        cls,
+        messages: MessageLog,
+        customer: Optional[Dict[str, Any]],
+        record: List[Any]
+    ) -> "SessionState":
+        """Rebuild a state from to_record() output."""
+        (customer_id, stage, loan_amount, tenure_months, offers, verification_complete,
+         decision, approved, loan_details, requires_salary_slip, salary_slip_provided,
+         stated_salary, sanction_letter_path, conversation_complete, error, step_count,
+         quick_replies, awaiting_confirmation, extras) = record[:19]
+        # Records journaled before these fields existed are shorter
+        offers_envelope, underwriting_extras = (list(record[19:21]) + [None, None])[:2]
+
+        compact_offers = tuple(_offer_tier(*offer) for offer in offers)
+        replies = tuple((label, value) for label, value in quick_replies)
+
+        return cls(
+            messages=messages,
+            customer_id=customer_id,
+            customer=share_customer_snapshot(customer),
+            stage=_STAGES.get(stage, stage),
+            loan_amount=loan_amount,
+            tenure_months=tenure_months,
+            offers=compact_offers,
+            verification_complete=verification_complete,
+            decision=_DECISIONS.get(decision, decision),
+            approved=approved,
+            loan_details=loan_details,
+            requires_salary_slip=requires_salary_slip,
+            salary_slip_provided=salary_slip_provided,
+            stated_salary=stated_salary,
+            sanction_letter_path=sanction_letter_path,
+            conversation_complete=conversation_complete,
+            error=error,
+            step_count=step_count,
+            quick_replies=_quick_reply_sets.setdefault(replies, replies),
+            awaiting_confirmation=awaiting_confirmation,
+            extras=extras,
+            offers_envelope=offers_envelope,
+            underwriting_extras=underwriting_extras
+        )
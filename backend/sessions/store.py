@@ -0,0 +1,211 @@
+"""Session storage - pluggable backends for conversation state."""
+from typing import Dict, Any, Optional, Callable, Iterator, Tuple
+from collections import OrderedDict
+import asyncio
+import time
+
+from sessions.state import SessionState
+
+
+class SessionConflictError(Exception):
+    """Raised when a session was modified by another writer since it was read."""
+
+
+class SessionStore:
+    """Base interface for session storage backends."""
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a session state.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Session state, or None if the session does not exist
+        """
+        raise NotImplementedError
+
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        """
+        Create or replace a session state.
+
+        Args:
+            session_id: Session ID
+            state: Session state to store
+        """
+        raise NotImplementedError
+
+    async def delete(self, session_id: str) -> bool:
+        """
+        Delete a session.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            True if the session existed
+        """
+        raise NotImplementedError
+
+    async def touch(self, session_id: str) -> bool:
+        """
+        Mark a session as recently used without changing its state.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            True if the session exists
+        """
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Start any background work (e.g. expiry sweeper)."""
+
+    async def stop(self) -> None:
+        """Stop background work and release resources."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend statistics for diagnostics."""
+        return {"backend": type(self).__name__}
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store with LRU and idle-TTL eviction.
+
+    Sessions are kept in access order; the least recently used session is
+    evicted once max_sessions is exceeded, and sessions idle for longer than
+    ttl_seconds are reclaimed lazily on access and by a background sweeper.
+    States are held as compact SessionState objects and expanded on read.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 1800,
+        sweep_interval_seconds: float = 60
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+
+        # Called with the session ID of every LRU/TTL eviction
+        self.on_evict: Optional[Callable[[str], None]] = None
+
+        # session_id -> (SessionState, last_access), ordered least -> most recently used
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.evictions = {"lru": 0, "ttl": 0}
+        self.peak_sessions = 0
+
+    def _expired(self, last_access: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - last_access > self.ttl_seconds
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+
+        now = time.monotonic()
+        if self._expired(entry[1], now):
+            del self._sessions[session_id]
+            self._evicted(session_id, "ttl")
+            return None
+
+        self._sessions[session_id] = (entry[0], now)
+        self._sessions.move_to_end(session_id)
+        return entry[0].to_dict()
+
+    async def put(self, session_id: str, state: Dict[str, Any]) -> None:
+        self.restore(session_id, SessionState.from_dict(state))
+
+    def restore(self, session_id: str, state: SessionState) -> None:
+        """Insert an already compacted state (used when replaying a journal)."""
+        self._sessions[session_id] = (state, time.monotonic())
+        self._sessions.move_to_end(session_id)
+
+        # Evict least recently used sessions beyond capacity
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, _ = self._sessions.popitem(last=False)
+            self._evicted(evicted_id, "lru")
+
+        self.peak_sessions = max(self.peak_sessions, len(self._sessions))
+
+    def peek(self, session_id: str) -> Optional[SessionState]:
+        """Get the stored compact state without touching or expiring it."""
+        entry = self._sessions.get(session_id)
+        return entry[0] if entry is not None else None
+
+    def items(self) -> Iterator[Tuple[str, SessionState]]:
+        """Iterate over (session_id, SessionState), least recently used first."""
+        for session_id, (state, _) in self._sessions.items():
+            yield session_id, state
+
+    def _evicted(self, session_id: str, reason: str) -> None:
+        self.evictions[reason] += 1
+        if self.on_evict is not None:
+            self.on_evict(session_id)
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    async def touch(self, session_id: str) -> bool:
+        return await self.get(session_id) is not None
+
+    def sweep(self) -> int:
+        """
+        Remove all sessions idle for longer than the TTL.
+
+        Returns:
+            Number of sessions removed
+        """
+        if self.ttl_seconds <= 0:
+            return 0
+
+        now = time.monotonic()
+        removed = 0
+        # Entries are in access order, so stop at the first live session
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if not self._expired(last_access, now):
+                break
+            del self._sessions[session_id]
+            self._evicted(session_id, "ttl")
+            removed += 1
+
+        return removed
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            self.sweep()
+
+    async def start(self) -> None:
+        if self._sweeper is None and self.ttl_seconds > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "active_sessions": len(self._sessions),
+            "peak_sessions": self.peak_sessions,
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": dict(self.evictions),
+            "evictions_total": sum(self.evictions.values())
+        }
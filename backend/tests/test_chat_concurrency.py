@@ -0,0 +1,115 @@
+"""Tests for per-session locking and duplicate chat coalescing."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from main import ChatRequest
+from sessions.locks import KeyedLock, LockTableFullError
+
+
+@pytest.fixture
+def agent_turns(monkeypatch):
+    turns = []
+
+    async def process_message(message, state):
+        turns.append(message)
+        await asyncio.sleep(0.02)
+        messages = list(state.get("messages", []))
+        messages += [{"role": "user", "content": message}, {"role": "assistant", "content": f"echo {message}"}]
+        return {**state, "messages": messages, "current_stage": "sales"}
+
+    monkeypatch.setattr(main.master_agent, "process_message", process_message)
+    return turns
+
+
+def test_lock_entries_are_dropped_when_unused():
+    locks = KeyedLock()
+    order = []
+
+    async def hold(name):
+        async with locks.lock("session"):
+            order.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            order.append(f"{name} out")
+
+    async def run():
+        await asyncio.gather(hold("a"), hold("b"))
+
+    asyncio.run(run())
+    assert order == ["a in", "a out", "b in", "b out"]
+    stats = locks.stats()
+    assert stats["active_keys"] == 0 and stats["peak_keys"] == 1
+    assert stats["acquisitions"] == 2 and stats["contended"] == 1
+
+
+def test_cancelled_waiter_releases_its_reference():
+    locks = KeyedLock()
+
+    async def run():
+        async with locks.lock("session"):
+            waiter = asyncio.create_task(locks.lock("session").__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        return locks.stats()["active_keys"]
+
+    assert asyncio.run(run()) == 0
+
+
+def test_full_lock_table_rejects_new_sessions():
+    locks = KeyedLock(max_keys=1)
+
+    async def run():
+        async with locks.lock("first"):
+            with pytest.raises(LockTableFullError):
+                async with locks.lock("second"):
+                    pass
+            # A key already in the table can still be waited on
+            assert locks.stats()["active_keys"] == 1
+
+    asyncio.run(run())
+    assert locks.stats()["rejected"] == 1
+
+
+def test_full_lock_table_is_a_503(monkeypatch):
+    monkeypatch.setattr(main, "session_locks", KeyedLock(max_keys=0))
+
+    async def run():
+        async with main.locked_session("session"):
+            pass
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 503
+
+
+def test_duplicate_messages_share_one_turn(agent_turns):
+    request = ChatRequest(message="hello", session_id="coalesce-duplicates")
+
+    async def run():
+        return await asyncio.gather(main.chat(request), main.chat(request))
+
+    first, second = asyncio.run(run())
+    assert agent_turns == ["hello"]
+    assert first == second
+    assert [m["content"] for m in first.messages] == ["hello", "echo hello"]
+
+
+def test_cancelled_first_request_still_answers_the_duplicate(agent_turns):
+    request = ChatRequest(message="hello", session_id="coalesce-cancelled")
+
+    async def run():
+        first = asyncio.create_task(main.chat(request))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(main.chat(request))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    response = asyncio.run(run())
+    assert agent_turns == ["hello"]
+    assert [m["content"] for m in response.messages] == ["hello", "echo hello"]
@@ -0,0 +1,59 @@
+"""Tests for incremental chat history in the chat API."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+client = TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def echo_agent(monkeypatch):
+    async def process_message(message, state):
+        await asyncio.sleep(0)
+        messages = state.get("messages", [])
+        messages.append({"role": "user", "content": message})
+        messages.append({"role": "assistant", "content": f"echo {message}"})
+        return {**state, "messages": messages, "current_stage": "sales"}
+
+    monkeypatch.setattr(main.master_agent, "process_message", process_message)
+
+
+def chat(session_id: str, message: str, since_index=None) -> dict:
+    response = client.post(
+        "/api/chat",
+        json={"session_id": session_id, "message": message, "since_index": since_index}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def contents(body: dict) -> list:
+    return [message["content"] for message in body["messages"]]
+
+
+def test_cursor_returns_only_new_messages():
+    first = chat("history-delta", "one")
+    assert first["since_index"] == 0 and first["next_index"] == 2
+
+    second = chat("history-delta", "two", since_index=first["next_index"])
+    assert contents(second) == ["two", "echo two"]
+    assert second["since_index"] == 2 and second["next_index"] == 4
+
+
+def test_missing_cursor_returns_full_history():
+    chat("history-full", "one")
+    body = chat("history-full", "two")
+    assert contents(body) == ["one", "echo one", "two", "echo two"]
+    assert body["since_index"] == 0
+
+
+@pytest.mark.parametrize("since_index", [99, -1])
+def test_stale_or_negative_cursor_falls_back_to_full_history(since_index):
+    session_id = f"history-cursor-{since_index}"
+    chat(session_id, "one")
+    body = chat(session_id, "two", since_index=since_index)
+    assert contents(body) == ["one", "echo one", "two", "echo two"]
+    assert body["since_index"] == 0 and body["next_index"] == 4
@@ -0,0 +1,36 @@
+"""Tests for the paginated CRM customer listing."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import mock_crm
+
+app = FastAPI()
+app.include_router(mock_crm.router)
+client = TestClient(app)
+
+
+def test_pages_cover_every_customer_once():
+    seen = []
+    params = {"limit": 5}
+    while True:
+        page = client.get("/api/crm/customers/list", params=params).json()
+        assert page["count"] == len(page["data"]) <= 5
+        seen += [customer["customer_id"] for customer in page["data"]]
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            break
+        params = {"limit": 5, "cursor": page["next_cursor"]}
+
+    streamed = [line for line in client.get("/api/crm/customers/stream").text.splitlines() if line]
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == len(streamed)
+
+
+def test_default_request_returns_one_page():
+    page = client.get("/api/crm/customers/list").json()
+    assert page["has_more"] is (page["next_cursor"] is not None)
+    assert page["count"] <= 100
+
+
+def test_invalid_cursor_is_rejected():
+    assert client.get("/api/crm/customers/list", params={"cursor": "***"}).status_code == 400
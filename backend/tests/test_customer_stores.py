@@ -0,0 +1,80 @@
+"""Tests for reloading customer stores without blocking the event loop."""
+import asyncio
+import json
+import os
+import threading
+import time
+
+from services import binary_customer_store
+from services.binary_customer_store import BinaryCustomerStore
+from services.customer_repository import DATA_FILE, CustomerRepository
+
+
+def test_binary_snapshot_is_built_off_the_event_loop(tmp_path, monkeypatch):
+    build = binary_customer_store.build_snapshot
+    threads = []
+
+    def recording_build(json_path, snapshot_path):
+        threads.append(threading.current_thread())
+        return build(json_path, snapshot_path)
+
+    monkeypatch.setattr(binary_customer_store, "build_snapshot", recording_build)
+    store = BinaryCustomerStore(tmp_path / "customers.bin", source_json=DATA_FILE)
+
+    async def first_lookups():
+        return await asyncio.gather(store.find("CUST001"), store.list_page(limit=5))
+
+    customer, page = asyncio.run(first_lookups())
+    assert customer["customer_id"] == "CUST001" and len(page) == 5
+    assert threads and threading.main_thread() not in threads
+    assert len(threads) == 1
+
+
+def test_binary_close_leaves_in_flight_readers_their_mapping(tmp_path):
+    store = BinaryCustomerStore(tmp_path / "customers.bin", source_json=DATA_FILE)
+    asyncio.run(store.start())
+    in_flight = store._current()
+    record_number = in_flight.lookup(in_flight.id_index_offset, "CUST002", in_flight.id_matches)
+
+    store.close()
+
+    assert in_flight.record(record_number)["customer_id"] == "CUST002"
+    assert asyncio.run(store.find("CUST003"))["customer_id"] == "CUST003"
+
+
+def test_json_reload_runs_in_the_background_and_swaps_atomically(tmp_path, monkeypatch):
+    data_file = tmp_path / "customers.json"
+    customers = json.loads(DATA_FILE.read_text())
+    data_file.write_text(json.dumps(customers))
+    repository = CustomerRepository(data_file, reload_check_interval=0)
+    asyncio.run(repository.start())
+    old_index = repository._index
+
+    customers["customers"][0]["name"] = "Renamed Customer"
+    data_file.write_text(json.dumps(customers))
+    os.utime(data_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+    loaded = threading.Event()
+    release = threading.Event()
+    load = repository._load
+
+    def slow_load():
+        loaded.set()
+        release.wait(5)
+        load()
+
+    monkeypatch.setattr(repository, "_load", slow_load)
+
+    async def lookups():
+        # The reload is stuck in its thread; the loop keeps serving the old index
+        first = await repository.find("CUST001")
+        assert await asyncio.to_thread(loaded.wait, 5)
+        second = await repository.find("CUST001")
+        release.set()
+        await asyncio.wrap_future(repository._reload)
+        return first, second, await repository.find("CUST001")
+
+    first, second, third = asyncio.run(lookups())
+    assert first["name"] == second["name"] == old_index[0]["CUST001"]["name"]
+    assert third["name"] == "Renamed Customer"
+    repository.close()
@@ -0,0 +1,184 @@
+"""Fault-injection tests for downstream timeouts, retries and circuit breakers."""
+import asyncio
+import random
+import time
+
+import pytest
+
+from clients import CircuitOpenError, InProcessServiceClient, ResilientServiceClient, ServiceError
+from clients.resilient_client import DEPENDENCIES, DependencyPolicy
+from services.fault_injection import faults
+from utils.circuit_breaker import CircuitBreaker
+
+CUSTOMER_ID = "CUST001"
+
+
+@pytest.fixture(autouse=True)
+def reset_faults():
+    random.seed(1234)
+    faults.reset()
+    yield
+    faults.reset()
+
+
+def resilient(timeout: float = 1.0, max_retries: int = 2, failure_threshold: int = 5,
+              reset_timeout: float = 30.0, inner=None) -> ResilientServiceClient:
+    policy = DependencyPolicy(
+        timeout=timeout,
+        max_retries=max_retries,
+        backoff_base=0.01,
+        backoff_max=0.05,
+        failure_threshold=failure_threshold,
+        reset_timeout=reset_timeout
+    )
+    return ResilientServiceClient(inner or InProcessServiceClient(), {name: policy for name in DEPENDENCIES})
+
+
+async def lookups(client, count: int) -> dict:
+    """Run credit score lookups one after another; slowest lookup and failures."""
+    slowest = 0.0
+    failures = 0
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            await client.get_credit_score(CUSTOMER_ID)
+        except ServiceError:
+            failures += 1
+        slowest = max(slowest, time.perf_counter() - started)
+    return {"max_seconds": slowest, "failures": failures}
+
+
+def circuit(client: ResilientServiceClient) -> dict:
+    return client.stats()["credit_bureau"]["circuit"]
+
+
+def test_timeout_bounds_a_slow_dependency():
+    faults.configure("credit_bureau", latency_seconds=0.5)
+    result = asyncio.run(lookups(resilient(timeout=0.1, max_retries=1), 3))
+
+    # Two attempts of at most 0.1 s each, plus backoff
+    assert result["max_seconds"] < 0.35
+    assert result["failures"] == 3
+
+
+def test_circuit_opens_and_fails_fast_on_a_dead_dependency():
+    faults.configure("credit_bureau", error_rate=1.0)
+    client = resilient(failure_threshold=5)
+    result = asyncio.run(lookups(client, 50))
+    attempts = faults.injected_errors["credit_bureau"]
+
+    assert circuit(client)["state"] == "open"
+    assert result["failures"] == 50
+    # The threshold plus budgeted retries, not every lookup
+    assert attempts < 15
+    assert circuit(client)["rejected"] > 0
+
+
+def test_retries_reduce_failures_on_a_flaky_dependency():
+    faults.configure("credit_bureau", error_rate=0.3)
+    without_retries = asyncio.run(lookups(resilient(max_retries=0, failure_threshold=10**6), 200))
+    with_retries = asyncio.run(lookups(resilient(max_retries=2, failure_threshold=10**6), 200))
+
+    assert with_retries["failures"] < without_retries["failures"]
+
+
+def test_circuit_closes_after_a_successful_probe():
+    faults.configure("credit_bureau", error_rate=1.0)
+    client = resilient(max_retries=0, failure_threshold=3, reset_timeout=0.05)
+    asyncio.run(lookups(client, 3))
+    assert circuit(client)["state"] == "open"
+
+    faults.reset()
+    time.sleep(0.06)
+    assert asyncio.run(client.get_credit_score(CUSTOMER_ID)) is not None
+    assert circuit(client)["state"] == "closed"
+
+
+class UnreliableClient(InProcessServiceClient):
+    """In-process services whose credit lookup runs a replaceable hook first."""
+
+    def __init__(self):
+        super().__init__()
+        self.hook = None
+
+    async def get_credit_score(self, customer_id):
+        if self.hook is not None:
+            await self.hook()
+        return await super().get_credit_score(customer_id)
+
+
+def open_circuit(inner: UnreliableClient) -> ResilientServiceClient:
+    client = resilient(max_retries=0, failure_threshold=1, reset_timeout=0.05, inner=inner)
+    faults.configure("credit_bureau", error_rate=1.0)
+    asyncio.run(lookups(client, 1))
+    faults.reset()
+    assert circuit(client)["state"] == "open"
+    time.sleep(0.06)
+    return client
+
+
+def test_unexpected_probe_error_does_not_lock_the_circuit():
+    inner = UnreliableClient()
+    client = open_circuit(inner)
+
+    async def broken():
+        raise KeyError("unexpected")
+
+    inner.hook = broken
+    with pytest.raises(KeyError):
+        asyncio.run(client.get_credit_score(CUSTOMER_ID))
+
+    # The failed probe re-opens the circuit; once it resets, the recovered
+    # dependency is probed again and the circuit closes
+    inner.hook = None
+    time.sleep(0.06)
+    assert asyncio.run(client.get_credit_score(CUSTOMER_ID)) is not None
+    assert circuit(client)["state"] == "closed"
+
+
+def test_cancelled_probe_does_not_lock_the_circuit():
+    inner = UnreliableClient()
+    client = open_circuit(inner)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def cancel_probe():
+        probe = asyncio.create_task(client.get_credit_score(CUSTOMER_ID))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    inner.hook = hang
+    asyncio.run(cancel_probe())
+
+    inner.hook = None
+    assert asyncio.run(client.get_credit_score(CUSTOMER_ID)) is not None
+    assert circuit(client)["state"] == "closed"
+
+
+def test_only_the_probe_releases_the_half_open_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    # Started while the circuit was closed, cancelled once it is half-open
+    stale = breaker.allow()
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    probe = breaker.allow()
+    assert probe is not None and breaker.allow() is None
+
+    breaker.abandon(stale)
+    assert breaker.allow() is None
+    breaker.abandon(probe)
+    assert breaker.allow() is not None
+
+
+def test_open_circuit_rejects_without_calling():
+    inner = UnreliableClient()
+    client = resilient(max_retries=0, failure_threshold=1, reset_timeout=30, inner=inner)
+    faults.configure("credit_bureau", error_rate=1.0)
+    asyncio.run(lookups(client, 1))
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.get_credit_score(CUSTOMER_ID))
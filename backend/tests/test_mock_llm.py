@@ -0,0 +1,60 @@
+"""Tests for the mock LLM's in-flight accounting."""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import mock_llm as mock_llm_module
+from services.mock_llm import ChatCompletionRequest, chat_completions, mock_llm
+
+app = FastAPI()
+app.include_router(mock_llm_module.router)
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def reset_mock():
+    mock_llm.reset()
+    mock_llm.latency_ms = 0
+    mock_llm.tokens_per_second = 0
+    yield
+    mock_llm.reset()
+
+
+def request(stream: bool) -> ChatCompletionRequest:
+    return ChatCompletionRequest(messages=[{"role": "user", "content": "hi"}], stream=stream)
+
+
+def test_stream_abandoned_before_its_body_is_not_counted():
+    async def run():
+        # The client goes away before the body starts, so it is never iterated
+        await chat_completions(request(stream=True))
+        return mock_llm.active
+
+    assert asyncio.run(run()) == 0
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_completed_requests_release_their_slot(stream):
+    for _ in range(3):
+        response = client.post(
+            f"{mock_llm_module.router.prefix}/chat/completions",
+            json=request(stream).model_dump()
+        )
+        assert response.status_code == 200
+
+    stats = mock_llm.stats()
+    assert stats["active"] == 0 and stats["peak_active"] == 1 and stats["completed"] == 3
+
+
+def test_abandoned_streams_do_not_exhaust_capacity():
+    mock_llm.max_concurrency = 1
+
+    async def run():
+        for _ in range(3):
+            await chat_completions(request(stream=True))
+        response = await chat_completions(request(stream=False))
+        return getattr(response, "status_code", 200)
+
+    assert asyncio.run(run()) == 200
@@ -0,0 +1,131 @@
+"""Tests for the per-session and provider-wide LLM token buckets."""
+import asyncio
+
+import pytest
+
+from utils import rate_limit
+from utils.rate_limit import AsyncTokenBucket, RateLimitExceeded, SessionBudget
+
+
+@pytest.fixture(autouse=True)
+def controlled_time(monkeypatch, clock):
+    monkeypatch.setattr(rate_limit, "time", clock)
+
+    async def sleep(seconds):
+        clock.advance(seconds)
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep)
+
+
+def test_session_budget_spends_its_burst_then_waits(clock):
+    budget = SessionBudget(rate=0.5, capacity=2, max_calls=10)
+    state = None
+    for _ in range(2):
+        state, wait = budget.take(state, max_wait=0, now=clock.now)
+        assert wait == 0
+
+    state, wait = budget.take(state, max_wait=5, now=clock.now)
+    assert wait == pytest.approx(2.0)
+    assert state["tokens"] == pytest.approx(-1.0)
+
+
+def test_session_budget_rejects_waits_beyond_max_wait(clock):
+    budget = SessionBudget(rate=0.5, capacity=1, max_calls=10)
+    state, _ = budget.take(None, max_wait=0, now=clock.now)
+
+    with pytest.raises(RateLimitExceeded) as error:
+        budget.take(state, max_wait=1, now=clock.now)
+    assert error.value.retry_after == pytest.approx(2.0)
+
+
+def test_session_budget_refills_over_time_up_to_capacity(clock):
+    budget = SessionBudget(rate=0.5, capacity=2, max_calls=10)
+    state, _ = budget.take(None, max_wait=0, now=clock.now)
+    state, _ = budget.take(state, max_wait=0, now=clock.now)
+
+    clock.advance(2)
+    refilled, wait = budget.take(state, max_wait=0, now=clock.now)
+    assert wait == 0 and refilled["tokens"] == pytest.approx(0.0)
+
+    clock.advance(3600)
+    idle, _ = budget.take(refilled, max_wait=0, now=clock.now)
+    assert idle["tokens"] == pytest.approx(1.0)
+    # take() returns a new budget rather than changing the stored one
+    assert refilled["tokens"] == pytest.approx(0.0)
+
+
+def test_session_budget_ignores_a_clock_moving_backwards(clock):
+    budget = SessionBudget(rate=1, capacity=1, max_calls=10)
+    state, _ = budget.take(None, max_wait=0, now=clock.now)
+
+    _, wait = budget.take(state, max_wait=5, now=clock.now - 60)
+    assert wait == pytest.approx(1.0)
+
+
+def test_session_call_limit_is_final(clock):
+    budget = SessionBudget(rate=100, capacity=100, max_calls=2)
+    state = None
+    for _ in range(2):
+        state, _ = budget.take(state, max_wait=0, now=clock.now)
+
+    clock.advance(3600)
+    with pytest.raises(RateLimitExceeded) as error:
+        budget.take(state, max_wait=0, now=clock.now)
+    assert error.value.retry_after is None
+
+
+def test_bucket_delays_callers_once_empty(clock):
+    bucket = AsyncTokenBucket(rate=2, capacity=2)
+
+    async def run():
+        return [await bucket.acquire(max_wait=1) for _ in range(4)]
+
+    assert asyncio.run(run()) == pytest.approx([0.0, 0.0, 0.5, 0.5])
+    stats = bucket.stats()
+    assert stats["acquired"] == 4 and stats["delayed"] == 2
+    assert stats["total_wait_seconds"] == pytest.approx(1.0)
+
+
+def test_bucket_rejects_callers_that_would_wait_too_long(clock):
+    bucket = AsyncTokenBucket(rate=1, capacity=1)
+
+    async def run():
+        await bucket.acquire(max_wait=0)
+        with pytest.raises(RateLimitExceeded) as error:
+            await bucket.acquire(max_wait=0.5)
+        return error.value.retry_after
+
+    assert asyncio.run(run()) == pytest.approx(1.0)
+    assert bucket.stats()["rejected"] == 1
+
+
+def test_bucket_refills_up_to_capacity(clock):
+    bucket = AsyncTokenBucket(rate=1, capacity=3)
+
+    async def run():
+        for _ in range(3):
+            await bucket.acquire(max_wait=0)
+        clock.advance(60)
+        return [await bucket.acquire(max_wait=0) for _ in range(3)]
+
+    assert asyncio.run(run()) == [0.0, 0.0, 0.0]
+    assert bucket.stats()["tokens"] == 0
+
+
+def test_cancelled_waiter_returns_its_reservation(clock, monkeypatch):
+    bucket = AsyncTokenBucket(rate=1, capacity=1)
+
+    async def sleep_forever(seconds):
+        await asyncio.Event().wait()
+
+    async def run():
+        await bucket.acquire(max_wait=0)
+        monkeypatch.setattr(rate_limit.asyncio, "sleep", sleep_forever)
+        waiter = asyncio.create_task(bucket.acquire(max_wait=5))
+        await asyncio.wait([waiter], timeout=0.01)
+        assert bucket.tokens == pytest.approx(-1.0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        return bucket.tokens
+
+    assert asyncio.run(run()) == pytest.approx(0.0)
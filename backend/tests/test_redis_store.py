@@ -0,0 +1,100 @@
+"""Tests for the Redis session store, against an in-process fake server."""
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from sessions.message_log import MessageLog  # noqa: E402
+from sessions.redis_store import VERSION_KEY, RedisSessionStore  # noqa: E402
+from sessions.store import SessionConflictError  # noqa: E402
+
+
+def state(messages: int = 1) -> dict:
+    return {
+        "messages": MessageLog([{"role": "user", "content": f"message {i}"} for i in range(messages)]),
+        "customer_id": "CUST001",
+        "current_stage": "sales",
+        "loan_amount": 300000
+    }
+
+
+def run(test, server=None):
+    async def with_store():
+        store = RedisSessionStore(redis_client=fakeredis.FakeAsyncRedis(server=server or fakeredis.FakeServer()))
+        try:
+            return await test(store)
+        finally:
+            await store.stop()
+
+    return asyncio.run(with_store())
+
+
+@pytest.mark.parametrize("messages, marker", [(1, b"j"), (100, b"z")])
+def test_put_get_round_trip(messages, marker):
+    async def test(store):
+        original = state(messages)
+        await store.put("session", original)
+        loaded = await store.get("session")
+        raw = await store._redis.hget(store._key("session"), "s")
+        return original, loaded, raw
+
+    original, loaded, raw = run(test)
+    assert raw[:1] == marker
+    assert loaded[VERSION_KEY] == original[VERSION_KEY] == 1
+    assert loaded["messages"] == original["messages"].to_list()
+    assert {k: loaded[k] for k in ("customer_id", "current_stage", "loan_amount")} == {
+        "customer_id": "CUST001", "current_stage": "sales", "loan_amount": 300000
+    }
+
+
+def test_stale_write_is_a_conflict():
+    async def test(store):
+        await store.put("session", state())
+        first, second = await store.get("session"), await store.get("session")
+        await store.put("session", first)
+        with pytest.raises(SessionConflictError):
+            await store.put("session", second)
+        return store.stats()["version_conflicts"], (await store.get("session"))[VERSION_KEY]
+
+    assert run(test) == (1, 2)
+
+
+def test_write_landing_during_the_transaction_is_a_conflict():
+    async def test(store):
+        await store.put("session", state())
+        loaded = await store.get("session")
+        key = store._key("session")
+        other_writer = fakeredis.FakeAsyncRedis(server=server)
+
+        # Another replica commits right after this put has checked the version
+        pipeline = store._redis.pipeline
+
+        def racing_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            hget = pipe.hget
+
+            async def hget_then_race(*hget_args):
+                value = await hget(*hget_args)
+                await other_writer.hset(key, "v", 2)
+                return value
+
+            pipe.hget = hget_then_race
+            return pipe
+
+        store._redis.pipeline = racing_pipeline
+        with pytest.raises(SessionConflictError, match="concurrently"):
+            await store.put("session", loaded)
+        return store.stats()["version_conflicts"]
+
+    server = fakeredis.FakeServer()
+    assert run(test, server) == 1
+
+
+def test_delete():
+    async def test(store):
+        await store.put("session", state())
+        deleted = await store.delete("session")
+        return deleted, await store.get("session"), await store.delete("session")
+
+    assert run(test) == (True, None, False)
@@ -0,0 +1,95 @@
+"""Tests for serving cached sales replies ahead of the LLM budget."""
+import asyncio
+
+import pytest
+
+from agents.master_agent import MasterAgent
+from agents.perplexity_sales_agent import PerplexitySalesAgent
+from agents.response_cache import ResponseCache
+from sessions.message_log import MessageLog
+
+OFFERS = {"data": {"offers": [{"max_amount": 500000, "interest_rate": 10.5, "tenure_options": [12, 24]}]}}
+CUSTOMERS = [
+    {"name": "Rajesh Kumar", "city": "Mumbai", "credit_score": 780, "pre_approved_limit": 500000},
+    {"name": "Priya Sharma", "city": "Pune", "credit_score": 790, "pre_approved_limit": 450000},
+]
+
+
+@pytest.fixture
+def master() -> MasterAgent:
+    agent = MasterAgent.__new__(MasterAgent)
+    agent.sales_paths = {
+        path: {"turns": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        for path in ("fast_path", "cache", "llm", "degraded")
+    }
+    agent.sales_agent = PerplexitySalesAgent()
+    agent.sales_agent.response_cache = ResponseCache()
+    agent.completions = 0
+    agent.reservations = 0
+
+    async def complete(messages, on_delta=None, priority=None):
+        agent.completions += 1
+        return "Hello Rajesh! How much would you like to borrow?"
+
+    async def reserve_call(budget):
+        agent.reservations += 1
+        return budget or {}
+
+    agent.sales_agent._complete = complete
+    agent.sales_agent.reserve_call = reserve_call
+    return agent
+
+
+def turn(master: MasterAgent, customer, stage: str = "sales") -> dict:
+    state = {
+        "messages": MessageLog([{"role": "user", "content": "hi"}]),
+        "customer_data": customer,
+        "pre_approved_offers": OFFERS,
+        "current_stage": stage
+    }
+    return asyncio.run(master._sales_node(state))
+
+
+def test_cache_hit_skips_the_llm_budget(master):
+    turn(master, CUSTOMERS[0])
+    state = turn(master, CUSTOMERS[1])
+
+    assert state["messages"][-1]["content"] == "Hello Priya! How much would you like to borrow?"
+    assert master.completions == 1
+    assert master.reservations == 1
+    stats = master.sales_path_stats()
+    assert stats["llm"]["turns"] == 1 and stats["cache"]["turns"] == 1
+
+
+def test_cache_is_keyed_by_funnel_stage(master):
+    turn(master, CUSTOMERS[0], stage="sales")
+    turn(master, CUSTOMERS[1], stage="awaiting_verification_confirmation")
+
+    assert master.completions == 2
+
+
+def test_cache_is_keyed_by_collected_details(master):
+    turn(master, CUSTOMERS[0])
+    state = {
+        "messages": MessageLog([{"role": "user", "content": "hi"}]),
+        "customer_data": CUSTOMERS[1],
+        "pre_approved_offers": OFFERS,
+        "current_stage": "sales",
+        "loan_amount": 300000
+    }
+    asyncio.run(master._sales_node(state))
+
+    assert master.completions == 2
+
+
+def test_completion_replies_are_not_cached(master):
+    async def complete(messages, on_delta=None, priority=None):
+        master.completions += 1
+        return "Great, let me check that for you. COLLECT_COMPLETE"
+
+    master.sales_agent._complete = complete
+    turn(master, CUSTOMERS[0])
+    turn(master, CUSTOMERS[1])
+
+    assert master.completions == 2
+    assert master.sales_agent.response_cache.stats()["entries"] == 0
@@ -0,0 +1,42 @@
+"""Tests for the deterministic sales fast path."""
+import pytest
+
+from agents.master_agent import MasterAgent
+from agents.perplexity_sales_agent import PerplexitySalesAgent
+
+OFFERS = {"data": {"offers": [{"max_amount": 500000, "tenure_options": [12, 24, 36]}]}}
+
+
+@pytest.fixture
+def agent() -> MasterAgent:
+    master = MasterAgent.__new__(MasterAgent)
+    master.sales_agent = PerplexitySalesAgent.__new__(PerplexitySalesAgent)
+    return master
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("3 lakhs for 24 months", (300000, 24)),
+    ("₹2,00,000 for 36 months", (200000, 36)),
+    ("I need 1.5 lakh over 2 years", (150000, 24)),
+    ("200000 for 1 yr", (200000, 12)),
+])
+def test_confident_details(agent, message, expected):
+    details = agent.sales_agent.confident_loan_details(message)
+    assert (details["loan_amount"], details["tenure_months"]) == expected
+
+
+@pytest.mark.parametrize("message", [
+    "I want 2 loans for 12 months",
+    "3 or 4 lakhs for 24 months",
+    "my salary is 50000, 2 years",
+    "3 lakh for 2 years 6 months",
+])
+def test_ambiguous_details_go_to_the_llm(agent, message):
+    assert agent.sales_agent.confident_loan_details(message) is None
+
+
+def test_tenure_must_be_an_offered_option(agent):
+    state = {"pre_approved_offers": OFFERS}
+    assert agent._fast_path_details(state, "3 lakhs for 24 months") is not None
+    assert agent._fast_path_details(state, "3 lakhs for 30 months") is None
+    assert agent._fast_path_details(state, "6 lakhs for 24 months") is None
@@ -0,0 +1,55 @@
+"""Tests for LLM timeouts in the sales agent."""
+import asyncio
+
+import pytest
+
+from agents.master_agent import MasterAgent
+from agents.perplexity_sales_agent import LLMTimeout, PerplexitySalesAgent
+from sessions.message_log import MessageLog
+
+
+@pytest.fixture
+def sales_agent() -> PerplexitySalesAgent:
+    agent = PerplexitySalesAgent()
+    agent.response_cache = None
+    agent.timeout = 0.01
+    agent.requests = 0
+
+    async def request(messages, on_delta):
+        agent.requests += 1
+        await asyncio.sleep(1)
+
+    async def reserve_call(budget):
+        return budget or {}
+
+    agent._request = request
+    agent.reserve_call = reserve_call
+    return agent
+
+
+def test_timeout_is_a_distinct_error_and_not_retried(sales_agent):
+    with pytest.raises(LLMTimeout, match="did not respond") as error:
+        asyncio.run(sales_agent._complete([{"role": "user", "content": "hi"}]))
+
+    assert isinstance(error.value, TimeoutError)
+    assert sales_agent.requests == 1
+    assert sales_agent.stats()["timeouts"] == 1
+
+
+def test_sales_turn_degrades_on_timeout(sales_agent):
+    master = MasterAgent.__new__(MasterAgent)
+    master.sales_paths = {
+        path: {"turns": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        for path in ("fast_path", "cache", "llm", "degraded")
+    }
+    master.sales_agent = sales_agent
+    state = {
+        "messages": MessageLog([{"role": "user", "content": "hi"}]),
+        "customer_data": {"name": "Rajesh Kumar"},
+        "pre_approved_offers": {"data": {"offers": []}},
+        "current_stage": "sales"
+    }
+
+    state = asyncio.run(master._sales_node(state))
+    assert state["messages"][-1]["role"] == "assistant"
+    assert master.sales_path_stats()["degraded"]["turns"] == 1
@@ -0,0 +1,135 @@
+"""Tests for the deadline-aware LLM priority scheduler."""
+import asyncio
+
+import pytest
+
+from utils import scheduler
+from utils.scheduler import PriorityScheduler, SchedulerRejected
+
+
+@pytest.fixture(autouse=True)
+def controlled_time(monkeypatch, clock):
+    monkeypatch.setattr(scheduler, "time", clock)
+
+
+async def hold(slots: PriorityScheduler, release: asyncio.Event, priority: int = 0, deadline: float = 1e9):
+    async with slots.slot(priority, deadline):
+        await release.wait()
+
+
+async def serve_one(slots: PriorityScheduler, clock, seconds: float) -> None:
+    # Teach the scheduler how long a request holds its slot
+    async with slots.slot(0, clock.now):
+        clock.advance(seconds)
+
+
+def test_requests_start_immediately_while_slots_are_free(clock):
+    slots = PriorityScheduler(max_concurrency=2)
+
+    async def run():
+        async with slots.slot(0, clock.now):
+            async with slots.slot(0, clock.now):
+                return slots.in_flight
+
+    assert asyncio.run(run()) == 2
+    assert slots.stats()["admitted"] == 2 and slots.in_flight == 0
+
+
+def test_request_that_cannot_start_by_its_deadline_is_rejected_on_arrival(clock):
+    slots = PriorityScheduler(max_concurrency=1)
+
+    async def run():
+        await serve_one(slots, clock, 2.0)
+        release = asyncio.Event()
+        busy = asyncio.create_task(hold(slots, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(SchedulerRejected) as error:
+            async with slots.slot(0, clock.now + 1.0):
+                pass
+        release.set()
+        await busy
+        return error.value.retry_after
+
+    assert asyncio.run(run()) == pytest.approx(2.0)
+    assert slots.stats()["rejected_on_arrival"] == 1
+
+
+def test_queued_requests_start_by_priority(clock):
+    slots = PriorityScheduler(max_concurrency=1)
+    started = []
+
+    async def request(priority: int):
+        async with slots.slot(priority, clock.now + 60):
+            started.append(priority)
+
+    async def run():
+        release = asyncio.Event()
+        busy = asyncio.create_task(hold(slots, release))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(request(priority)) for priority in (2, 0, 1)]
+        await asyncio.sleep(0)
+        assert slots.stats()["queue_depth_by_priority"] == {0: 1, 1: 1, 2: 1}
+        release.set()
+        await asyncio.gather(busy, *waiters)
+
+    asyncio.run(run())
+    assert started == [0, 1, 2]
+
+
+def test_request_still_queued_at_its_deadline_expires(clock):
+    slots = PriorityScheduler(max_concurrency=1)
+
+    async def run():
+        release = asyncio.Event()
+        busy = asyncio.create_task(hold(slots, release))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerRejected, match="expired"):
+            async with slots.slot(0, clock.now + 0.01):
+                pass
+        release.set()
+        await busy
+
+    asyncio.run(run())
+    stats = slots.stats()
+    assert stats["expired_in_queue"] == 1 and stats["queue_depth"] == 0
+
+
+def test_pause_holds_new_requests_until_retry_after(clock):
+    slots = PriorityScheduler(max_concurrency=4)
+    started = []
+
+    async def request():
+        async with slots.slot(0, clock.now + 60):
+            started.append(clock.now)
+
+    async def run():
+        slots.pause(0.02)
+        with pytest.raises(SchedulerRejected) as error:
+            async with slots.slot(0, clock.now + 0.01):
+                pass
+
+        waiter = asyncio.create_task(request())
+        await asyncio.sleep(0)
+        assert started == [] and slots.queue_depth == 1
+
+        clock.advance(0.02)
+        await asyncio.wait_for(waiter, 1)
+        return error.value.retry_after
+
+    paused_at = clock.now
+    assert asyncio.run(run()) == pytest.approx(0.02)
+    assert started == [pytest.approx(paused_at + 0.02)]
+    assert slots.stats()["pauses"] == 1
+
+
+def test_shorter_pause_does_not_cut_a_longer_one(clock):
+    slots = PriorityScheduler(max_concurrency=1)
+
+    async def run():
+        slots.pause(30)
+        slots.pause(5)
+        return slots.estimated_wait(0)
+
+    assert asyncio.run(run()) == pytest.approx(30)
+    assert slots.stats()["pauses"] == 1
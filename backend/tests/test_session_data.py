@@ -0,0 +1,48 @@
+"""Tests for the per-session data context."""
+import asyncio
+
+from clients import InProcessServiceClient
+from clients.session_data import CREDIT_FIELDS, SessionDataContext
+
+
+class CountingClient(InProcessServiceClient):
+    def __init__(self):
+        super().__init__()
+        self.credit_lookups = 0
+
+    async def get_credit_score(self, customer_id):
+        self.credit_lookups += 1
+        return await super().get_credit_score(customer_id)
+
+
+def test_only_the_credit_fields_underwriting_needs_are_kept():
+    inner = CountingClient()
+    state = {}
+    context = SessionDataContext(inner, state)
+
+    full = asyncio.run(context.get_credit_score("CUST001"))
+    assert "credit_utilization" in full["data"]
+
+    entry = state["data_fetched"]["credit_score"]
+    assert "response" not in entry
+    assert set(entry["report"]) == set(CREDIT_FIELDS)
+
+    # A later request of the same session is answered from the trimmed report
+    memoized = asyncio.run(SessionDataContext(inner, state).get_credit_score("CUST001"))
+    assert inner.credit_lookups == 1
+    assert memoized["data"]["credit_score"] == full["data"]["credit_score"]
+    assert memoized["data"]["rating"] == full["data"]["rating"]
+
+
+def test_entries_with_a_full_response_are_refetched():
+    inner = CountingClient()
+    state = {"data_fetched": {"credit_score": {
+        "customer_id": "CUST001", "version": 1, "fetched_at": 0, "found": True, "hits": 0,
+        "response": {"success": True, "data": {"credit_score": 1}}
+    }}}
+
+    response = asyncio.run(SessionDataContext(inner, state).get_credit_score("CUST001"))
+
+    assert inner.credit_lookups == 1
+    assert response["data"]["credit_score"] != 1
+    assert "response" not in state["data_fetched"]["credit_score"]
@@ -0,0 +1,85 @@
+"""Tests for the session journal."""
+import asyncio
+import threading
+
+from sessions import journal as session_journal
+from sessions.journal import JournaledSessionStore
+from sessions.message_log import MessageLog
+from sessions.store import InMemorySessionStore
+
+
+def journaled(directory, **kwargs) -> JournaledSessionStore:
+    return JournaledSessionStore(InMemorySessionStore(ttl_seconds=0), str(directory), **kwargs)
+
+
+def conversation(store: JournaledSessionStore, session_ids, turns: int) -> None:
+    async def run():
+        await store.start()
+        states = {}
+        for turn in range(turns):
+            for session_id in session_ids:
+                state = states.setdefault(session_id, {"messages": MessageLog(), "current_stage": "sales"})
+                state["messages"].append({"role": "user", "content": f"{session_id} turn {turn}"})
+                state["step_count"] = turn
+                await store.put(session_id, state)
+        await store.delete(session_ids[0])
+        await store.stop()
+
+    asyncio.run(run())
+
+
+def test_replay_restores_sessions_in_write_order(tmp_path):
+    conversation(journaled(tmp_path), ["a", "b", "c"], turns=3)
+
+    restarted = journaled(tmp_path)
+    asyncio.run(restarted.start())
+    restored = list(restarted.inner.items())
+    asyncio.run(restarted.stop())
+
+    assert [session_id for session_id, _ in restored] == ["b", "c"]
+    state = restored[0][1]
+    assert [m["content"] for m in state.messages] == ["b turn 0", "b turn 1", "b turn 2"]
+    assert state.step_count == 2
+
+
+def test_replay_across_snapshots(tmp_path):
+    store = journaled(tmp_path, snapshot_every=4)
+    conversation(store, ["a", "b", "c"], turns=5)
+    assert store.snapshots_written > 0
+
+    restarted = journaled(tmp_path)
+    asyncio.run(restarted.start())
+    restored = dict(restarted.inner.items())
+    asyncio.run(restarted.stop())
+
+    assert sorted(restored) == ["b", "c"]
+    assert len(restored["c"].messages) == 5
+
+
+def test_writes_and_fsync_happen_off_the_event_loop(tmp_path, monkeypatch):
+    fsync_threads = []
+    fsync = session_journal.os.fsync
+
+    def recording_fsync(fd):
+        fsync_threads.append(threading.current_thread())
+        fsync(fd)
+
+    monkeypatch.setattr(session_journal.os, "fsync", recording_fsync)
+    conversation(journaled(tmp_path, fsync=True), ["a", "b"], turns=2)
+
+    assert fsync_threads
+    assert threading.main_thread() not in fsync_threads
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    conversation(journaled(tmp_path), ["a", "b"], turns=2)
+    journal_file = sorted(tmp_path.glob("journal-*.jsonl"))[-1]
+    with open(journal_file, "ab") as f:
+        f.write(b'["u","b",2,[{"role":"user","con')
+
+    restarted = journaled(tmp_path)
+    asyncio.run(restarted.start())
+    restored = dict(restarted.inner.items())
+    asyncio.run(restarted.stop())
+
+    assert len(restored["b"].messages) == 2
@@ -0,0 +1,92 @@
+"""Tests for the compact session state."""
+import asyncio
+
+from clients import InProcessServiceClient
+from sessions import state as session_state
+from sessions.message_log import MessageLog
+from sessions.state import SessionState, share_customer_snapshot
+from sessions.store import InMemorySessionStore
+
+
+def agent_state(**overrides):
+    client = InProcessServiceClient()
+    state = {
+        "messages": MessageLog([{"role": "user", "content": "hi"}]),
+        "customer_id": "CUST001",
+        "customer_data": asyncio.run(client.get_customer("CUST001")),
+        "current_stage": "sanction_letter",
+        "loan_amount": 300000,
+        "tenure_months": 24,
+        "pre_approved_offers": asyncio.run(client.get_offers("CUST001")),
+        "verification_complete": True,
+        "underwriting_result": {
+            "success": True,
+            "approved": True,
+            "decision": "INSTANT_APPROVAL",
+            "message": "🎉 **Congratulations! Your Loan is APPROVED!**",
+            "loan_details": {"loan_amount": 300000, "tenure_months": 24, "interest_rate": 10.5},
+            "next_agent": "sanction_letter"
+        },
+        "requires_salary_slip": False,
+        "salary_slip_provided": False,
+        "stated_salary": 0,
+        "sanction_letter_path": "",
+        "conversation_complete": False,
+        "error": "",
+        "step_count": 3,
+        "quick_replies": [{"label": "Yes", "value": "yes"}],
+        "awaiting_confirmation": True,
+        "session_version": 7
+    }
+    state.update(overrides)
+    return state
+
+
+def test_round_trip_is_lossless():
+    original = agent_state()
+    offers = original["pre_approved_offers"]
+    assert offers["data"]["special_message"] and offers["data"]["offers"][0]["features"]
+
+    assert SessionState.from_dict(original).to_dict() == original
+
+
+def test_round_trip_keeps_failed_underwriting_and_empty_results():
+    failed = {"success": False, "approved": False, "message": "Unable to fetch credit score.", "next_agent": None}
+    assert SessionState.from_dict(agent_state(underwriting_result=failed)).to_dict()["underwriting_result"] == failed
+
+    empty = SessionState.from_dict(agent_state(underwriting_result={}, pre_approved_offers={})).to_dict()
+    assert empty["underwriting_result"] == {} and empty["pre_approved_offers"] == {}
+
+
+def test_record_round_trip_is_lossless():
+    compact = SessionState.from_dict(agent_state())
+    restored = SessionState.from_record(compact.messages, compact.customer, compact.to_record())
+
+    assert restored.to_dict() == compact.to_dict()
+
+
+def test_customer_snapshots_are_bounded(monkeypatch):
+    monkeypatch.setattr(session_state, "CUSTOMER_SNAPSHOT_LIMIT", 3)
+    monkeypatch.setattr(session_state, "_customer_snapshots", type(session_state._customer_snapshots)())
+
+    first = {"customer_id": "C0", "name": "A"}
+    assert share_customer_snapshot(first) is first
+    assert share_customer_snapshot(dict(first)) is first
+    for i in range(1, 10):
+        share_customer_snapshot({"customer_id": f"C{i}", "name": "A"})
+
+    assert list(session_state._customer_snapshots) == ["C7", "C8", "C9"]
+
+
+def test_unsaved_turn_does_not_reach_the_store():
+    store = InMemorySessionStore()
+    initial = agent_state()
+
+    async def run():
+        await store.put("session", initial)
+        state = await store.get("session")
+        # A turn that fails after appending the user message is never put
+        state["messages"].append({"role": "user", "content": "orphan"})
+        return await store.get("session")
+
+    assert [m["content"] for m in asyncio.run(run())["messages"]] == ["hi"]
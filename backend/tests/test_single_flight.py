@@ -0,0 +1,81 @@
+"""Tests for single-flight call collapsing."""
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def lookup():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", lookup) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "collapsed": 4, "in_flight": 0}
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    flight = SingleFlight()
+
+    async def lookup():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("key", lookup))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", lookup))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(run()) == "result"
+
+
+def test_call_is_cancelled_once_every_caller_left():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def lookup():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        callers = [asyncio.create_task(flight.do("key", lookup)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flight.stats()["in_flight"]
+
+    assert asyncio.run(run()) == 0
+    assert cancelled == [True]
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
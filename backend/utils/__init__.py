@@ -1,4 +1,4 @@
 """Initialize utils package."""
-from utils import helpers
+from utils import helpers, single_flight, circuit_breaker, rate_limit, scheduler
 
-__all__ = ["helpers"]
+__all__ = ["helpers", "single_flight", "circuit_breaker", "rate_limit", "scheduler"]
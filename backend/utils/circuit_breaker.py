@@ -0,0 +1,149 @@
+"""Circuit breaker and retry budget - stop calling a dependency that keeps failing."""
+from typing import Any, Dict, Optional
+import itertools
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Track consecutive failures of one dependency and fail fast while it is down.
+
+    Closed: calls go through; failure_threshold consecutive failures open
+    the circuit. Open: calls are rejected without being attempted until
+    reset_timeout seconds have passed. Half-open: one probe call is let
+    through; its success closes the circuit, its failure opens it again.
+    Each allowed call gets a permit, so only the probe itself can give up
+    the half-open slot without a verdict.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # Permit of the half-open probe in flight, if any
+        self._probe: Optional[int] = None
+        self._permits = itertools.count(1)
+
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> Optional[int]:
+        """
+        Decide whether a call may be attempted now.
+
+        Returns:
+            A permit for the call (see abandon()), or None while the circuit
+            is open (the call should fail fast)
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return None
+            self.state = HALF_OPEN
+
+        permit = next(self._permits)
+        if self.state == HALF_OPEN:
+            if self._probe is not None:
+                self.rejected += 1
+                return None
+            self._probe = permit
+        return permit
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._probe = None
+        self.state = CLOSED
+        self.opened_at = None
+
+    def abandon(self, permit: int) -> None:
+        """
+        Forget a call that ended without a verdict (e.g. it was cancelled).
+
+        If the call was the half-open probe, its slot is released so the
+        next call can probe; no success or failure is counted either way.
+
+        Args:
+            permit: Permit allow() gave the call
+        """
+        if permit == self._probe:
+            self._probe = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._probe = None
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 3)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "retry_in": retry_in,
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened
+        }
+
+
+class RetryBudget:
+    """
+    Cap retries at a fraction of recent calls.
+
+    Every call deposits `ratio` tokens (up to `max_tokens`) and every retry
+    spends one, so during an outage retries add at most `ratio` extra load
+    instead of multiplying it by the attempt count. The budget starts full
+    so isolated failures are always retried.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Take one retry from the budget.
+
+        Returns:
+            False when the budget is exhausted (the retry should not be made)
+        """
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        self.retries += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self.tokens, 2),
+            "retries": self.retries,
+            "exhausted": self.exhausted
+        }
@@ -0,0 +1,140 @@
+"""Rate limiting - token buckets for per-session and provider-wide LLM call budgets."""
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import time
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a call is not allowed now; the message is shown to the customer.
+
+    retry_after is the number of seconds until the call would be allowed,
+    or None when waiting will not help (e.g. a lifetime limit).
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AsyncTokenBucket:
+    """
+    In-process token bucket shared by every caller, e.g. a provider quota.
+
+    Holds up to `capacity` tokens, refilled at `rate` per second. A caller
+    that finds the bucket empty reserves the next token (the balance goes
+    negative) and waits for it with asyncio.sleep, so waiting never
+    blocks the event loop and waiters are served in arrival order. Callers
+    that would wait longer than max_wait are rejected instead.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+        self.acquired = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, max_wait: float) -> float:
+        """
+        Take one token, waiting for it if needed.
+
+        Args:
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitExceeded: If the token would not be available within max_wait
+        """
+        self._refill(time.monotonic())
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        if wait > max_wait:
+            self.rejected += 1
+            raise RateLimitExceeded("Rate limit reached", retry_after=wait)
+
+        self.tokens -= 1
+        self.acquired += 1
+        if wait:
+            self.delayed += 1
+            self.total_wait += wait
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Give the reservation back to the callers behind this one
+                self.tokens += 1
+                raise
+        return wait
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "rate_per_second": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "total_wait_seconds": round(self.total_wait, 3)
+        }
+
+
+class SessionBudget:
+    """
+    Token bucket whose state is kept in each session rather than in memory.
+
+    A session's budget is a plain dict {"tokens", "updated_at", "calls"}
+    stored with the rest of its state, so it survives restarts and is the
+    same whichever worker serves the session. take() never mutates the
+    dict it is given; it returns the new one to store.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_calls: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_calls = max_calls
+
+    def take(
+        self,
+        budget: Optional[Dict[str, Any]],
+        max_wait: float,
+        now: Optional[float] = None
+    ) -> Tuple[Dict[str, Any], float]:
+        """
+        Take one call from a session's budget.
+
+        Args:
+            budget: The session's current budget (None for a new session)
+            max_wait: Longest acceptable wait in seconds for the next token
+            now: Current wall-clock time (defaults to time.time())
+
+        Returns:
+            (budget to store, seconds the caller must wait before calling)
+
+        Raises:
+            RateLimitExceeded: If the session has used all its calls, or
+                its next token is further away than max_wait
+        """
+        now = time.time() if now is None else now
+        budget = budget or {"tokens": float(self.capacity), "updated_at": now, "calls": 0}
+
+        if budget["calls"] >= self.max_calls:
+            raise RateLimitExceeded("Session call limit reached")
+
+        elapsed = max(0.0, now - budget["updated_at"])
+        tokens = min(float(self.capacity), budget["tokens"] + elapsed * self.rate)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+        if wait > max_wait:
+            raise RateLimitExceeded("Session rate limit reached", retry_after=wait)
+
+        # The token is reserved now; a caller that waits spends it then
+        return {"tokens": tokens - 1, "updated_at": now, "calls": budget["calls"] + 1}, wait
@@ -0,0 +1,172 @@
+"""Priority scheduler - bounded concurrency with deadline-aware admission."""
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import heapq
+import itertools
+import math
+import time
+
+from utils.rate_limit import RateLimitExceeded
+
+
+class SchedulerRejected(RateLimitExceeded):
+    """Raised when a request cannot start within its deadline."""
+
+
+class PriorityScheduler:
+    """
+    Run at most max_concurrency requests at once; queue the rest by priority.
+
+    Lower priority values go first; equal priorities are first come, first
+    served. Each request carries a deadline by which it must have started.
+    A request whose estimated queue wait already exceeds its deadline is
+    rejected on arrival rather than left to time out; one still queued at
+    its deadline is removed and rejected. pause() stops new requests from
+    starting until a given time, e.g. when the provider answers 429 with
+    Retry-After.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue_depth: int = 1000, window: int = 1000):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+
+        self.in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._resume_handle: Optional[asyncio.TimerHandle] = None
+        # Exponentially weighted mean time a request holds its slot
+        self._service_time: Optional[float] = None
+
+        self.admitted = 0
+        self.rejected_on_arrival = 0
+        self.expired_in_queue = 0
+        self.pauses = 0
+        self.peak_queue_depth = 0
+        self._waits: Deque[float] = deque(maxlen=window)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._queue if not future.done())
+
+    def estimated_wait(self, priority: int) -> float:
+        """Seconds a request of this priority arriving now would likely queue."""
+        now = time.monotonic()
+        paused = max(0.0, self._paused_until - now)
+        ahead = sum(1 for p, _, future in self._queue if p <= priority and not future.done())
+        if self.in_flight + ahead < self.max_concurrency:
+            return paused
+        if self._service_time is None:
+            return paused
+        rounds = math.ceil((ahead + 1) / self.max_concurrency)
+        return paused + rounds * self._service_time
+
+    def pause(self, seconds: float) -> None:
+        """Start no new requests for the next `seconds` (in-flight ones continue)."""
+        until = time.monotonic() + seconds
+        if until <= self._paused_until:
+            return
+        self._paused_until = until
+        self.pauses += 1
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+        self._resume_handle = asyncio.get_running_loop().call_later(seconds, self._dispatch)
+
+    def _dispatch(self) -> None:
+        if time.monotonic() < self._paused_until:
+            return
+        while self._queue and self.in_flight < self.max_concurrency:
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                # Expired or cancelled while queued
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def _release(self, held: float) -> None:
+        self.in_flight -= 1
+        self._service_time = held if self._service_time is None else 0.8 * self._service_time + 0.2 * held
+        self._dispatch()
+
+    async def _acquire(self, priority: int, deadline: float) -> None:
+        now = time.monotonic()
+        if (
+            not self._queue
+            and self.in_flight < self.max_concurrency
+            and now >= self._paused_until
+        ):
+            self.in_flight += 1
+            return
+
+        estimate = self.estimated_wait(priority)
+        if now + estimate > deadline or self.queue_depth >= self.max_queue_depth:
+            self.rejected_on_arrival += 1
+            raise SchedulerRejected("Request cannot start within its deadline", retry_after=estimate)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(future, max(0.0, deadline - now))
+        except asyncio.TimeoutError:
+            self.expired_in_queue += 1
+            raise SchedulerRejected("Request expired in the queue", retry_after=self.estimated_wait(priority))
+        except asyncio.CancelledError:
+            # Granted just as the waiter was cancelled: hand the slot on
+            if future.done() and not future.cancelled():
+                self._release(0.0)
+            raise
+
+    @asynccontextmanager
+    async def slot(self, priority: int, deadline: float):
+        """
+        Hold one of the concurrent request slots.
+
+        Args:
+            priority: Lower values are served first
+            deadline: time.monotonic() by which the request must start
+
+        Raises:
+            SchedulerRejected: If the request cannot start by its deadline
+        """
+        queued_at = time.monotonic()
+        await self._acquire(priority, deadline)
+        started = time.monotonic()
+        self.admitted += 1
+        self._waits.append(started - queued_at)
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        by_priority: Dict[int, int] = {}
+        for priority, _, future in self._queue:
+            if not future.done():
+                by_priority[priority] = by_priority.get(priority, 0) + 1
+
+        def percentile(fraction: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * fraction))], 3) if waits else 0.0
+
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": sum(by_priority.values()),
+            "queue_depth_by_priority": by_priority,
+            "peak_queue_depth": self.peak_queue_depth,
+            "admitted": self.admitted,
+            "rejected_on_arrival": self.rejected_on_arrival,
+            "expired_in_queue": self.expired_in_queue,
+            "wait_seconds": {
+                "mean": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(waits[-1], 3) if waits else 0.0
+            },
+            "service_seconds": round(self._service_time, 3) if self._service_time is not None else None,
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "pauses": self.pauses
+        }
@@ -0,0 +1,70 @@
+"""Single-flight execution - concurrent callers with the same key share one call."""
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one in-flight task.
+
+    The first caller for a key starts the function in its own task; every
+    caller, the first included, awaits that task's result (or exception).
+    A cancelled caller only stops waiting: the shared call keeps running
+    for the others and is cancelled only when no caller is left waiting.
+    Nothing is cached once the call completes, so this composes with any
+    caching layer.
+    """
+
+    def __init__(self):
+        # key -> [task, callers still waiting]
+        self._inflight: Dict[Hashable, list] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key among concurrent callers.
+
+        Args:
+            key: Identity of the call
+            fn: Coroutine function to run if no identical call is in flight
+
+        Returns:
+            Result of the shared call
+        """
+        entry = self._inflight.get(key)
+        if entry is not None:
+            self.collapsed += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._finished(key, done))
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            # Shield so one caller's cancellation does not cancel the shared call
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and entry[1] == 1:
+                # The last caller went away; nobody needs the result
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody awaited is not logged as never retrieved
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._inflight)
+        }
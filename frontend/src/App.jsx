@@ -5,6 +5,8 @@ import { Users } from 'lucide-react';
 
 function App() {
   const [customers, setCustomers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedCustomer, setSelectedCustomer] = useState(null);
   const [loading, setLoading] = useState(true);
 
@@ -16,6 +18,7 @@ function App() {
     try {
       const response = await mockAPI.getCustomers();
       setCustomers(response.data || []);
+      setNextCursor(response.next_cursor || null);
     } catch (error) {
       console.error('Error fetching customers:', error);
     } finally {
@@ -23,6 +26,19 @@ function App() {
     }
   };
 
+  const fetchMoreCustomers = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await mockAPI.getCustomers(nextCursor);
+      setCustomers((previous) => [...previous, ...(response.data || [])]);
+      setNextCursor(response.next_cursor || null);
+    } catch (error) {
+      console.error('Error fetching customers:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCustomerSelect = (customerId) => {
     setSelectedCustomer(customerId);
   };
@@ -97,6 +113,17 @@ function App() {
                 </button>
               ))}
             </div>
+            {nextCursor && (
+              <div className="text-center mt-8">
+                <button
+                  onClick={fetchMoreCustomers}
+                  disabled={loadingMore}
+                  className="text-primary-600 hover:text-primary-700 font-semibold border border-primary-600 px-6 py-2 transition-colors disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more customers'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
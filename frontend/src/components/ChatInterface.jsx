@@ -71,7 +71,17 @@ const ChatInterface = ({ customerId }) => {
     setIsLoading(true);
 
     try {
-      const response = await chatAPI.sendMessage(userMessage, sessionId, customerId);
+      // Show the reply as it is generated; the final response replaces it
+      let streamedReply = '';
+      const response = await chatAPI.streamMessage(userMessage, sessionId, customerId, null, (delta) => {
+        streamedReply += delta;
+        const partial = { role: 'assistant', content: streamedReply, streaming: true };
+        setMessages((prev) =>
+          prev.length && prev[prev.length - 1].streaming
+            ? [...prev.slice(0, -1), partial]
+            : [...prev, partial]
+        );
+      });
       
       setSessionId(response.session_id);
       // Update with full messages from backend (includes AI response)
@@ -87,8 +97,9 @@ const ChatInterface = ({ customerId }) => {
       }
     } catch (error) {
       console.error('Error sending message:', error);
+      // Drop the partial reply the stream left behind before showing the error
       setMessages((prev) => [
-        ...prev,
+        ...prev.filter((message) => !message.streaming),
         {
           role: 'assistant',
           content: 'Sorry, I encountered an error. Please try again.',
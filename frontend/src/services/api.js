@@ -11,24 +11,72 @@ const apiClient = axios.create({
 
 // Chat API
 export const chatAPI = {
-  sendMessage: async (message, sessionId = null, customerId = null) => {
+  // Pass sinceIndex (the previous response's next_index) to receive only new messages
+  sendMessage: async (message, sessionId = null, customerId = null, sinceIndex = null) => {
     const response = await apiClient.post('/api/chat', {
       message,
       session_id: sessionId,
       customer_id: customerId,
+      since_index: sinceIndex,
     });
     return response.data;
   },
 
+  // Stream the reply over Server-Sent Events: onToken receives each piece of
+  // text as it is generated; resolves with the final chat response
+  streamMessage: async (message, sessionId = null, customerId = null, sinceIndex = null, onToken = () => {}) => {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        message,
+        session_id: sessionId,
+        customer_id: customerId,
+        since_index: sinceIndex,
+      }),
+    });
+    if (!response.ok) {
+      throw new Error(`Chat stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = 'message';
+        let data = '';
+        for (const line of block.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        const payload = JSON.parse(data);
+        if (event === 'token') onToken(payload.delta);
+        else if (event === 'state') return payload;
+        else if (event === 'error') throw new Error(payload.detail);
+      }
+    }
+    throw new Error('Chat stream ended before the final state');
+  },
+
   startConversation: async (customerId) => {
     const response = await apiClient.post(`/api/start-conversation?customer_id=${customerId}`);
     return response.data;
   },
 
-  uploadSalarySlip: async (sessionId, salaryAmount) => {
+  uploadSalarySlip: async (sessionId, salaryAmount, sinceIndex = null) => {
     const response = await apiClient.post('/api/upload-salary-slip', {
       session_id: sessionId,
       salary_amount: salaryAmount,
+      since_index: sinceIndex,
     });
     return response.data;
   },
@@ -45,8 +93,9 @@ export const chatAPI = {
 
 // Mock Services API (for testing)
 export const mockAPI = {
-  getCustomers: async () => {
-    const response = await apiClient.get('/api/crm/customers/list');
+  getCustomers: async (cursor = null, limit = 100) => {
+    const params = cursor ? { limit, cursor } : { limit };
+    const response = await apiClient.get('/api/crm/customers/list', { params });
     return response.data;
   },
 